@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Benchmark Analysis Modes - Full video vs keyframes + transcript
+
+Runs the same database items through both visual input modes (result cache
+and pre-screen off) and compares latency, token usage and score agreement.
+Run this before switching a strategy to "keyframes" in
+config/quality-thresholds.json (analysis_modes).
+
+Video mode hands the file to Gemini through MediaHandle: clips up to
+MEDIA_BUFFER_MAX_MB are buffered once, larger files are read per call.
+Only these two hand-offs exist and are measured here; an mmap hand-off was
+evaluated and left out (slicing the map copied the file onto the heap and
+the inline proto copied it again, so it saved nothing).
+
+Usage:
+    python benchmark_analysis_modes.py [N]   # N items with videos (default 5)
+"""
+
+import sys
+import time
+sys.path.insert(0, 'src')
+
+from storage import LarkClient
+from analysis import VideoAnalyzer
+from analysis.video_analyzer import MEDIA_STRATEGIES
+from core import TikTokContent, TIKTOK_CONTENT_TABLE
+from core.config import MEDIA_BUFFER_MAX_MB
+
+MODES = ["video", "keyframes"]
+
+# Strategy mapping for decoding the monitoring_strategy lookup field
+STRATEGY_MAP = {
+    "optC7R9ojK": "Competitor Intelligence",
+    "optBbDImXA": "Trend Discovery",
+    "opt94KPGSJ": "Niche Deep-Dive"
+}
+
+
+def fetch_sample(lark: LarkClient, limit: int):
+    """First `limit` records with a video in a strategy that uses media"""
+    table_id = lark._get_table_id(TIKTOK_CONTENT_TABLE)
+    path = f"/bitable/v1/apps/{lark.base_id}/tables/{table_id}/records?page_size=500"
+    data = lark._make_request("GET", path)
+
+    sample = []
+    for item in data.get('items', []):
+        fields = item['fields']
+        raw_strategy = fields.get('monitoring_strategy')
+        strategy = STRATEGY_MAP.get(raw_strategy[0]) if isinstance(raw_strategy, list) and raw_strategy else None
+        video_download_url = fields.get('video_downlaod_url', {}).get('link', '')  # Note: typo in field name
+        if strategy not in MEDIA_STRATEGIES or not video_download_url:
+            continue
+
+        sample.append(TikTokContent(
+            content_id=str(fields.get('content_id', '')),
+            target_value=fields.get('target_value', '@unknown'),
+            video_url=fields.get('video_url', {}).get('link', ''),
+            author_username=fields.get('author_username', ''),
+            caption=fields.get('caption', ''),
+            likes=int(fields.get('likes', 0)),
+            comments=int(fields.get('comments', 0)),
+            views=int(fields.get('views', 0)),
+            engagement_rate=float(fields.get('engagement_rate', 0)),
+            video_download_url=video_download_url,
+            subtitle_url=fields.get('subtitle_url', {}).get('link', ''),
+            monitoring_strategy=strategy
+        ))
+        if len(sample) >= limit:
+            break
+    return sample
+
+
+def run_mode(mode: str, items):
+    """Analyze every item in one mode; returns {content_id: measurements}"""
+    analyzer = VideoAnalyzer(use_result_cache=False, analysis_modes={s: mode for s in MEDIA_STRATEGIES})
+    analyzer.tiering["enabled"] = False  # measure the analysis call itself
+    analyzer.dedup_index = None
+
+    # Record latency and token usage of each model call
+    calls = []
+    generate = analyzer._generate
+
+    def measured_generate(contents, response_schema=None, **call_info):
+        start = time.time()
+        response = generate(contents, response_schema, **call_info)
+        usage = response.usage_metadata
+        calls.append((time.time() - start, usage.prompt_token_count, usage.candidates_token_count))
+        return response
+
+    analyzer._generate = measured_generate
+
+    measurements = {}
+    for content in items:
+        print(f"\n🤖 [{mode}] {content.content_id} ({content.monitoring_strategy})")
+        start = time.time()
+        result = analyzer.analyze_content(content)
+        model_seconds, prompt_tokens, output_tokens = calls[-1] if calls else (0, 0, 0)
+        measurements[content.content_id] = {
+            "score": result.strategic_score if result else None,
+            "total_seconds": time.time() - start,
+            "model_seconds": model_seconds,
+            "prompt_tokens": prompt_tokens or 0,
+            "output_tokens": output_tokens or 0
+        }
+        calls.clear()
+    analyzer.close()
+    return measurements
+
+
+def average(values):
+    values = list(values)
+    return sum(values) / len(values) if values else 0
+
+
+def main():
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print("=" * 70)
+    print("⏱️  ANALYSIS MODE BENCHMARK - video vs keyframes + transcript")
+    print("=" * 70)
+    print(f"   Video hand-off: buffered up to {MEDIA_BUFFER_MAX_MB} MB, read per call above")
+    print("   (mmap hand-off evaluated and left out - it copied the file twice, not compared)")
+
+    probe = VideoAnalyzer(use_result_cache=False)
+    if not probe.preprocessor.ffmpeg_available:
+        print("❌ ffmpeg/ffprobe not found - keyframes mode would fall back to video")
+        return
+
+    print(f"\n📋 Fetching up to {limit} items with videos...")
+    items = fetch_sample(LarkClient(), limit)
+    if not items:
+        print("❌ No items with videos in Competitor Intelligence / Niche Deep-Dive")
+        return
+
+    results = {mode: run_mode(mode, items) for mode in MODES}
+
+    print("\n" + "=" * 70)
+    print("📊 PER-MODE AVERAGES")
+    print("=" * 70)
+    print(f"   {'mode':<10} {'total s':>8} {'model s':>8} {'prompt tok':>11} {'output tok':>11}")
+    for mode in MODES:
+        rows = results[mode].values()
+        print(
+            f"   {mode:<10} {average(r['total_seconds'] for r in rows):>8.1f} "
+            f"{average(r['model_seconds'] for r in rows):>8.1f} "
+            f"{average(r['prompt_tokens'] for r in rows):>11.0f} "
+            f"{average(r['output_tokens'] for r in rows):>11.0f}"
+        )
+
+    print("\n" + "=" * 70)
+    print("🎯 SCORE AGREEMENT (video vs keyframes)")
+    print("=" * 70)
+    pairs = []
+    for content in items:
+        video_score = results["video"][content.content_id]["score"]
+        keyframe_score = results["keyframes"][content.content_id]["score"]
+        print(f"   {content.content_id}: video {video_score} | keyframes {keyframe_score}")
+        if video_score is not None and keyframe_score is not None:
+            pairs.append((video_score, keyframe_score))
+
+    if pairs:
+        exact = sum(1 for a, b in pairs if a == b) / len(pairs) * 100
+        within_one = sum(1 for a, b in pairs if abs(a - b) <= 1) / len(pairs) * 100
+        mean_diff = average(abs(a - b) for a, b in pairs)
+        print(f"\n   Exact: {exact:.0f}% | Within 1 point: {within_one:.0f}% | Mean abs diff: {mean_diff:.2f}")
+    else:
+        print("\n   ⚠️ No items scored in both modes")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"\n❌ Failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Benchmark Response Parsers - Bulk re-parsing throughput
+
+Re-parses every raw model response recorded in the result cache
+(data/analysis_results.sqlite3) with the shared single-pass parser engine
+and with the previous multi-search regex parsers, and reports throughput
+plus field agreement. Useful before a parser change that will be applied
+to all cached results.
+
+Usage:
+    python benchmark_parsers.py                 # recorded responses
+    python benchmark_parsers.py --synthetic 5000  # generated corpus (no cache needed)
+"""
+
+import random
+import re
+import sys
+import time
+sys.path.insert(0, 'src')
+
+from analysis.result_cache import ResultCache
+from analysis.parsers import (
+    parse_competitor_intelligence_response,
+    parse_niche_deepdive_response,
+    parse_competitor_intelligence_json,
+    parse_niche_deepdive_json,
+    parse_prescreen_response
+)
+from analysis.prompts import CONTENT_TYPES, NICHE_CATEGORIES
+
+ROUNDS = 5
+
+
+# ==============================================================================
+# BASELINE - previous parsers (one re.search per field over the whole response)
+# ==============================================================================
+
+def legacy_fields(response_text: str, category_label: str):
+    stage1 = re.search(r'\*\*STAGE 1 - Content Analysis:\*\*\s*(.*?)(?=\*\*STAGE 2|$)', response_text, re.IGNORECASE | re.DOTALL)
+    general_analysis = stage1.group(1).strip() if stage1 else response_text[:200].strip()
+
+    score = re.search(r'\*\*score:\*\*\s*(\d+)', response_text, re.IGNORECASE)
+    strategic_score = min(int(score.group(1)), 10) if score else 5
+
+    if category_label == "content type":
+        category = re.search(r'\*\*content type:\*\*\s*([a-zA-Z_]+)', response_text, re.IGNORECASE)
+        category = category.group(1).lower() if category else "other"
+    else:
+        category = "Other"
+        match = re.search(r'\*\*niche category:\*\*\s*([^\n]+)', response_text, re.IGNORECASE)
+        if match:
+            raw = match.group(1).strip()
+            valid_categories = list(NICHE_CATEGORIES)
+            for valid_cat in valid_categories:
+                if raw.lower() == valid_cat.lower():
+                    category = valid_cat
+                    break
+            else:
+                for valid_cat in valid_categories:
+                    if valid_cat.lower() in raw.lower() or raw.lower() in valid_cat.lower():
+                        category = valid_cat
+                        break
+
+    insights = re.search(r'\*\*strategic insights:\*\*\s*((?:\d+\..*?(?=\n\d+\.|\n\*\*|$))+)', response_text, re.IGNORECASE | re.DOTALL)
+    if not insights:
+        insights = re.search(r'\*\*strategic insights:\*\*\s*(.*?)(?=\n\*\*|$)', response_text, re.IGNORECASE | re.DOTALL)
+    strategic_insights = insights.group(1).strip() if insights else ""
+
+    return general_analysis, strategic_score, category, strategic_insights
+
+
+# ==============================================================================
+# CORPUS
+# ==============================================================================
+
+def synthetic_corpus(size: int):
+    """Markdown responses shaped like real model output"""
+    rng = random.Random(42)
+    corpus = []
+    for i in range(size):
+        niche = i % 2 == 1
+        category = rng.choice(NICHE_CATEGORIES) if niche else rng.choice(CONTENT_TYPES)
+        label = "Niche Category" if niche else "Content Type"
+        analysis = " ".join(rng.choice(["The creator", "**opens**", "with a hook", "about books", "and learning."]) for _ in range(rng.randint(40, 120)))
+        insights = "\n".join(f"{n}. Insight {n} - technique, why it works, what AIbrary could test." for n in range(1, rng.randint(2, 3) + 1))
+        corpus.append((str(i), (
+            f"**STAGE 1 - Content Analysis:**\n{analysis}\n\n"
+            f"**STAGE 2 - Strategic Analysis:**\n\n**Score:** {rng.randint(0, 10)}/10\n\n"
+            f"**{label}:** {category}\n\n**Strategic Insights:**\n{insights}\n"
+        )))
+    return corpus
+
+
+def pick_parser(response_text: str):
+    """Which production parser a recorded response belongs to"""
+    head = response_text.lstrip()[:20]
+    lowered = response_text.lower()
+    if head.startswith("{") or head.startswith("```"):
+        return parse_niche_deepdive_json if '"niche_category"' in response_text else parse_competitor_intelligence_json
+    if "**niche category:**" in lowered:
+        return parse_niche_deepdive_response
+    if "**stage 1" in lowered:
+        return parse_competitor_intelligence_response
+    return parse_prescreen_response
+
+
+def throughput(label: str, corpus, parse_one):
+    total_bytes = sum(len(text.encode("utf-8")) for _, text in corpus)
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for content_id, text in corpus:
+            parse_one(content_id, text)
+    elapsed = time.perf_counter() - start
+    count = len(corpus) * ROUNDS
+    print(f"   {label:<22} {count / elapsed:>10,.0f} responses/s   {total_bytes * ROUNDS / elapsed / 1e6:>7.1f} MB/s")
+    return elapsed
+
+
+def main():
+    if "--synthetic" in sys.argv:
+        size = int(sys.argv[sys.argv.index("--synthetic") + 1])
+        corpus = synthetic_corpus(size)
+        source = f"{size} synthetic responses"
+    else:
+        cache = ResultCache()
+        corpus = list(cache.iter_raw_responses())
+        cache.close()
+        source = f"{len(corpus)} recorded responses"
+
+    print("=" * 70)
+    print(f"⏱️  PARSER BENCHMARK - {source}, {ROUNDS} rounds")
+    print("=" * 70)
+    if not corpus:
+        print("❌ No recorded responses - run analysis first or use --synthetic N")
+        return
+
+    parsers = {content_id: pick_parser(text) for content_id, text in corpus}
+    markdown = [
+        (content_id, text) for content_id, text in corpus
+        if parsers[content_id] in (parse_competitor_intelligence_response, parse_niche_deepdive_response)
+    ]
+
+    print("\n📊 Throughput (all recorded formats):")
+    throughput("parser engine", corpus, lambda cid, text: parsers[cid](cid, text))
+
+    if markdown:
+        def legacy(cid, text):
+            label = "niche category" if parsers[cid] is parse_niche_deepdive_response else "content type"
+            return legacy_fields(text, label)
+
+        print(f"\n📊 Throughput (markdown responses only, {len(markdown)}):")
+        engine_seconds = throughput("parser engine", markdown, lambda cid, text: parsers[cid](cid, text))
+        legacy_seconds = throughput("previous regex parsers", markdown, legacy)
+        print(f"   Speedup: {legacy_seconds / engine_seconds:.1f}x")
+
+        # Field agreement with the previous parsers
+        score_agree = category_agree = insights_longer = 0
+        for cid, text in markdown:
+            result = parsers[cid](cid, text)
+            _, score, category, insights = legacy(cid, text)
+            score_agree += result.strategic_score == score
+            category_agree += result.content_type == category
+            insights_longer += len(result.strategic_insights) > len(insights)
+        print(f"\n🎯 Agreement with previous parsers ({len(markdown)} responses):")
+        print(f"   Score: {score_agree / len(markdown) * 100:.1f}% | Category: {category_agree / len(markdown) * 100:.1f}%")
+        print(f"   Insights: {insights_longer} responses now keep the full numbered list (previously cut after item 1)")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"\n❌ Failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
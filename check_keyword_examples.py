@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Check Keyword Examples - Scorer vs documented examples
+
+Scores every caption in the "examples" block of config/keyword-lists.json
+with the keyword scorer and compares the result with its expected_score
+and matches. Run after editing keyword lists, weights or multipliers;
+exits non-zero when an example no longer reproduces.
+
+Usage:
+    python check_keyword_examples.py
+"""
+
+import sys
+sys.path.insert(0, 'src')
+
+from core.config import load_json_config, KEYWORD_LISTS_FILE
+from analysis.keyword_scorer import KeywordScorer, check_examples
+
+
+def main() -> int:
+    settings = load_json_config(KEYWORD_LISTS_FILE)
+    scorer = KeywordScorer(settings)
+
+    print("🔑 Keyword scorer examples:")
+    for name, example in settings.get("examples", {}).items():
+        result = scorer.score(example.get("text", ""))
+        status = "PASS" if result.passed else "FAIL"
+        print(f"   {name}: {result.score:g} (expected {example.get('expected_score')}) "
+              f"{status} - {', '.join(sorted(result.matches)) or 'no matches'}")
+
+    problems = check_examples(settings)
+    if problems:
+        print(f"\n❌ {len(problems)} example(s) no longer reproduce:")
+        for problem in problems:
+            print(f"   {problem}")
+        return 1
+
+    print("\n✅ All examples reproduce")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,6 +4,10 @@ Run AI Analysis Only - Re-analyze existing content in database
 
 This script re-runs Phase 5 (AI Analysis) on all content that doesn't have analysis yet.
 Useful when you've cleared the AI columns and want to re-analyze with updated prompts.
+
+Usage:
+    python run_analysis_only.py          # synchronous calls (results in minutes)
+    python run_analysis_only.py --batch  # Gemini batch jobs (cheaper, results within hours)
 """
 
 import sys
@@ -14,6 +18,8 @@ from analysis import VideoAnalyzer
 from core import TikTokContent, TIKTOK_CONTENT_TABLE
 
 def main():
+    batch_mode = "--batch" in sys.argv[1:]
+
     print("=" * 70)
     print("🤖 AI ANALYSIS ONLY - Re-analyzing existing content")
     print("=" * 70)
@@ -84,22 +90,29 @@ def main():
 
     # Run batch analysis
     print("🤖 Running AI analysis with new prompt...")
-    print("   (This may take 60-90 seconds per video with video analysis enabled)\n")
-
-    results = analyzer.batch_analyze(to_analyze, "competitor_intelligence")
+    try:
+        if batch_mode:
+            print("   (Batch-job mode: submitted to Gemini and polled until done, usually within hours)\n")
+            results = analyzer.batch_analyze_offline(to_analyze)
+        else:
+            print("   (This may take 60-90 seconds per video with video analysis enabled)\n")
+            results = analyzer.batch_analyze(to_analyze, "competitor_intelligence")
+    finally:
+        analyzer.close()
 
     if not results:
         print("❌ Analysis failed")
         return
 
     print(f"\n✅ Analysis completed for {len(results)} items!")
+    analyzer.metrics.print_run_summary()
 
     # Save updated content back to Lark Base
     print("\n💾 Saving analysis results to Lark Base...")
 
     # The batch_analyze method already updated the to_analyze content objects with analysis results
     # Now we just need to save them using save_content which will update existing records
-    if lark.save_content(to_analyze):
+    if len(lark.save_content(to_analyze)) == len(to_analyze):
         print(f"   ✅ Saved {len(to_analyze)} updated records to database")
     else:
         print("   ⚠️ Some records may not have saved properly")
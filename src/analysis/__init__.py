@@ -4,8 +4,11 @@ AI-powered content analysis and insights generation
 """
 
 from .video_analyzer import VideoAnalyzer, analyze_new_content
+from .keyword_scorer import KeywordScorer, KeywordScore
 
 __all__ = [
     'VideoAnalyzer',
-    'analyze_new_content'
+    'analyze_new_content',
+    'KeywordScorer',
+    'KeywordScore'
 ]
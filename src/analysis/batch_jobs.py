@@ -0,0 +1,239 @@
+"""
+AIbrary TikTok Monitoring System - Gemini Batch Jobs
+Offline batch mode for large analysis backlogs
+
+Backfills (run_analysis_only.py after clearing the AI columns) would issue
+hundreds of synchronous generate_content calls. The Gemini Batch API takes
+the same requests as one job at batch pricing and returns them within hours.
+The google-generativeai SDK has no batch support, so jobs go through the
+REST batchGenerateContent endpoint with inline requests, are polled until
+they finish, and responses are mapped back by request key. Submitted jobs
+are recorded on disk so an interrupted run can collect them instead of
+paying for the same requests twice.
+"""
+
+import base64
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from core.config import DATA_DIR
+from .file_registry import GeminiFileHandle
+
+GEMINI_API_BASE = "https://generativelanguage.googleapis.com/v1beta"
+DEFAULT_JOB_STORE_PATH = os.path.join(DATA_DIR, "gemini_batch_jobs.json")
+
+# Inline batch requests must stay under ~20MB per job; videos go by File API URI
+MAX_INLINE_JOB_BYTES = 18 * 1024 * 1024
+
+TERMINAL_STATES = {"BATCH_STATE_SUCCEEDED", "BATCH_STATE_FAILED", "BATCH_STATE_CANCELLED", "BATCH_STATE_EXPIRED"}
+
+
+@dataclass
+class BatchRequest:
+    """One generate_content request inside a batch job"""
+    key: str
+    contents: Any  # prompt string or list of parts, as passed to generate_content
+    response_schema: Optional[Dict[str, Any]] = None  # JSON output mode
+    metadata: Dict[str, Any] = field(default_factory=dict)  # recorded with the job for recovery
+
+
+class GeminiBatchClient:
+    """Submit, poll and collect Gemini batch jobs over REST"""
+
+    def __init__(
+        self,
+        api_key: str,
+        model_name: str,
+        poll_interval: float = 30,
+        timeout: float = 24 * 3600,
+        max_requests_per_job: int = 500,
+        store_path: Optional[str] = DEFAULT_JOB_STORE_PATH
+    ):
+        self.api_key = api_key
+        self.model_name = model_name
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.max_requests_per_job = max(1, max_requests_per_job)
+        self.store_path = store_path
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------------------------------
+    # Public API
+    # --------------------------------------------------------------------------
+
+    def run(self, batch_requests: List[BatchRequest], display_name: str = "aibrary-analysis") -> Dict[str, Optional[str]]:
+        """Submit all requests (split into jobs), wait, and return {key: response text or None}"""
+        job_names = [
+            self.submit(chunk, f"{display_name}-{i + 1}")
+            for i, chunk in enumerate(self._chunk(batch_requests))
+        ]
+
+        responses: Dict[str, Optional[str]] = {}
+        for job_name in job_names:
+            responses.update(self.wait(job_name))
+        return responses
+
+    def submit(self, batch_requests: List[BatchRequest], display_name: str) -> str:
+        """Create a batch job and record it locally; returns the job name"""
+        body = {
+            "batch": {
+                "display_name": display_name,
+                "input_config": {
+                    "requests": {
+                        "requests": [
+                            {"request": self._to_request(r), "metadata": {"key": r.key}}
+                            for r in batch_requests
+                        ]
+                    }
+                }
+            }
+        }
+        operation = self._request("POST", f"/models/{self.model_name}:batchGenerateContent", json=body)
+        job_name = operation["name"]
+        print(f"   📦 Submitted batch job {job_name} ({len(batch_requests)} requests)")
+
+        self._record_job(job_name, {
+            "model": self.model_name,
+            "submitted_at": time.time(),
+            "requests": {r.key: r.metadata for r in batch_requests}
+        })
+        return job_name
+
+    def wait(self, job_name: str) -> Dict[str, Optional[str]]:
+        """Poll a job until it finishes and return {key: response text or None}"""
+        deadline = time.time() + self.timeout
+        while True:
+            operation = self._request("GET", f"/{job_name}")
+            state = operation.get("metadata", {}).get("state", "")
+            if operation.get("done") or state in TERMINAL_STATES:
+                break
+            if time.time() > deadline:
+                raise TimeoutError(f"Batch job {job_name} not finished after {self.timeout}s (state {state})")
+            print(f"   ⏳ Batch job {job_name}: {state or 'pending'}...")
+            time.sleep(self.poll_interval)
+
+        if "error" in operation or (state and state != "BATCH_STATE_SUCCEEDED"):
+            self._forget_job(job_name)
+            raise RuntimeError(f"Batch job {job_name} ended in state {state}: {operation.get('error')}")
+
+        responses = self._extract_responses(operation)
+        self._forget_job(job_name)
+        print(f"   ✅ Batch job {job_name} finished ({len(responses)} responses)")
+        return responses
+
+    def pending_jobs(self) -> Dict[str, Dict[str, Any]]:
+        """Jobs submitted for this model but never collected (e.g. interrupted run)"""
+        with self._lock:
+            return {
+                name: job for name, job in self._load_store().items()
+                if job.get("model") == self.model_name
+            }
+
+    # --------------------------------------------------------------------------
+    # Internals
+    # --------------------------------------------------------------------------
+
+    def _chunk(self, batch_requests: List[BatchRequest]) -> List[List[BatchRequest]]:
+        """Split by request count and inline payload size"""
+        chunks: List[List[BatchRequest]] = []
+        current: List[BatchRequest] = []
+        current_bytes = 0
+        for request in batch_requests:
+            size = len(json.dumps(self._to_content(request.contents)))
+            if current and (len(current) >= self.max_requests_per_job or current_bytes + size > MAX_INLINE_JOB_BYTES):
+                chunks.append(current)
+                current, current_bytes = [], 0
+            current.append(request)
+            current_bytes += size
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _to_request(self, request: BatchRequest) -> Dict[str, Any]:
+        """REST GenerateContentRequest for one batch entry"""
+        body: Dict[str, Any] = {"contents": [self._to_content(request.contents)]}
+        if request.response_schema:
+            body["generationConfig"] = {"responseMimeType": "application/json", "responseSchema": request.response_schema}
+        return body
+
+    @staticmethod
+    def _to_content(contents: Any) -> Dict[str, Any]:
+        """Convert generate_content-style contents into a REST Content object"""
+        parts = []
+        for part in contents if isinstance(contents, list) else [contents]:
+            if isinstance(part, str):
+                parts.append({"text": part})
+            elif isinstance(part, GeminiFileHandle):
+                parts.append({"fileData": {"mimeType": part.mime_type, "fileUri": part.uri}})
+            elif isinstance(part, dict) and "data" in part:
+                parts.append({"inlineData": {
+                    "mimeType": part["mime_type"],
+                    "data": base64.b64encode(part["data"]).decode("ascii")
+                }})
+            else:
+                raise TypeError(f"Unsupported batch content part: {type(part).__name__}")
+        return {"role": "user", "parts": parts}
+
+    @staticmethod
+    def _extract_responses(operation: Dict[str, Any]) -> Dict[str, Optional[str]]:
+        output = operation.get("response") or operation.get("metadata", {}).get("output", {})
+        inlined = output.get("inlinedResponses", {}).get("inlinedResponses", [])
+
+        responses: Dict[str, Optional[str]] = {}
+        for item in inlined:
+            key = item.get("metadata", {}).get("key")
+            if key is None:
+                continue
+            if "error" in item:
+                print(f"   ⚠️ Batch request {key} failed: {item['error'].get('message', item['error'])}")
+                responses[key] = None
+                continue
+            candidates = item.get("response", {}).get("candidates", [])
+            parts = candidates[0].get("content", {}).get("parts", []) if candidates else []
+            text = "".join(p.get("text", "") for p in parts)
+            responses[key] = text or None
+        return responses
+
+    def _request(self, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        response = requests.request(
+            method, f"{GEMINI_API_BASE}{path}",
+            headers={"x-goog-api-key": self.api_key},
+            timeout=60,
+            **kwargs
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"Gemini batch API {method} {path} failed: {response.status_code} {response.text[:300]}")
+        return response.json()
+
+    def _load_store(self) -> Dict[str, Dict[str, Any]]:
+        if not self.store_path or not os.path.exists(self.store_path):
+            return {}
+        with open(self.store_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_store(self, jobs: Dict[str, Dict[str, Any]]):
+        if not self.store_path:
+            return
+        os.makedirs(os.path.dirname(self.store_path), exist_ok=True)
+        tmp_path = f"{self.store_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(jobs, f)
+        os.replace(tmp_path, self.store_path)
+
+    def _record_job(self, job_name: str, job: Dict[str, Any]):
+        with self._lock:
+            jobs = self._load_store()
+            jobs[job_name] = job
+            self._save_store(jobs)
+
+    def _forget_job(self, job_name: str):
+        with self._lock:
+            jobs = self._load_store()
+            if jobs.pop(job_name, None) is not None:
+                self._save_store(jobs)
@@ -0,0 +1,237 @@
+"""
+AIbrary TikTok Monitoring System - Near-Duplicate Index
+Reuse analysis results for reposts, stitches and cross-posted clips
+
+The same video shows up under different content_ids and hashtags, and each
+copy used to get a full paid analysis. Every analyzed item is indexed by
+- a 64-bit SimHash of its caption + subtitles (hashtags and mentions
+  stripped, since reposts change them), and
+- optionally a 64-bit dHash of a few evenly spaced frames.
+Lookups use LSH banding (4 bands of 16 bits, so any hash within 3 bits of
+a stored one shares a band) and verify candidates by Hamming distance.
+A match for the same strategy and prompt reuses the stored result.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+from core.config import DATA_DIR
+from core.models import AnalysisResult
+
+DEFAULT_DEDUP_INDEX_PATH = os.path.join(DATA_DIR, "dedup_index.sqlite3")
+
+HASH_BITS = 64
+LSH_BANDS = 4
+BAND_BITS = HASH_BITS // LSH_BANDS
+
+_TAGS = re.compile(r"[#@][\w.]+")
+_WORDS = re.compile(r"\w+")
+
+
+def _hash64(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def text_tokens(caption: str, subtitles: str) -> List[str]:
+    """Normalized words of caption + subtitles, without hashtags/mentions"""
+    return _WORDS.findall(_TAGS.sub(" ", f"{caption or ''} {subtitles or ''}").lower())
+
+
+def simhash(tokens: List[str]) -> int:
+    """64-bit SimHash over word unigrams and bigrams (weighted by count)"""
+    features = Counter(tokens)
+    features.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+
+    weights = [0] * HASH_BITS
+    for feature, count in features.items():
+        h = _hash64(feature)
+        for bit in range(HASH_BITS):
+            weights[bit] += count if h >> bit & 1 else -count
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def frame_distance(a: List[int], b: List[int]) -> float:
+    """Mean distance from each frame of a to its closest frame in b (tolerates trims/offsets)"""
+    return sum(min(hamming(x, y) for y in b) for x in a) / len(a)
+
+
+def _bands(value: int) -> List[int]:
+    mask = (1 << BAND_BITS) - 1
+    return [value >> (band * BAND_BITS) & mask for band in range(LSH_BANDS)]
+
+
+def _signed(value: int) -> int:
+    """SQLite integers are signed 64-bit"""
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+
+@dataclass
+class DedupSignature:
+    """What a near-duplicate lookup compares: text SimHash and frame dHashes"""
+    text_hash: Optional[int] = None  # None when there is too little text to compare
+    frame_hashes: List[int] = field(default_factory=list)
+
+    @property
+    def empty(self) -> bool:
+        return self.text_hash is None and not self.frame_hashes
+
+
+@dataclass
+class DuplicateMatch:
+    content_id: str
+    result: AnalysisResult
+    text_distance: Optional[int]
+    frame_distance: Optional[float]
+
+
+class NearDuplicateIndex:
+    """SQLite-backed LSH index of analyzed items"""
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None, path: str = DEFAULT_DEDUP_INDEX_PATH):
+        settings = settings or {}
+        self.text_max_distance = int(settings.get("text_max_distance", 3))
+        self.frame_max_distance = float(settings.get("frame_max_distance", 10))
+        self.min_text_words = int(settings.get("min_text_words", 12))
+
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS dedup_items (
+                content_id TEXT NOT NULL,
+                strategy TEXT NOT NULL,
+                prompt_hash TEXT NOT NULL,
+                text_hash INTEGER,
+                frame_hashes TEXT NOT NULL,
+                result_json TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (content_id, strategy, prompt_hash)
+            );
+            CREATE TABLE IF NOT EXISTS dedup_bands (
+                kind TEXT NOT NULL,
+                band INTEGER NOT NULL,
+                value INTEGER NOT NULL,
+                content_id TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_dedup_bands ON dedup_bands (kind, band, value);
+            """
+        )
+        self._conn.commit()
+
+    def signature(self, caption: str, subtitles: str, frame_hashes: Optional[List[int]] = None) -> DedupSignature:
+        """Signature of an item (text is skipped when too short to be distinctive)"""
+        tokens = text_tokens(caption, subtitles)
+        text_hash = simhash(tokens) if len(tokens) >= self.min_text_words else None
+        return DedupSignature(text_hash=text_hash, frame_hashes=list(frame_hashes or []))
+
+    def find(self, content_id: str, strategy: str, prompt_hash: str, signature: DedupSignature) -> Optional[DuplicateMatch]:
+        """Closest indexed near-duplicate with a result for the same strategy and prompt"""
+        if signature.empty:
+            return None
+
+        with self._lock:
+            candidates = self._candidate_ids(signature) - {str(content_id)}
+            if not candidates:
+                return None
+            rows = self._conn.execute(
+                f"SELECT content_id, text_hash, frame_hashes, result_json FROM dedup_items "
+                f"WHERE strategy = ? AND prompt_hash = ? AND content_id IN ({', '.join('?' for _ in candidates)})",
+                (strategy, prompt_hash, *candidates)
+            ).fetchall()
+
+        best = None
+        for other_id, other_text, other_frames, result_json in rows:
+            match = self._compare(signature, other_text, json.loads(other_frames))
+            if match is None:
+                continue
+            text_distance, frames_distance = match
+            rank = (frames_distance if frames_distance is not None else 0, text_distance if text_distance is not None else 0)
+            if best is None or rank < best[0]:
+                best = (rank, DuplicateMatch(
+                    content_id=other_id,
+                    result=AnalysisResult(**json.loads(result_json)),
+                    text_distance=text_distance,
+                    frame_distance=frames_distance
+                ))
+        return best[1] if best else None
+
+    def add(self, content_id: str, strategy: str, prompt_hash: str, signature: DedupSignature, result: AnalysisResult):
+        """Index an analyzed item (replaces its previous entry for the same strategy/prompt)"""
+        if signature.empty:
+            return
+
+        content_id = str(content_id)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO dedup_items VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    content_id, strategy, prompt_hash,
+                    _signed(signature.text_hash) if signature.text_hash is not None else None,
+                    json.dumps(signature.frame_hashes), json.dumps(asdict(result)), time.time()
+                )
+            )
+            self._conn.execute("DELETE FROM dedup_bands WHERE content_id = ?", (content_id,))
+            self._conn.executemany(
+                "INSERT INTO dedup_bands VALUES (?, ?, ?, ?)",
+                [(kind, band, value, content_id) for kind, band, value in self._band_keys(signature)]
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _band_keys(self, signature: DedupSignature):
+        keys = set()
+        if signature.text_hash is not None:
+            keys.update(("text", band, value) for band, value in enumerate(_bands(signature.text_hash)))
+        for frame_hash in signature.frame_hashes:
+            keys.update(("frame", band, value) for band, value in enumerate(_bands(frame_hash)))
+        return keys
+
+    def _candidate_ids(self, signature: DedupSignature) -> set:
+        candidates = set()
+        for kind, band, value in self._band_keys(signature):
+            rows = self._conn.execute(
+                "SELECT content_id FROM dedup_bands WHERE kind = ? AND band = ? AND value = ?",
+                (kind, band, value)
+            ).fetchall()
+            candidates.update(row[0] for row in rows)
+        return candidates
+
+    def _compare(self, signature: DedupSignature, other_text: Optional[int], other_frames: List[int]):
+        """
+        (text distance, frame distance) if the items are near-duplicates, else None
+        Frames decide when both sides have them (text must also agree if both
+        have enough of it); otherwise the text hashes decide
+        """
+        text_distance = None
+        if signature.text_hash is not None and other_text is not None:
+            text_distance = hamming(signature.text_hash, other_text % (1 << HASH_BITS))
+
+        frames_distance = None
+        if signature.frame_hashes and other_frames:
+            frames_distance = frame_distance(signature.frame_hashes, other_frames)
+            if frames_distance > self.frame_max_distance:
+                return None
+
+        if text_distance is not None and text_distance > self.text_max_distance:
+            return None
+        if text_distance is None and frames_distance is None:
+            return None
+        return text_distance, frames_distance
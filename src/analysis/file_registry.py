@@ -0,0 +1,138 @@
+"""
+AIbrary TikTok Monitoring System - Gemini File Registry
+Upload videos once through the Gemini File API and reuse the handle
+
+Inline video parts hold the whole MP4 in memory and re-send it on every
+call. Uploaded files stay available on Gemini for ~48 hours, so the handle
+is recorded against content_id (with its expiry) and reused across
+strategies, retries and prompt experiments until it is about to expire.
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional
+
+import google.generativeai as genai
+
+from core.config import DATA_DIR
+
+from .media_handle import MediaHandle
+
+DEFAULT_REGISTRY_PATH = os.path.join(DATA_DIR, "gemini_files.json")
+
+# Don't hand out a handle that could expire mid-analysis
+EXPIRY_MARGIN_SECONDS = 15 * 60
+# Files are kept ~48h by Gemini; used when the API doesn't report an expiry
+DEFAULT_TTL_SECONDS = 47 * 3600
+
+
+@dataclass
+class GeminiFileHandle:
+    """An uploaded Gemini file usable as a prompt part"""
+    name: str
+    uri: str
+    mime_type: str
+    expires_at: float
+    size_bytes: int = 0
+    sha256: str = ""
+
+    def is_valid(self, now: Optional[float] = None) -> bool:
+        return (now or time.time()) < self.expires_at - EXPIRY_MARGIN_SECONDS
+
+    def to_part(self) -> genai.protos.Part:
+        return genai.protos.Part(file_data=genai.protos.FileData(mime_type=self.mime_type, file_uri=self.uri))
+
+
+class GeminiFileRegistry:
+    """Maps content_id to live Gemini file handles, persisted to a JSON file"""
+
+    def __init__(self, path: Optional[str] = DEFAULT_REGISTRY_PATH, poll_interval: float = 2.0, processing_timeout: float = 300):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.processing_timeout = processing_timeout
+        self._handles: Dict[str, GeminiFileHandle] = {}
+        self._lock = threading.Lock()
+        # One upload at a time per content_id so concurrent strategies share it
+        self._upload_locks: Dict[str, threading.Lock] = {}
+
+        if path and os.path.exists(path):
+            self._load()
+
+    def get(self, content_id: str) -> Optional[GeminiFileHandle]:
+        """Return a still-valid handle for content_id, if one was recorded"""
+        with self._lock:
+            handle = self._handles.get(content_id)
+            if handle and handle.is_valid():
+                return handle
+            return None
+
+    def invalidate(self, content_id: str):
+        """Forget a handle (e.g. Gemini reported the file as missing)"""
+        with self._lock:
+            if self._handles.pop(content_id, None):
+                self._save_locked()
+
+    def upload(self, content_id: str, media: MediaHandle, sha256: str = "") -> GeminiFileHandle:
+        """Upload a local file to the File API unless a valid handle already exists"""
+        with self._lock:
+            upload_lock = self._upload_locks.setdefault(content_id, threading.Lock())
+
+        with upload_lock:
+            handle = self.get(content_id)
+            if handle:
+                return handle
+
+            # By path: every supported SDK version accepts it and uploads from disk
+            uploaded = genai.upload_file(path=media.path, mime_type=media.mime_type, display_name=f"tiktok_{content_id}")
+            uploaded = self._wait_until_active(uploaded)
+
+            expiration = getattr(uploaded, "expiration_time", None)
+            expires_at = expiration.timestamp() if expiration else time.time() + DEFAULT_TTL_SECONDS
+
+            handle = GeminiFileHandle(
+                name=uploaded.name,
+                uri=uploaded.uri,
+                mime_type=media.mime_type,
+                expires_at=expires_at,
+                size_bytes=media.size_bytes,
+                sha256=sha256
+            )
+            with self._lock:
+                self._handles[content_id] = handle
+                self._save_locked()
+            return handle
+
+    def _wait_until_active(self, uploaded):
+        """Videos are processed asynchronously; poll until the file can be used"""
+        deadline = time.time() + self.processing_timeout
+        while uploaded.state.name == "PROCESSING":
+            if time.time() > deadline:
+                raise TimeoutError(f"Gemini file {uploaded.name} still processing after {self.processing_timeout}s")
+            time.sleep(self.poll_interval)
+            uploaded = genai.get_file(uploaded.name)
+
+        if uploaded.state.name != "ACTIVE":
+            raise RuntimeError(f"Gemini file {uploaded.name} failed processing (state {uploaded.state.name})")
+        return uploaded
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        now = time.time()
+        self._handles = {
+            content_id: handle
+            for content_id, handle in ((cid, GeminiFileHandle(**data)) for cid, data in raw.items())
+            if handle.is_valid(now)
+        }
+
+    def _save_locked(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({cid: asdict(h) for cid, h in self._handles.items()}, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,140 @@
+"""
+AIbrary TikTok Monitoring System - Keyword Relevance Scorer
+Layer 2 validation over config/keyword-lists.json
+
+All category and negative keywords are compiled once into a single
+case-insensitive alternation regex with word boundaries (longest keyword
+first, plural -s/-es allowed), so each caption or subtitle document is
+scored in one pass no matter how many keywords the lists hold. Scoring
+follows the file's scoring_rules: every distinct keyword counts once at its
+highest category weight (caption matches in full, subtitle-only matches at
+1/title_match), then the negative/no-primary penalties, floored at 0.
+check_examples() replays the file's examples block against the scorer.
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from core.config import load_json_config, KEYWORD_LISTS_FILE
+
+NEGATIVE = "__negative__"
+PRIMARY_CATEGORY = "primary_ai_topics"
+
+
+@dataclass
+class KeywordScore:
+    """Relevance score for one item"""
+    score: float
+    passed: bool
+    matches: Counter = field(default_factory=Counter)
+    categories: Set[str] = field(default_factory=set)
+    negative: bool = False
+    min_score_to_pass: float = 15
+
+    def as_ten_point(self) -> int:
+        """Map onto the 0-10 pre-screen scale (the pass mark lands on 5)"""
+        return max(0, min(10, int(round(self.score * 5 / self.min_score_to_pass))))
+
+
+class KeywordScorer:
+    """Compiled multi-pattern keyword matcher with weighted scoring"""
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        if settings is None:
+            settings = load_json_config(KEYWORD_LISTS_FILE)
+
+        rules = settings.get("scoring_rules", {})
+        self.min_score_to_pass = float(rules.get("min_score_to_pass", 15))
+        bonuses = rules.get("bonus_multipliers", {})
+        self.title_bonus = float(bonuses.get("title_match", 2.0))
+        self.hashtag_bonus = float(bonuses.get("hashtag_match", 1.0))
+        self.multi_category_bonus = float(bonuses.get("multiple_categories", 1.0))
+        penalties = rules.get("penalties", {})
+        self.negative_penalty = float(penalties.get("negative_keyword_found", -20))
+        self.no_primary_penalty = float(penalties.get("no_primary_match", -5))
+
+        # lowercased keyword -> [(category, weight), ...] (a keyword can sit in several categories)
+        self.lookup: Dict[str, List[Tuple[str, float]]] = {}
+        for category, spec in settings.get("categories", {}).items():
+            weight = float(spec.get("weight", 1))
+            for keyword in spec.get("keywords", []):
+                self.lookup.setdefault(keyword.lower(), []).append((category, weight))
+        for keyword in settings.get("negative_keywords", {}).get("keywords", []):
+            self.lookup.setdefault(keyword.lower(), []).append((NEGATIVE, 0.0))
+
+        # Longest first so "AI agent" wins over "AI" at the same position;
+        # multi-word keywords tolerate any run of whitespace between words and
+        # an optional plural suffix sits outside the captured keyword
+        alternation = "|".join(
+            r"\s+".join(re.escape(word) for word in k.split())
+            for k in sorted(self.lookup, key=len, reverse=True)
+        )
+        self.pattern = re.compile(rf"(?<!\w)(#?)({alternation})(?:e?s)?(?!\w)", re.IGNORECASE)
+
+    def score(self, caption: str = "", subtitles: str = "") -> KeywordScore:
+        """Score one item: each keyword counts once, caption matches in full"""
+        matches: Counter = Counter()
+        best: Dict[str, float] = {}  # keyword -> strongest multiplier it was seen with
+        categories: Set[str] = set()
+        negative = False
+
+        for text, multiplier in ((caption, 1.0), (subtitles, 1.0 / self.title_bonus)):
+            if not text:
+                continue
+            for match in self.pattern.finditer(text):
+                keyword = " ".join(match.group(2).lower().split())
+                matches[keyword] += 1
+                bonus = multiplier * self.hashtag_bonus if match.group(1) else multiplier
+                best[keyword] = max(best.get(keyword, 0.0), bonus)
+
+        total = 0.0
+        for keyword, bonus in best.items():
+            weights = [w for category, w in self.lookup[keyword] if category != NEGATIVE]
+            if len(weights) < len(self.lookup[keyword]):
+                negative = True
+            categories.update(c for c, _ in self.lookup[keyword] if c != NEGATIVE)
+            if weights:
+                total += max(weights) * bonus
+
+        if len(categories) > 1:
+            total *= self.multi_category_bonus
+        if negative:
+            total += self.negative_penalty
+        if PRIMARY_CATEGORY not in categories:
+            total += self.no_primary_penalty
+        total = max(0.0, total)
+
+        return KeywordScore(
+            score=total,
+            passed=total >= self.min_score_to_pass,
+            matches=matches,
+            categories=categories,
+            negative=negative,
+            min_score_to_pass=self.min_score_to_pass
+        )
+
+    def score_batch(self, items: Iterable[Tuple[str, str]]) -> List[KeywordScore]:
+        """Score many (caption, subtitles) pairs with the same compiled automaton"""
+        return [self.score(caption, subtitles) for caption, subtitles in items]
+
+
+def check_examples(settings: Optional[Dict[str, Any]] = None) -> List[str]:
+    """Score every entry of the examples block; return one line per mismatch"""
+    if settings is None:
+        settings = load_json_config(KEYWORD_LISTS_FILE)
+    scorer = KeywordScorer(settings)
+
+    problems = []
+    for name, example in settings.get("examples", {}).items():
+        result = scorer.score(example.get("text", ""))
+        expected = float(example.get("expected_score", 0))
+        if abs(result.score - expected) > 1e-6:
+            problems.append(f"{name}: scored {result.score:g}, expected {expected:g}")
+        expected_matches = {k.lower() for k in example.get("matches", [])}
+        if "matches" in example and set(result.matches) != expected_matches:
+            problems.append(
+                f"{name}: matched {sorted(result.matches)}, expected {sorted(expected_matches)}"
+            )
+    return problems
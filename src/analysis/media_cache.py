@@ -0,0 +1,272 @@
+"""
+AIbrary TikTok Monitoring System - Media Cache
+Content-addressed on-disk cache for downloaded videos and subtitles
+
+Blobs are stored once per SHA-256 under objects/ and an index maps
+(kind, content_id) to the blob hash with a last-access time. The cache
+enforces a byte budget by evicting least-recently-used blobs, writes every
+blob atomically (temp file + rename), and serializes index updates with a
+thread lock plus an advisory file lock so concurrent workers and processes
+can share one cache directory.
+
+Pins (blobs handed out and not yet released) are recorded per process in
+the index, so no process evicts a blob another one is still reading; pins
+of processes that have exited are ignored. Cache hits only touch an
+in-memory access time, written to the index in batches.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows - thread lock only
+    fcntl = None
+
+from core.config import DATA_DIR
+
+DEFAULT_CACHE_DIR = os.path.join(DATA_DIR, "media_cache")
+
+# Buffered last-access updates are written once this many pile up or this old
+LRU_FLUSH_ENTRIES = 64
+LRU_FLUSH_SECONDS = 60
+
+
+class MediaCache:
+    """LRU byte-budgeted media cache keyed by content_id and content hash"""
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR, max_bytes: int = 2 * 1024 ** 3):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.objects_dir = os.path.join(root, "objects")
+        self.index_path = os.path.join(root, "index.json")
+        self.lock_path = os.path.join(root, "index.lock")
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._index: Dict[str, Dict] = {}
+        self._index_mtime = None
+        # Blobs handed out and not yet released are never evicted: sha256 -> {pid: count}
+        self._pins: Dict[str, Dict[str, int]] = {}
+        # Cache hits not yet written to the index: key -> last access
+        self._touched: Dict[str, float] = {}
+        self._last_flush = time.time()
+
+    # --------------------------------------------------------------------------
+    # Public API
+    # --------------------------------------------------------------------------
+
+    def get_path(self, kind: str, content_id: str, pin: bool = True) -> Optional[str]:
+        """Return the cached blob path for (kind, content_id) and mark it recently used"""
+        key = self._key(kind, content_id)
+        if pin:
+            # Other processes must see the pin before they next evict
+            with self._locked_index() as index:
+                entry = index.get(key)
+                if not entry or not os.path.exists(self._blob_path(entry["sha256"])):
+                    index.pop(key, None)
+                    return None
+                entry["last_access"] = time.time()
+                self._pin(entry["sha256"])
+                return self._blob_path(entry["sha256"])
+
+        with self._lock:
+            self._reload_if_changed()
+            entry = self._index.get(key)
+            if not entry or not os.path.exists(self._blob_path(entry["sha256"])):
+                return None
+            self._touched[key] = time.time()
+            if len(self._touched) >= LRU_FLUSH_ENTRIES or time.time() - self._last_flush >= LRU_FLUSH_SECONDS:
+                self.flush()
+            return self._blob_path(entry["sha256"])
+
+    def content_hash(self, kind: str, content_id: str) -> Optional[str]:
+        """SHA-256 of the cached blob for (kind, content_id), if cached"""
+        with self._lock:
+            self._reload_if_changed()
+            entry = self._index.get(self._key(kind, content_id))
+            return entry["sha256"] if entry else None
+
+    def put_stream(self, kind: str, content_id: str, chunks: Iterable[bytes], pin: bool = True) -> str:
+        """Stream chunks into the cache atomically and return the blob path"""
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.objects_dir, prefix=".incoming_")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    if chunk:
+                        f.write(chunk)
+                        digest.update(chunk)
+                        size += len(chunk)
+            sha256 = digest.hexdigest()
+            blob_path = self._blob_path(sha256)
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            # Identical content may already be cached under another content_id
+            if os.path.exists(blob_path):
+                os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, blob_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._locked_index() as index:
+            index[self._key(kind, content_id)] = {"sha256": sha256, "size": size, "last_access": time.time()}
+            if pin:
+                self._pin(sha256)
+            self._evict(index)
+        return blob_path
+
+    def get_text(self, kind: str, content_id: str) -> Optional[str]:
+        path = self.get_path(kind, content_id, pin=False)
+        if path is None:
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def put_text(self, kind: str, content_id: str, text: str) -> str:
+        return self.put_stream(kind, content_id, [text.encode("utf-8")], pin=False)
+
+    def release(self, path: str):
+        """Unpin a blob returned by get_path/put_stream so it can be evicted"""
+        sha256 = os.path.basename(path)
+        pid = str(os.getpid())
+        with self._locked_index():
+            pins = self._pins.get(sha256, {})
+            count = pins.get(pid, 0) - 1
+            if count > 0:
+                pins[pid] = count
+            else:
+                pins.pop(pid, None)
+            if not pins:
+                self._pins.pop(sha256, None)
+
+    def flush(self):
+        """Write buffered last-access times to the index"""
+        with self._lock:
+            if self._touched:
+                with self._locked_index():
+                    pass
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            self._reload_if_changed()
+            return sum(size for size in self._blob_sizes(self._index).values())
+
+    # --------------------------------------------------------------------------
+    # Internals
+    # --------------------------------------------------------------------------
+
+    @staticmethod
+    def _key(kind: str, content_id: str) -> str:
+        return f"{kind}:{content_id}"
+
+    def _blob_path(self, sha256: str) -> str:
+        return os.path.join(self.objects_dir, sha256[:2], sha256)
+
+    def _pin(self, sha256: str):
+        pins = self._pins.setdefault(sha256, {})
+        pid = str(os.getpid())
+        pins[pid] = pins.get(pid, 0) + 1
+
+    def _pinned(self, sha256: str) -> bool:
+        """Whether a running process holds the blob (pins of exited processes are dropped)"""
+        pins = self._pins.get(sha256, {})
+        for pid in [p for p in pins if not self._process_alive(int(p))]:
+            del pins[pid]
+        if not pins:
+            self._pins.pop(sha256, None)
+        return bool(pins)
+
+    @staticmethod
+    def _process_alive(pid: int) -> bool:
+        if pid == os.getpid() or os.name == "nt":  # os.kill would terminate it on Windows
+            return True
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    @staticmethod
+    def _blob_sizes(index: Dict[str, Dict]) -> Dict[str, int]:
+        return {entry["sha256"]: entry["size"] for entry in index.values()}
+
+    def _evict(self, index: Dict[str, Dict]):
+        """Drop least-recently-used blobs until the cache fits the byte budget"""
+        sizes = self._blob_sizes(index)
+        total = sum(sizes.values())
+        if total <= self.max_bytes:
+            return
+
+        # A blob's recency is the most recent access through any of its keys
+        last_access: Dict[str, float] = {}
+        for entry in index.values():
+            last_access[entry["sha256"]] = max(last_access.get(entry["sha256"], 0), entry["last_access"])
+
+        for sha256 in sorted(last_access, key=last_access.get):
+            if total <= self.max_bytes:
+                break
+            if self._pinned(sha256):
+                continue
+            for key in [k for k, e in index.items() if e["sha256"] == sha256]:
+                del index[key]
+            try:
+                os.remove(self._blob_path(sha256))
+            except FileNotFoundError:
+                pass
+            total -= sizes[sha256]
+
+    def _reload_if_changed(self):
+        try:
+            mtime = os.stat(self.index_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime != self._index_mtime:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            # Indexes written before pins were shared hold the entries only
+            if "entries" not in data:
+                data = {"entries": data, "pins": {}}
+            self._index, self._pins = data["entries"], data["pins"]
+            self._index_mtime = mtime
+
+    def _apply_touched(self):
+        for key, last_access in self._touched.items():
+            entry = self._index.get(key)
+            if entry:
+                entry["last_access"] = max(entry["last_access"], last_access)
+        self._touched.clear()
+        self._last_flush = time.time()
+
+    @contextmanager
+    def _locked_index(self):
+        """Yield the index under thread + file lock and persist it afterwards"""
+        with self._lock:
+            lock_file = open(self.lock_path, "a")
+            try:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._reload_if_changed()
+                self._apply_touched()
+                yield self._index
+
+                tmp_path = f"{self.index_path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"entries": self._index, "pins": self._pins}, f)
+                os.replace(tmp_path, self.index_path)
+                self._index_mtime = os.stat(self.index_path).st_mtime_ns
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                lock_file.close()
@@ -0,0 +1,78 @@
+"""
+AIbrary TikTok Monitoring System - Media Handles
+Hand downloaded videos to consumers without keeping whole-file copies around
+
+Inline analysis used to read the downloaded file back with f.read() and
+keep the bytes in a dict for as long as the item was in flight. A
+MediaHandle wraps the file on disk instead:
+- inline parts: small clips (up to buffer_max_bytes) are read once into a
+  buffer reused across strategies, escalations and retries; larger files
+  are read per call and released with the request. An inline request
+  always carries the whole video, so only the File API avoids that copy
+- stream: a chunked reader for hashing and cache writes, holding one
+  chunk at a time (File API uploads go by path and read from disk)
+"""
+
+import hashlib
+import os
+import threading
+from typing import BinaryIO, Iterator, Optional
+
+import google.generativeai as genai
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+DEFAULT_BUFFER_MAX_BYTES = 4 * 1024 * 1024
+
+
+class MediaHandle:
+    """Read access to one media file on disk: inline part (buffered when small) or stream"""
+
+    def __init__(self, path: str, mime_type: str = "video/mp4", buffer_max_bytes: int = DEFAULT_BUFFER_MAX_BYTES):
+        self.path = path
+        self.mime_type = mime_type
+        self.size_bytes = os.path.getsize(path)
+        self.buffered = self.size_bytes <= buffer_max_bytes
+        self._buffer: Optional[bytes] = None
+        self._lock = threading.Lock()
+        self.closed = False
+
+    def inline_part(self) -> genai.protos.Part:
+        """
+        Inline prompt part for the whole file
+        Small clips reuse the handle's buffer; larger files are read for this
+        call only, so no copy outlives the request
+        """
+        with self._lock:
+            if self.closed:
+                raise ValueError(f"Media handle for {self.path} is closed")
+            if self.buffered:
+                if self._buffer is None:
+                    self._buffer = self._read()
+                data = self._buffer
+        if not self.buffered:
+            data = self._read()
+        return genai.protos.Part(inline_data=genai.protos.Blob(mime_type=self.mime_type, data=data))
+
+    def _read(self) -> bytes:
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def reader(self) -> BinaryIO:
+        """Fresh file object for streaming consumers (caller closes it)"""
+        return open(self.path, "rb")
+
+    def chunks(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        with self.reader() as f:
+            yield from iter(lambda: f.read(chunk_size), b"")
+
+    def sha256(self) -> str:
+        digest = hashlib.sha256()
+        for chunk in self.chunks():
+            digest.update(chunk)
+        return digest.hexdigest()
+
+    def close(self):
+        """Drop the buffer (idempotent; the file itself is left alone)"""
+        with self._lock:
+            self.closed = True
+            self._buffer = None
@@ -0,0 +1,164 @@
+"""
+AIbrary TikTok Monitoring System - Media Prefetch
+Producer/consumer pipeline overlapping media downloads with model inference
+
+Download workers fetch subtitles and videos for upcoming items while the
+analysis workers are waiting on Gemini for earlier ones. Downloads stop
+being admitted once the buffered (downloaded but not yet analyzed) bytes
+reach the budget, so a slow model cannot make the pipeline fill the disk.
+"""
+
+import hashlib
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from core import TikTokContent
+
+from .media_handle import MediaHandle
+
+
+@dataclass
+class PreparedMedia:
+    """Subtitles and downloaded video (or reusable Gemini file) for one content item"""
+    subtitles: str = ""
+    video_file: Optional[str] = None
+    video: Optional[MediaHandle] = None  # how consumers read video_file (inline part/stream)
+    file_handle: Optional[Any] = None  # GeminiFileHandle when already uploaded
+    keyframes: List[bytes] = field(default_factory=list, repr=False)  # JPEGs (keyframes mode)
+    video_sha256: str = ""
+    size_bytes: int = 0
+    download_seconds: float = 0.0  # subtitle + video fetch time (usage metrics)
+    reported_download_seconds: float = 0.0  # part of it already attached to a model call
+    owns_file: bool = True  # False when video_file lives in the media cache
+    close_callbacks: List[Callable[["PreparedMedia"], None]] = field(default_factory=list, repr=False)
+    budget_callbacks: List[Callable[[], None]] = field(default_factory=list, repr=False)  # prefetch reservation
+    closed: bool = False
+
+    def media_hash(self) -> str:
+        """Fingerprint of what the model sees: video bytes (or keyframes) plus subtitle text"""
+        digest = hashlib.sha256()
+        digest.update(self.video_sha256.encode("utf-8") if self.has_video else b"no-video")
+        digest.update(b"\0")
+        if self.keyframes:
+            for frame in self.keyframes:
+                digest.update(hashlib.sha256(frame).digest())
+            digest.update(b"\0")
+        digest.update(self.subtitles.encode("utf-8"))
+        return digest.hexdigest()
+
+    def take_download_seconds(self) -> float:
+        """Download time not yet attached to a model call, so escalations and retries don't count it again"""
+        seconds = self.download_seconds - self.reported_download_seconds
+        self.reported_download_seconds = self.download_seconds
+        return seconds
+
+    @property
+    def has_video(self) -> bool:
+        return self.video_file is not None or self.file_handle is not None
+
+    def release_budget(self):
+        """Give back the prefetch reservation before close, e.g. while the item waits for a grouped request (idempotent)"""
+        callbacks, self.budget_callbacks = self.budget_callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def close(self):
+        """Delete the temporary video and release cache pins / prefetch budget (idempotent)"""
+        if self.closed:
+            return
+        self.closed = True
+
+        if self.video:
+            self.video.close()
+        if self.owns_file and self.video_file and os.path.exists(self.video_file):
+            try:
+                os.remove(self.video_file)
+                print(f"   🗑️ Cleaned up temporary video file")
+            except Exception as e:
+                print(f"   ⚠️ Failed to cleanup video file: {e}")
+
+        for callback in self.close_callbacks:
+            callback(self)
+        self.release_budget()
+
+
+class MediaPrefetcher:
+    """
+    Prefetches media for a list of content items in order, bounded by bytes
+
+    Usage:
+        with MediaPrefetcher(analyzer, content_list) as prefetcher:
+            media = prefetcher.get(content)  # blocks until downloaded
+            ...                              # media.close() releases budget
+    """
+
+    def __init__(self, analyzer, content_list: Iterable[TikTokContent], workers: int = 2, max_buffered_bytes: int = 512 * 1024 * 1024):
+        self.analyzer = analyzer
+        self.max_buffered_bytes = max_buffered_bytes
+        self.buffered_bytes = 0
+        self._budget = threading.Condition()
+        self._stopped = False
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="prefetch")
+
+        # Submit in list order so downloads run ahead of the analysis workers
+        self._futures: Dict[int, Future] = {}
+        for content in content_list:
+            if analyzer.needs_media(content):
+                self._futures[id(content)] = self._executor.submit(self._download, content)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+
+    def get(self, content: TikTokContent) -> Optional[PreparedMedia]:
+        """Wait for the item's media; None if it was never scheduled or failed"""
+        future = self._futures.pop(id(content), None)
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"   ⚠️ Prefetch failed for {content.content_id}: {e}")
+            return None
+
+    def shutdown(self):
+        """Stop admitting downloads and clean up media nobody consumed"""
+        with self._budget:
+            self._stopped = True
+            self._budget.notify_all()
+
+        self._executor.shutdown(wait=True)
+        for future in self._futures.values():
+            if future.done() and future.exception() is None and future.result() is not None:
+                future.result().close()
+        self._futures.clear()
+
+    def _download(self, content: TikTokContent) -> Optional[PreparedMedia]:
+        # Backpressure: wait while the buffer is full (an empty buffer always
+        # admits one item so a single oversized video cannot stall the pipeline)
+        with self._budget:
+            while not self._stopped and self.buffered_bytes >= self.max_buffered_bytes and self.buffered_bytes > 0:
+                self._budget.wait()
+            if self._stopped:
+                return None
+
+        # Pre-screened items only get subtitles here; the analyzer attaches the
+        # video once the item passes the pre-screen
+        media = self.analyzer.prepare_media(content, include_video=not self.analyzer.uses_prescreen(content))
+        # Release exactly what was reserved, even if the consumer attaches more later
+        reserved = media.size_bytes
+        media.budget_callbacks.append(lambda: self._release(reserved))
+
+        with self._budget:
+            self.buffered_bytes += reserved
+        return media
+
+    def _release(self, size_bytes: int):
+        with self._budget:
+            self.buffered_bytes -= size_bytes
+            self._budget.notify_all()
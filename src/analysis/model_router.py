@@ -0,0 +1,62 @@
+"""
+AIbrary TikTok Monitoring System - Model Router
+Pick the Gemini model per strategy and call type, and escalate when needed
+
+Every call used to go to one model. Routing (quality-thresholds.json,
+model_routing) maps each kind of call - prescreen, text, grouped,
+keyframes, video - to a named tier ("fast", "strong", ...), with
+per-strategy overrides. Results from a cheaper tier escalate to a stronger
+one when their score is borderline or the response could not be parsed.
+With routing disabled every call uses the default model.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from core.models import AnalysisResult
+
+CALL_KINDS = ("prescreen", "text", "grouped", "keyframes", "video")
+DEFAULT_TIER = "default"
+
+
+class ModelRouter:
+    """Tier selection and escalation rules for model calls"""
+
+    def __init__(self, settings: Optional[Dict[str, Any]], default_model: str):
+        settings = settings or {}
+        self.default_model = default_model
+        self.enabled = bool(settings.get("enabled"))
+        self.tiers: Dict[str, str] = {DEFAULT_TIER: default_model, **settings.get("tiers", {})}
+        self.defaults: Dict[str, str] = settings.get("defaults", {})
+        self.strategies: Dict[str, Dict[str, Any]] = settings.get("strategies", {})
+        self.escalation: Dict[str, Any] = settings.get("escalation", {})
+
+    def tier_for(self, strategy: Optional[str], kind: str) -> str:
+        """Tier for a call kind (see CALL_KINDS) under a strategy"""
+        if not self.enabled:
+            return DEFAULT_TIER
+        overrides = self.strategies.get(strategy, {})
+        return overrides.get(kind) or self.defaults.get(kind) or DEFAULT_TIER
+
+    def model_for(self, tier: str) -> str:
+        return self.tiers.get(tier, self.default_model) if self.enabled else self.default_model
+
+    def models(self) -> List[str]:
+        """Every model a call can be routed to"""
+        return list(dict.fromkeys(self.tiers.values())) if self.enabled else [self.default_model]
+
+    def escalation_tier(self, strategy: Optional[str], tier: str, result: Optional[AnalysisResult]) -> Optional[str]:
+        """Stronger tier to re-run a result on, or None to keep it"""
+        if not self.enabled or result is None:
+            return None
+
+        rules = {**self.escalation, **self.strategies.get(strategy, {}).get("escalation", {})}
+        target = rules.get("to")
+        if not target or target == tier or tier not in rules.get("from", []):
+            return None
+
+        if result.error and rules.get("on_parse_error", True):
+            return target
+        borderline = rules.get("borderline_scores")
+        if borderline and result.strategic_score is not None and borderline[0] <= result.strategic_score <= borderline[1]:
+            return target
+        return None
@@ -4,50 +4,103 @@ Parse AI model responses into structured data
 """
 
 import re
-from core.models import AnalysisResult
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
+from core.json_codec import loads, dumps
+from core.models import AnalysisResult
+from .prompts import CONTENT_TYPES, NICHE_CATEGORIES
+
+
+# ==============================================================================
+# SHARED PARSER ENGINE
+# ==============================================================================
+# Patterns are compiled once; each response is scanned once for "**Label:**"
+# headers and split into sections, and fields are read from their section
+
+# Any bold span; spans ending in ":" are section headers
+_BOLD_SPAN = re.compile(r'\*\*([^*\n]{1,80}?)\*\*')
+_LEADING_INT = re.compile(r'\s*(\d+)')
+_LEADING_WORD = re.compile(r'\s*([a-zA-Z_]+)')
+_FIRST_LINE = re.compile(r'\s*([^\n]+)')
+_OUT_OF_TEN = re.compile(r'(\d+)\s*/\s*10')
+
+STAGE1_LABEL = "stage 1 - content analysis"
+
+# Exact (case-insensitive) niche category lookup; partial matches are memoized
+_NICHE_LOOKUP = {category.lower(): category for category in NICHE_CATEGORIES}
+
+
+class ResponseSections:
+    """Single-pass split of a markdown response into labelled sections"""
+
+    def __init__(self, response_text: str):
+        self.text = response_text
+        self.sections: Dict[str, List[str]] = {}
+        self.stage1: Optional[str] = None
+
+        headers = []  # (label, header start, body start)
+        stage1_start = None
+        stage2_start = None
+        for match in _BOLD_SPAN.finditer(response_text):
+            inner = match.group(1).strip()
+            label = inner.rstrip(':').strip().lower()
+            if stage2_start is None and label.startswith("stage 2"):
+                stage2_start = match.start()
+            if inner.endswith(':'):
+                headers.append((label, match.start(), match.end()))
+                if stage1_start is None and label == STAGE1_LABEL:
+                    stage1_start = match.end()
+
+        for i, (label, _, body_start) in enumerate(headers):
+            body_end = headers[i + 1][1] if i + 1 < len(headers) else len(response_text)
+            self.sections.setdefault(label, []).append(response_text[body_start:body_end])
+
+        # Stage 1 runs to the Stage 2 header, keeping any bold labels inside it
+        if stage1_start is not None:
+            stage1_end = stage2_start if stage2_start is not None and stage2_start > stage1_start else len(response_text)
+            self.stage1 = response_text[stage1_start:stage1_end].strip()
+
+    def first(self, label: str, pattern: re.Pattern) -> Optional[str]:
+        """First group of pattern at the start of any section with this label"""
+        for body in self.sections.get(label, ()):
+            match = pattern.match(body)
+            if match:
+                return match.group(1)
+        return None
+
+    def block(self, label: str) -> str:
+        """Section text up to the next bold line (e.g. the numbered insights list)"""
+        for body in self.sections.get(label, ()):
+            return body.split('\n**', 1)[0].strip()
+        return ""
+
+
+def _parse_two_stage(response_text: str) -> Tuple[ResponseSections, str, int, str]:
+    """Fields shared by the two-stage strategy prompts"""
+    sections = ResponseSections(response_text)
+
+    # Fallback: use first 200 chars if structure not found
+    general_analysis = sections.stage1 if sections.stage1 is not None else response_text[:200].strip()
 
-def parse_competitor_intelligence_response(content_id: str, response_text: str) -> AnalysisResult:
-    """Parse two-stage AI response into AnalysisResult"""
+    # Strategic Score - pattern: "**Score:** 8/10"
+    score = sections.first("score", _LEADING_INT)
+    strategic_score = min(int(score), 10) if score else 5
 
-    # Default values
-    general_analysis = ""
-    strategic_score = 5
-    content_type = "other"
-    strategic_insights = ""
+    # Strategic Insights - pattern: "**Strategic Insights:**\n1. [text]\n2. [text]"
+    strategic_insights = sections.block("strategic insights")
 
-    # Extract Stage 1 - General Analysis
-    stage1_match = re.search(r'\*\*STAGE 1 - Content Analysis:\*\*\s*(.*?)(?=\*\*STAGE 2|$)', response_text, re.IGNORECASE | re.DOTALL)
-    if stage1_match:
-        general_analysis = stage1_match.group(1).strip()
-    else:
-        # Fallback: use first 200 chars if structure not found
-        general_analysis = response_text[:200].strip()
+    return sections, general_analysis, strategic_score, strategic_insights
 
-    # Extract Stage 2 Strategic Fields
 
-    # Strategic Score - pattern: "**Score:** 8/10"
-    score_match = re.search(r'\*\*score:\*\*\s*(\d+)', response_text, re.IGNORECASE)
-    if score_match:
-        strategic_score = min(int(score_match.group(1)), 10)
+def parse_competitor_intelligence_response(content_id: str, response_text: str) -> AnalysisResult:
+    """Parse two-stage AI response into AnalysisResult"""
+    sections, general_analysis, strategic_score, strategic_insights = _parse_two_stage(response_text)
 
     # Content Type - pattern: "**Content Type:** book_content"
-    content_type_match = re.search(r'\*\*content type:\*\*\s*([a-zA-Z_]+)', response_text, re.IGNORECASE)
-    if content_type_match:
-        content_type = content_type_match.group(1).lower()
+    content_type = (sections.first("content type", _LEADING_WORD) or "other").lower()
 
-    # Strategic Insights - pattern: "**Strategic Insights:**\n1. [text]\n2. [text]"
-    # Extract the entire numbered list section
-    insights_match = re.search(r'\*\*strategic insights:\*\*\s*((?:\d+\..*?(?=\n\d+\.|\n\*\*|$))+)', response_text, re.IGNORECASE | re.DOTALL)
-    if insights_match:
-        strategic_insights = insights_match.group(1).strip()
-    else:
-        # Fallback: try to get any text after Strategic Insights
-        fallback_match = re.search(r'\*\*strategic insights:\*\*\s*(.*?)(?=\n\*\*|$)', response_text, re.IGNORECASE | re.DOTALL)
-        if fallback_match:
-            strategic_insights = fallback_match.group(1).strip()
-
-    result = AnalysisResult(
+    return AnalysisResult(
         content_id=content_id,
         general_analysis=general_analysis,
         strategic_score=strategic_score,
@@ -56,72 +109,16 @@ def parse_competitor_intelligence_response(content_id: str, response_text: str)
         summary=f"Strategic Score: {strategic_score}/10 | Type: {content_type}"
     )
 
-    return result
-
 
 def parse_niche_deepdive_response(content_id: str, response_text: str) -> AnalysisResult:
     """Parse niche deep-dive AI response into AnalysisResult"""
-
-    # Default values
-    general_analysis = ""
-    strategic_score = 5
-    niche_category = "Other"  # Default to "Other" if not found
-    strategic_insights = ""
-
-    # Extract Stage 1 - Content Analysis
-    stage1_match = re.search(r'\*\*STAGE 1 - Content Analysis:\*\*\s*(.*?)(?=\*\*STAGE 2|$)', response_text, re.IGNORECASE | re.DOTALL)
-    if stage1_match:
-        general_analysis = stage1_match.group(1).strip()
-    else:
-        # Fallback: use first 200 chars if structure not found
-        general_analysis = response_text[:200].strip()
-
-    # Extract Stage 2 Strategic Fields
-
-    # Strategic Score - pattern: "**Score:** 8/10"
-    score_match = re.search(r'\*\*score:\*\*\s*(\d+)', response_text, re.IGNORECASE)
-    if score_match:
-        strategic_score = min(int(score_match.group(1)), 10)
+    sections, general_analysis, strategic_score, strategic_insights = _parse_two_stage(response_text)
 
     # Niche Category - pattern: "**Niche Category:** Books & Reading"
-    # Valid categories: Podcasts & Audio Learning, Books & Reading, Productivity & Habits,
-    #                   AI in Education, Upskilling & Career, Knowledge Management, Other
-    category_match = re.search(r'\*\*niche category:\*\*\s*([^\n]+)', response_text, re.IGNORECASE)
-    if category_match:
-        raw_category = category_match.group(1).strip()
-        # Validate against known categories
-        valid_categories = [
-            "Podcasts & Audio Learning",
-            "Books & Reading",
-            "Productivity & Habits",
-            "AI in Education",
-            "Upskilling & Career",
-            "Knowledge Management",
-            "Other"
-        ]
-        # Try exact match first (case-insensitive)
-        for valid_cat in valid_categories:
-            if raw_category.lower() == valid_cat.lower():
-                niche_category = valid_cat
-                break
-        else:
-            # Fallback: partial match
-            for valid_cat in valid_categories:
-                if valid_cat.lower() in raw_category.lower() or raw_category.lower() in valid_cat.lower():
-                    niche_category = valid_cat
-                    break
+    raw_category = sections.first("niche category", _FIRST_LINE)
+    niche_category = _match_niche_category(raw_category.strip()) if raw_category else "Other"
 
-    # Strategic Insights - pattern: "**Strategic Insights:**\n1. [text]\n2. [text]"
-    insights_match = re.search(r'\*\*strategic insights:\*\*\s*((?:\d+\..*?(?=\n\d+\.|\n\*\*|$))+)', response_text, re.IGNORECASE | re.DOTALL)
-    if insights_match:
-        strategic_insights = insights_match.group(1).strip()
-    else:
-        # Fallback: try to get any text after Strategic Insights
-        fallback_match = re.search(r'\*\*strategic insights:\*\*\s*(.*?)(?=\n\*\*|$)', response_text, re.IGNORECASE | re.DOTALL)
-        if fallback_match:
-            strategic_insights = fallback_match.group(1).strip()
-
-    result = AnalysisResult(
+    return AnalysisResult(
         content_id=content_id,
         general_analysis=general_analysis,
         strategic_score=strategic_score,
@@ -130,7 +127,168 @@ def parse_niche_deepdive_response(content_id: str, response_text: str) -> Analys
         summary=f"Strategic Score: {strategic_score}/10 | Niche: {niche_category}"
     )
 
-    return result
+
+@lru_cache(maxsize=1024)
+def _match_niche_category(raw_category: str) -> str:
+    """Validate against known categories: exact (case-insensitive), then partial match"""
+    lowered = raw_category.lower()
+    if lowered in _NICHE_LOOKUP:
+        return _NICHE_LOOKUP[lowered]
+    for valid_lower, valid_cat in _NICHE_LOOKUP.items():
+        if valid_lower in lowered or lowered in valid_lower:
+            return valid_cat
+    return "Other"
+
+
+def _load_json(response_text: str) -> Any:
+    """Decode a JSON-mode response (tolerating ```json fences); None if it isn't JSON"""
+    text = response_text.strip()
+    if text.startswith("```"):
+        text = re.sub(r'^```(?:json)?\s*|\s*```$', '', text)
+    try:
+        return loads(text)
+    except ValueError:
+        return None
+
+
+def _load_structured(response_text: str) -> Optional[Dict[str, Any]]:
+    """Decode a JSON-mode response; None if it isn't a JSON object"""
+    data = _load_json(response_text)
+    return data if isinstance(data, dict) else None
+
+
+def split_grouped_response(response_text: str) -> Dict[str, str]:
+    """
+    Split a grouped (JSON array) response into per-item JSON texts keyed by
+    item_id, for the single-item JSON parsers. Entries without an id and ids
+    that appear more than once are dropped (the caller retries those items)
+    """
+    data = _load_json(response_text)
+    if not isinstance(data, list):
+        return {}
+
+    items: Dict[str, str] = {}
+    duplicated = set()
+    for entry in data:
+        if not isinstance(entry, dict) or entry.get("item_id") in (None, ""):
+            continue
+        item_id = str(entry["item_id"]).strip()
+        if item_id in items:
+            duplicated.add(item_id)
+        items[item_id] = dumps(entry)
+    for item_id in duplicated:
+        del items[item_id]
+    return items
+
+
+def _parse_structured(content_id: str, data: Dict[str, Any], category: str, label: str) -> AnalysisResult:
+    """Build an AnalysisResult from schema fields, flagging (not hiding) missing ones"""
+    missing = [name for name in ("general_analysis", "score", "strategic_insights") if data.get(name) in (None, "", [])]
+
+    strategic_score = None
+    try:
+        strategic_score = max(0, min(int(data.get("score")), 10))
+    except (TypeError, ValueError):
+        if "score" not in missing:
+            missing.append("score")
+
+    insights = data.get("strategic_insights") or []
+    if isinstance(insights, str):
+        insights = [insights]
+    strategic_insights = "\n".join(f"{i}. {str(insight).strip()}" for i, insight in enumerate(insights, 1))
+
+    return AnalysisResult(
+        content_id=content_id,
+        general_analysis=str(data.get("general_analysis") or "").strip(),
+        strategic_score=strategic_score,
+        content_type=category,
+        strategic_insights=strategic_insights,
+        summary=f"Strategic Score: {strategic_score}/10 | {label}: {category}",
+        error=f"Structured response missing: {', '.join(missing)}" if missing else None
+    )
+
+
+def parse_competitor_intelligence_json(content_id: str, response_text: str) -> AnalysisResult:
+    """Parse a JSON-mode competitor response; regex parser if the response isn't JSON"""
+    data = _load_structured(response_text)
+    if data is None:
+        return parse_competitor_intelligence_response(content_id, response_text)
+
+    content_type = str(data.get("content_type") or "other").strip().lower()
+    if content_type not in CONTENT_TYPES:
+        content_type = "other"
+    return _parse_structured(content_id, data, content_type, "Type")
+
+
+def parse_niche_deepdive_json(content_id: str, response_text: str) -> AnalysisResult:
+    """Parse a JSON-mode niche deep-dive response; regex parser if the response isn't JSON"""
+    data = _load_structured(response_text)
+    if data is None:
+        return parse_niche_deepdive_response(content_id, response_text)
+
+    niche_category = _match_niche_category(str(data.get("niche_category") or "Other").strip())
+    return _parse_structured(content_id, data, niche_category, "Niche")
+
+
+# ==============================================================================
+# INCREMENTAL (STREAMING) PARSING
+# ==============================================================================
+
+# Stage 2 score in markdown ("**Score:** 3/10") or JSON ("score": 3) output;
+# the lookahead waits for the next character so "1" of "10" isn't taken early
+_STREAM_SCORE = re.compile(r'\*\*score:\*\*\s*(\d+)(?=\D)|"score"\s*:\s*(\d+)(?=\D)', re.IGNORECASE)
+_STREAM_OVERLAP = 32  # re-scan this much of the previous text (a match can span chunks)
+
+
+class IncrementalScoreParser:
+    """Accumulates a streamed two-stage response and reports the Stage 2 score once it arrives"""
+
+    def __init__(self):
+        self.text = ""
+        self.score: Optional[int] = None
+        self._score_end = 0
+        self._scanned = 0
+
+    def feed(self, chunk: str) -> Optional[int]:
+        """Add a chunk; returns the score as soon as it is known"""
+        self.text += chunk
+        if self.score is None:
+            match = _STREAM_SCORE.search(self.text, max(0, self._scanned - _STREAM_OVERLAP))
+            if match:
+                self.score = min(int(match.group(1) or match.group(2)), 10)
+                self._score_end = match.end()
+            else:
+                self._scanned = len(self.text)
+        return self.score
+
+    def partial_text(self) -> str:
+        """
+        Text received so far, in a form the regular parsers accept: a JSON
+        response is cut after the score and closed into a valid object
+        """
+        stripped = self.text.lstrip()
+        if self.score is not None and (stripped.startswith("{") or stripped.startswith("```")):
+            return re.sub(r'^\s*```(?:json)?\s*', '', self.text[:self._score_end]) + "}"
+        return self.text
+
+
+def parse_prescreen_response(content_id: str, response_text: str) -> AnalysisResult:
+    """Parse the one-line text pre-screen response (score only)"""
+
+    strategic_score = None
+    score = ResponseSections(response_text).first("score", _LEADING_INT)
+    if score is None:
+        # Fallback: bare "X/10"
+        score_match = _OUT_OF_TEN.search(response_text)
+        score = score_match.group(1) if score_match else None
+    if score is not None:
+        strategic_score = min(int(score), 10)
+
+    return AnalysisResult(
+        content_id=content_id,
+        strategic_score=strategic_score,
+        summary=f"Pre-screen Score: {strategic_score}/10"
+    )
 
 
 def parse_general_analysis_response(content_id: str, response_text: str) -> AnalysisResult:
@@ -143,6 +143,59 @@ FORMAT YOUR RESPONSE:
 YOU MUST provide at least 2 insights. Do not stop at 1.
 """
 
+# Cheap text-only relevance pre-screen run before escalating to video analysis
+PRESCREEN_PROMPT = """
+CONTEXT: AIbrary (aibrary.ai) is an AI-powered learning platform that turns books into personalized podcasts and interactive learning experiences. We monitor TikTok for content about books, learning, podcasts, productivity, AI tools and education.
+
+Based ONLY on the caption and subtitles below, rate how likely this TikTok is to be useful for AIbrary's content strategy.
+
+CONTENT:
+Creator: {author_username}
+Caption: {caption}
+Subtitles: {subtitles}
+
+- 7-10: Clearly on-topic, worth watching in full
+- 4-6: Possibly relevant
+- 0-3: Off-topic or no useful signal
+
+Respond with ONE line and nothing else:
+
+**Score:** X/10
+"""
+
+# Video context prepended to the strategy prompts when a video is attached
+COMPETITOR_VIDEO_CONTEXT = """You are analyzing a TikTok VIDEO (visual + audio content).
+
+Pay attention to:
+- Visual presentation and editing style
+- On-screen text and graphics
+- Speaker delivery and energy
+- Production quality and professionalism
+- Visual storytelling techniques
+
+"""
+
+NICHE_VIDEO_CONTEXT = """You are analyzing a TikTok VIDEO (visual + audio content).
+
+Pay attention to:
+- Visual presentation and editing style
+- On-screen text and graphics
+- Speaker delivery and energy
+- Content strategy techniques (hooks, format, engagement tactics)
+- Trending topics and themes in this niche space
+
+"""
+
+KEYFRAME_CONTEXT = """You are analyzing {frame_count} KEYFRAMES sampled evenly from a TikTok video (in order), together with its subtitles. You cannot hear the audio or see motion.
+
+Pay attention to:
+- The first frame (the hook)
+- On-screen text and graphics
+- Visual presentation and production style
+- How the visuals support what the subtitles say
+
+"""
+
 # Legacy prompt for general analysis (keeping for backward compatibility)
 VIDEO_ANALYSIS_PROMPT = """
 Analyze this TikTok video and provide insights on:
@@ -157,3 +210,116 @@ Analyze this TikTok video and provide insights on:
 Caption: {caption}
 Subtitles: {subtitles}
 """
+
+
+# ==============================================================================
+# STRUCTURED OUTPUT (GEMINI_OUTPUT_MODE=json)
+# ==============================================================================
+# Same prompts with the markdown FORMAT section swapped for a JSON schema, so
+# the response is parsed directly instead of through the regex parsers
+
+CONTENT_TYPES = [
+    "book_content", "learning_feature", "educational_value", "user_story", "brand_marketing",
+    "trend_engagement", "community_culture", "productivity_lifestyle", "other"
+]
+
+NICHE_CATEGORIES = [
+    "Podcasts & Audio Learning", "Books & Reading", "Productivity & Habits", "AI in Education",
+    "Upskilling & Career", "Knowledge Management", "Other"
+]
+
+COMPETITOR_INTELLIGENCE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "general_analysis": {"type": "STRING", "description": "Stage 1 content analysis"},
+        "score": {"type": "INTEGER", "description": "Stage 2 score from 0 to 10"},
+        "content_type": {"type": "STRING", "enum": CONTENT_TYPES},
+        "strategic_insights": {"type": "ARRAY", "items": {"type": "STRING"}, "min_items": 2, "max_items": 3}
+    },
+    "required": ["general_analysis", "score", "content_type", "strategic_insights"]
+}
+
+NICHE_DEEPDIVE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "general_analysis": {"type": "STRING", "description": "Stage 1 content analysis"},
+        "score": {"type": "INTEGER", "description": "Stage 2 score from 0 to 10"},
+        "niche_category": {"type": "STRING", "enum": NICHE_CATEGORIES},
+        "strategic_insights": {"type": "ARRAY", "items": {"type": "STRING"}, "min_items": 2, "max_items": 3}
+    },
+    "required": ["general_analysis", "score", "niche_category", "strategic_insights"]
+}
+
+COMPETITOR_INTELLIGENCE_JSON_PROMPT = COMPETITOR_INTELLIGENCE_PROMPT.split("FORMAT YOUR RESPONSE:")[0] + """FORMAT YOUR RESPONSE as a JSON object:
+- "general_analysis": your Stage 1 content analysis
+- "score": your Stage 2 score (integer 0-10)
+- "content_type": ONE of the content types above
+- "strategic_insights": 2-3 insights, one string each, without numbering
+
+YOU MUST provide at least 2 insights. Do not stop at 1.
+"""
+
+NICHE_DEEPDIVE_JSON_PROMPT = NICHE_DEEPDIVE_PROMPT.split("FORMAT YOUR RESPONSE:")[0] + """FORMAT YOUR RESPONSE as a JSON object:
+- "general_analysis": your Stage 1 content analysis
+- "score": your Stage 2 score (integer 0-10)
+- "niche_category": ONE of the 7 niche categories above
+- "strategic_insights": 2-3 insights, one string each, without numbering
+
+YOU MUST provide at least 2 insights. Do not stop at 1.
+"""
+
+
+# ==============================================================================
+# GROUPED TEXT-ONLY ANALYSIS
+# ==============================================================================
+# Several text-only items share one request: the JSON prompt with its CONTENT
+# block taken out (rubric) once, then delimited item sections; the response is
+# a JSON array with item_id
+
+CONTENT_BLOCK = """Analyze this TikTok content in two stages:
+
+CONTENT:
+Creator: {author_username}
+Caption: {caption}
+Subtitles: {subtitles}
+Performance: {likes} likes, {comments} comments, {views} views
+"""
+
+COMPETITOR_INTELLIGENCE_GROUPED_PREFIX = COMPETITOR_INTELLIGENCE_JSON_PROMPT.replace(
+    CONTENT_BLOCK, "Analyze each TikTok item given at the end of this prompt in two stages:\n"
+)
+NICHE_DEEPDIVE_GROUPED_PREFIX = NICHE_DEEPDIVE_JSON_PROMPT.replace(
+    CONTENT_BLOCK, "Analyze each TikTok item given at the end of this prompt in two stages:\n"
+)
+
+GROUPED_ITEMS_INSTRUCTIONS = """
+MULTIPLE ITEMS: The content below holds {item_count} separate TikTok items, each starting with "=== ITEM <item_id> ===". Analyze every item on its own with the two-stage process above and never mix details between items.
+
+Respond with a JSON array containing exactly one object per item, in the same order. Each object has "item_id" copied exactly from its header plus the fields listed above.
+"""
+
+GROUPED_ITEM_TEMPLATE = """
+---
+
+=== ITEM {item_id} ===
+Creator: {author_username}
+Caption: {caption}
+Subtitles: {subtitles}
+Performance: {likes} likes, {comments} comments, {views} views
+"""
+
+
+def _grouped_schema(item_schema):
+    """Array-of-items response schema for grouped analysis"""
+    return {
+        "type": "ARRAY",
+        "items": {
+            **item_schema,
+            "properties": {"item_id": {"type": "STRING"}, **item_schema["properties"]},
+            "required": ["item_id", *item_schema["required"]]
+        }
+    }
+
+
+COMPETITOR_INTELLIGENCE_GROUPED_SCHEMA = _grouped_schema(COMPETITOR_INTELLIGENCE_SCHEMA)
+NICHE_DEEPDIVE_GROUPED_SCHEMA = _grouped_schema(NICHE_DEEPDIVE_SCHEMA)
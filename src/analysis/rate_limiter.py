@@ -0,0 +1,183 @@
+"""
+AIbrary TikTok Monitoring System - Gemini Rate Limiter
+Quota-aware, self-tuning wrapper around generate_content
+
+A transient 429/5xx used to drop the item until the next run, and with
+parallel analysis nothing kept us under the per-minute quota. Each model
+call now:
+- takes a request and its estimated tokens from token buckets sized to the
+  RPM/TPM quota (the estimate is corrected from usage_metadata afterwards)
+- runs inside an AIMD concurrency window: +1 slot per window of successes,
+  halved on throttling
+- is retried on retryable errors with full-jitter exponential backoff,
+  honoring the server's retry delay when one is given
+"""
+
+import random
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from google.api_core import exceptions as google_exceptions
+
+# Errors worth retrying (quota, overload, transient server/network failures)
+RETRYABLE_ERRORS = (
+    google_exceptions.TooManyRequests,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.InternalServerError,
+    google_exceptions.BadGateway,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.GatewayTimeout,
+    google_exceptions.DeadlineExceeded,
+    ConnectionError,
+    TimeoutError
+)
+THROTTLE_ERRORS = (google_exceptions.TooManyRequests, google_exceptions.ResourceExhausted)
+
+# Rough prompt token estimates before usage_metadata is known
+CHARS_PER_TOKEN = 4
+IMAGE_TOKENS = 258          # one image / keyframe
+VIDEO_TOKENS_ESTIMATE = 10_000  # ~35s of video at ~300 tokens/s
+
+
+def estimate_tokens(contents: Any) -> int:
+    """Approximate prompt tokens of generate_content-style contents"""
+    tokens = 0
+    for part in contents if isinstance(contents, list) else [contents]:
+        if isinstance(part, str):
+            tokens += len(part) // CHARS_PER_TOKEN
+        elif isinstance(part, dict) and str(part.get("mime_type", "")).startswith("image/"):
+            tokens += IMAGE_TOKENS
+        else:
+            tokens += VIDEO_TOKENS_ESTIMATE
+    return max(1, tokens)
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at capacity per minute"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1):
+        """Block until amount is available (requests larger than the bucket wait for a full one)"""
+        amount = min(float(amount), self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                wait = (amount - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def adjust(self, amount: float):
+        """Charge (positive) or refund (negative) the difference between estimate and actual usage"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens - amount)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class AdaptiveConcurrency:
+    """AIMD in-flight limit: additive increase on success, multiplicative decrease on throttling"""
+
+    def __init__(self, maximum: int, minimum: int = 1, initial: Optional[int] = None):
+        self.maximum = max(1, maximum)
+        self.minimum = max(1, min(minimum, self.maximum))
+        self.limit = float(initial or self.maximum)
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while self._in_flight >= int(self.limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+
+    def on_success(self):
+        with self._condition:
+            # +1 slot per full window of successes
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+    def on_throttle(self, cooldown: float):
+        """Halve the limit, at most once per cooldown (one 429 burst = one decrease)"""
+        with self._condition:
+            now = time.monotonic()
+            if now - self._last_decrease < cooldown:
+                return
+            self._last_decrease = now
+            self.limit = max(self.minimum, self.limit / 2)
+            print(f"   🐢 Gemini throttled - concurrency limit lowered to {int(self.limit)}")
+
+
+class RateLimiter:
+    """RPM/TPM token buckets + AIMD concurrency + jittered retries for one model"""
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_in_flight: int,
+        max_retries: int = 5,
+        base_delay: float = 2.0,
+        max_delay: float = 60.0
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.concurrency = AdaptiveConcurrency(max_in_flight)
+        self.max_retries = max(0, max_retries)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def call(self, fn: Callable[[], Any], estimated_tokens: int = 1) -> Any:
+        """Run fn() within the quota, retrying retryable errors; re-raises the last error"""
+        for attempt in range(self.max_retries + 1):
+            self.requests.acquire(1)
+            self.tokens.acquire(estimated_tokens)
+            self.concurrency.acquire()
+            try:
+                response = fn()
+            except RETRYABLE_ERRORS as e:
+                throttled = isinstance(e, THROTTLE_ERRORS)
+                if throttled:
+                    self.concurrency.on_throttle(cooldown=self.base_delay)
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff(attempt, e)
+                print(f"   🔁 Gemini {'throttled' if throttled else 'error'} ({type(e).__name__}), retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            finally:
+                self.concurrency.release()
+
+            self.concurrency.on_success()
+            usage = getattr(response, "usage_metadata", None)
+            actual = getattr(usage, "total_token_count", None) if usage else None
+            if actual:
+                self.tokens.adjust(actual - estimated_tokens)
+            return response
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        """Full-jitter exponential backoff, never shorter than the server's retry delay"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        for detail in getattr(error, "details", None) or []:
+            retry_delay = getattr(detail, "retry_delay", None)
+            if retry_delay is not None:
+                delay = max(delay, retry_delay.seconds + retry_delay.nanos / 1e9)
+        return delay
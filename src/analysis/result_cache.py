@@ -0,0 +1,103 @@
+"""
+AIbrary TikTok Monitoring System - Result Cache
+Persistent memoization of model responses
+
+Keyed by (content_id, media hash, prompt template hash, model name), so
+clearing the AI columns and re-running analysis costs no model calls unless
+the media, the prompt or the model changed. The raw response text is stored
+alongside the parsed AnalysisResult and is re-parsed on every hit, so a
+parser fix takes effect without paying for new responses.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+from typing import Callable, Iterator, Optional, Tuple
+
+from core.config import DATA_DIR
+from core.models import AnalysisResult
+
+DEFAULT_RESULT_CACHE_PATH = os.path.join(DATA_DIR, "analysis_results.sqlite3")
+
+CacheKey = Tuple[str, str, str, str]
+
+
+class ResultCache:
+    """SQLite-backed store of raw responses and parsed results"""
+
+    def __init__(self, path: str = DEFAULT_RESULT_CACHE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS analysis_results (
+                content_id TEXT NOT NULL,
+                media_hash TEXT NOT NULL,
+                prompt_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                raw_text TEXT NOT NULL,
+                result_json TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (content_id, media_hash, prompt_hash, model)
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def prompt_hash(*template_parts: str) -> str:
+        """Hash of the prompt template text (not the per-item formatted prompt)"""
+        digest = hashlib.sha256()
+        for part in template_parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    @staticmethod
+    def make_key(content_id: str, media_hash: str, prompt_hash: str, model: str) -> CacheKey:
+        return (str(content_id), media_hash, prompt_hash, model)
+
+    def get(self, key: CacheKey, parser: Optional[Callable[[str, str], AnalysisResult]] = None) -> Optional[AnalysisResult]:
+        """
+        Look up a cached result
+        With a parser the stored raw text is re-parsed (picks up parser fixes);
+        without one the stored parsed result is returned as-is
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT raw_text, result_json FROM analysis_results "
+                "WHERE content_id = ? AND media_hash = ? AND prompt_hash = ? AND model = ?",
+                key
+            ).fetchone()
+        if row is None:
+            return None
+
+        raw_text, result_json = row
+        if parser is not None:
+            return parser(key[0], raw_text)
+        return AnalysisResult(**json.loads(result_json))
+
+    def put(self, key: CacheKey, raw_text: str, result: AnalysisResult):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analysis_results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*key, raw_text, json.dumps(asdict(result)), time.time())
+            )
+            self._conn.commit()
+
+    def iter_raw_responses(self) -> Iterator[Tuple[str, str]]:
+        """Yield (content_id, raw_text) for every stored response (bulk re-parsing)"""
+        with self._lock:
+            rows = self._conn.execute("SELECT content_id, raw_text FROM analysis_results").fetchall()
+        yield from rows
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,66 @@
+"""
+AIbrary TikTok Monitoring System - Streaming Responses
+Stream generate_content output and stop low-value items early
+
+Without streaming, parsing starts only after the whole response arrives.
+In streaming mode chunks go to an IncrementalScoreParser; once the Stage 2
+score is known and below the stop threshold, the stream is cancelled and
+the partial response (Stage 1 analysis + score) is returned. Most items
+score 0-3, so they skip generating the insights and pay fewer output tokens.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from .parsers import IncrementalScoreParser
+
+
+@dataclass
+class StreamedResponse:
+    """Drop-in for the parts of GenerateContentResponse we use (text, usage_metadata)"""
+    text: str
+    usage_metadata: Any = None
+    score: Optional[int] = None
+    stopped: bool = False  # cancelled at a low score (insights were never generated)
+
+
+def stream_generate(
+    model,
+    contents,
+    generation_config: Optional[Dict[str, Any]] = None,
+    stop_below: Optional[int] = None
+) -> StreamedResponse:
+    """Stream a response, cancelling it once the Stage 2 score is below stop_below"""
+    stream = model.generate_content(contents, generation_config=generation_config, stream=True)
+    parser = IncrementalScoreParser()
+    usage = None
+
+    for chunk in stream:
+        # Usage counts are cumulative; the latest chunk carrying them wins
+        if getattr(chunk, "usage_metadata", None):
+            usage = chunk.usage_metadata
+        score = parser.feed(_chunk_text(chunk))
+
+        if stop_below is not None and score is not None and score < stop_below:
+            _cancel(stream)
+            return StreamedResponse(parser.partial_text(), usage, score, stopped=True)
+
+    return StreamedResponse(parser.text, usage, parser.score)
+
+
+def _chunk_text(chunk) -> str:
+    """Text of a chunk (chunk.text raises on chunks without parts, e.g. the final one)"""
+    candidates = getattr(chunk, "candidates", None) or []
+    if not candidates or not candidates[0].content:
+        return ""
+    return "".join(part.text for part in candidates[0].content.parts if getattr(part, "text", None))
+
+
+def _cancel(stream):
+    """Stop server-side generation: the SDK keeps the gRPC call as the response's iterator"""
+    cancel = getattr(getattr(stream, "_iterator", None), "cancel", None)
+    if cancel:
+        try:
+            cancel()
+        except Exception as e:
+            print(f"   ⚠️ Failed to cancel response stream: {e}")
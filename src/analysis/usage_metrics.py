@@ -0,0 +1,229 @@
+"""
+AIbrary TikTok Monitoring System - Usage Metrics
+Per-call token, latency and cost accounting for AI analysis
+
+Every generate_content call, failed attempts included, records its status,
+usage_metadata (prompt, cached and output tokens), the media bytes sent,
+model latency and the item's media download latency (on the item's first
+call only), tagged with run, strategy and target. Records go to a
+local SQLite store so cost per strategy/target can be tracked across runs
+against the monthly budget, and to tune concurrency, tiering and
+preprocessing.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, astuple, fields
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from core.config import DATA_DIR
+
+DEFAULT_METRICS_PATH = os.path.join(DATA_DIR, "analysis_metrics.sqlite3")
+
+# USD per 1M tokens (paid tier list prices; update when pricing changes).
+# Output includes thinking tokens; cached covers context-cache hits.
+MODEL_PRICING = {
+    "gemini-2.5-flash": {"input": 0.30, "cached": 0.075, "output": 2.50},
+    "gemini-2.5-flash-lite": {"input": 0.10, "cached": 0.025, "output": 0.40},
+    "gemini-2.5-pro": {"input": 1.25, "cached": 0.31, "output": 10.00},
+}
+
+
+@dataclass
+class CallRecord:
+    """One model call"""
+    run_id: str
+    content_id: str
+    strategy: str
+    target_value: str
+    call_type: str  # "prescreen", "analysis", "grouped" or "escalation"
+    model: str
+    items: int = 1  # content items covered by the call (grouped calls cover several)
+    status: str = "ok"  # "ok" or "error" (the call raised; no usage recorded)
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+    media_bytes: int = 0
+    model_seconds: float = 0.0
+    download_seconds: float = 0.0
+    cost_usd: float = 0.0
+    created_at: float = 0.0
+
+
+def call_cost(model: str, prompt_tokens: int, cached_tokens: int, output_tokens: int) -> float:
+    """Estimated USD cost of one call (0 for models without a price entry)"""
+    pricing = MODEL_PRICING.get(model)
+    if not pricing:
+        return 0.0
+    return (
+        (prompt_tokens - cached_tokens) * pricing["input"]
+        + cached_tokens * pricing["cached"]
+        + output_tokens * pricing["output"]
+    ) / 1_000_000
+
+
+class UsageMetrics:
+    """SQLite-backed store of model call records, grouped by run"""
+
+    def __init__(self, path: str = DEFAULT_METRICS_PATH):
+        self.path = path
+        self.run_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS model_calls (
+                run_id TEXT NOT NULL,
+                content_id TEXT NOT NULL,
+                strategy TEXT NOT NULL,
+                target_value TEXT NOT NULL,
+                call_type TEXT NOT NULL,
+                model TEXT NOT NULL,
+                items INTEGER NOT NULL DEFAULT 1,
+                status TEXT NOT NULL DEFAULT 'ok',
+                prompt_tokens INTEGER NOT NULL,
+                cached_tokens INTEGER NOT NULL,
+                output_tokens INTEGER NOT NULL,
+                media_bytes INTEGER NOT NULL,
+                model_seconds REAL NOT NULL,
+                download_seconds REAL NOT NULL,
+                cost_usd REAL NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        # Stores created before a column existed get it with its default
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(model_calls)")}
+        for name, definition in (("items", "INTEGER NOT NULL DEFAULT 1"), ("status", "TEXT NOT NULL DEFAULT 'ok'")):
+            if name not in columns:
+                self._conn.execute(f"ALTER TABLE model_calls ADD COLUMN {name} {definition}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_model_calls_run ON model_calls (run_id)")
+        self._conn.commit()
+
+    def record_call(
+        self,
+        response: Any,
+        model: str,
+        model_seconds: float,
+        content_id: str = "",
+        strategy: str = "",
+        target_value: str = "",
+        call_type: str = "analysis",
+        media_bytes: int = 0,
+        download_seconds: float = 0.0,
+        items: int = 1,
+        status: str = "ok"
+    ) -> CallRecord:
+        """Record one generate_content call (response is None for failed calls)"""
+        usage = getattr(response, "usage_metadata", None)
+        prompt_tokens = getattr(usage, "prompt_token_count", 0) or 0
+        cached_tokens = getattr(usage, "cached_content_token_count", 0) or 0
+        # total - prompt also counts thinking tokens, which bill as output
+        output_tokens = max((getattr(usage, "total_token_count", 0) or 0) - prompt_tokens, getattr(usage, "candidates_token_count", 0) or 0)
+
+        record = CallRecord(
+            run_id=self.run_id,
+            content_id=str(content_id),
+            strategy=strategy or "Unknown",
+            target_value=target_value or "",
+            call_type=call_type,
+            model=model,
+            items=items,
+            status=status,
+            prompt_tokens=prompt_tokens,
+            cached_tokens=cached_tokens,
+            output_tokens=output_tokens,
+            media_bytes=media_bytes,
+            model_seconds=model_seconds,
+            download_seconds=download_seconds,
+            cost_usd=call_cost(model, prompt_tokens, cached_tokens, output_tokens),
+            created_at=time.time()
+        )
+        with self._lock:
+            names = [f.name for f in fields(CallRecord)]
+            self._conn.execute(
+                f"INSERT INTO model_calls ({', '.join(names)}) VALUES ({', '.join('?' for _ in names)})",
+                astuple(record)
+            )
+            self._conn.commit()
+        return record
+
+    def summary(self, group_by: str, run_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Aggregates for one run (default: the current run)
+        group_by: "strategy", "target_value", "call_type", "model" or "run_id"
+        """
+        if group_by not in ("strategy", "target_value", "call_type", "model", "run_id"):
+            raise ValueError(f"Cannot group model calls by {group_by!r}")
+
+        with self._lock:
+            cursor = self._conn.execute(
+                f"""
+                SELECT {group_by} AS name, COUNT(*) AS calls, SUM(status != 'ok') AS failed_calls,
+                       COUNT(DISTINCT CASE WHEN status = 'ok' THEN NULLIF(content_id, '') END)
+                       + SUM(CASE WHEN status = 'ok' AND content_id = '' THEN items ELSE 0 END) AS items,
+                       SUM(prompt_tokens) AS prompt_tokens, SUM(cached_tokens) AS cached_tokens,
+                       SUM(output_tokens) AS output_tokens, SUM(media_bytes) AS media_bytes,
+                       SUM(model_seconds) AS model_seconds, AVG(model_seconds) AS avg_model_seconds,
+                       SUM(download_seconds) AS download_seconds, SUM(cost_usd) AS cost_usd
+                FROM model_calls WHERE run_id = ?
+                GROUP BY {group_by} ORDER BY cost_usd DESC
+                """,
+                (run_id or self.run_id,)
+            )
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def cost_since(self, since: float) -> float:
+        """Total estimated cost of all runs since a timestamp (e.g. start of month)"""
+        with self._lock:
+            row = self._conn.execute("SELECT SUM(cost_usd) FROM model_calls WHERE created_at >= ?", (since,)).fetchone()
+        return row[0] or 0.0
+
+    def print_run_summary(self, run_id: Optional[str] = None):
+        """Print token/latency/cost totals for a run, per strategy and per target"""
+        totals = self.summary("run_id", run_id)
+        if not totals:
+            return
+
+        total = totals[0]
+        print("\n💰 AI usage this run:")
+        print(
+            f"   {total['calls']} calls ({total['failed_calls']} failed) | {total['prompt_tokens']:,} prompt tokens "
+            f"({total['cached_tokens']:,} cached) | {total['output_tokens']:,} output tokens"
+        )
+        print(
+            f"   Media sent: {total['media_bytes'] / 1024 / 1024:.1f} MB | Model time: {total['model_seconds']:.1f}s "
+            f"(avg {total['avg_model_seconds']:.1f}s) | Download time: {total['download_seconds']:.1f}s"
+        )
+        month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0).timestamp()
+        print(f"   Estimated cost: ${total['cost_usd']:.4f} (month to date: ${self.cost_since(month_start):.2f})")
+
+        for group_by, label in (("strategy", "By strategy"), ("call_type", "By call type"), ("target_value", "By target")):
+            print(f"   {label}:")
+            for row in self.summary(group_by, run_id):
+                print(
+                    f"      - {row['name'] or '(none)'}: {row['calls']} calls, "
+                    f"{row['prompt_tokens']:,}/{row['output_tokens']:,} tokens in/out, "
+                    f"{row['model_seconds']:.1f}s, ${row['cost_usd']:.4f}"
+                )
+
+        # Model tiers: latency and cost per analyzed item (distinct items of
+        # single-item calls plus the item count recorded on grouped calls)
+        print("   By model:")
+        for row in self.summary("model", run_id):
+            per_item = f"${row['cost_usd'] / row['items']:.5f}/item" if row["items"] else "no items"
+            print(
+                f"      - {row['name']}: {row['calls']} calls, {row['items']} items, "
+                f"avg {row['avg_model_seconds']:.1f}s/call, {per_item}"
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
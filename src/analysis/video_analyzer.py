@@ -18,36 +18,265 @@ Future Enhancement:
 import requests
 import tempfile
 import os
-from typing import Optional, List, Dict, Any
+import threading
+import time
+from dataclasses import replace
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, List, Dict, Any, Callable, Tuple
 import google.generativeai as genai
 
 from core import TikTokContent, GEMINI_API_KEY
+from core.config import (
+    load_json_config, QUALITY_THRESHOLDS_FILE,
+    ANALYSIS_MAX_WORKERS, MODEL_MAX_IN_FLIGHT,
+    GEMINI_RPM_LIMIT, GEMINI_TPM_LIMIT, GEMINI_MAX_RETRIES,
+    PREFETCH_WORKERS, PREFETCH_MAX_BUFFERED_MB,
+    GEMINI_MODEL, GEMINI_UPLOAD_MODE, GEMINI_OUTPUT_MODE, MEDIA_CACHE_MAX_MB, MEDIA_BUFFER_MAX_MB, RESULT_CACHE_ENABLED,
+    GEMINI_BATCH_POLL_SECONDS, GEMINI_BATCH_MAX_REQUESTS,
+    GEMINI_STREAM_RESPONSES, GEMINI_STREAM_STOP_BELOW, TEXT_ANALYSIS_GROUP_SIZE
+)
 from core.models import AnalysisResult
-from .prompts import COMPETITOR_INTELLIGENCE_PROMPT, NICHE_DEEPDIVE_PROMPT, VIDEO_ANALYSIS_PROMPT
+from .media_prefetch import PreparedMedia, MediaPrefetcher
+from .media_handle import MediaHandle, DEFAULT_CHUNK_SIZE
+from .file_registry import GeminiFileRegistry
+from .media_cache import MediaCache
+from .result_cache import ResultCache
+from .keyword_scorer import KeywordScorer
+from .batch_jobs import BatchRequest, GeminiBatchClient
+from .video_preprocess import VideoPreprocessor
+from .rate_limiter import RateLimiter, estimate_tokens
+from .usage_metrics import UsageMetrics
+from .dedup_index import NearDuplicateIndex, DedupSignature
+from .streaming import StreamedResponse, stream_generate
+from .model_router import ModelRouter
+from .prompts import (
+    COMPETITOR_INTELLIGENCE_PROMPT, NICHE_DEEPDIVE_PROMPT, VIDEO_ANALYSIS_PROMPT,
+    COMPETITOR_VIDEO_CONTEXT, NICHE_VIDEO_CONTEXT, PRESCREEN_PROMPT, KEYFRAME_CONTEXT,
+    COMPETITOR_INTELLIGENCE_JSON_PROMPT, NICHE_DEEPDIVE_JSON_PROMPT,
+    COMPETITOR_INTELLIGENCE_GROUPED_PREFIX, NICHE_DEEPDIVE_GROUPED_PREFIX,
+    COMPETITOR_INTELLIGENCE_SCHEMA, NICHE_DEEPDIVE_SCHEMA,
+    GROUPED_ITEMS_INSTRUCTIONS, GROUPED_ITEM_TEMPLATE,
+    COMPETITOR_INTELLIGENCE_GROUPED_SCHEMA, NICHE_DEEPDIVE_GROUPED_SCHEMA
+)
 from .parsers import (
     parse_competitor_intelligence_response,
     parse_niche_deepdive_response,
+    parse_competitor_intelligence_json,
+    parse_niche_deepdive_json,
     parse_general_analysis_response,
-    parse_subtitle_content
+    parse_prescreen_response,
+    parse_subtitle_content,
+    split_grouped_response
 )
 
+# Strategies whose analysis uses subtitles/video (others skip before any download)
+MEDIA_STRATEGIES = ("Competitor Intelligence", "Niche Deep-Dive")
+
+# Prompt, video context, parser and fallback category per analyzed strategy
+STRATEGY_ANALYSIS = {
+    "Competitor Intelligence": {
+        "prompt_template": COMPETITOR_INTELLIGENCE_PROMPT,
+        "video_context": COMPETITOR_VIDEO_CONTEXT,
+        "parser": parse_competitor_intelligence_response,
+        "fallback_category": "other"
+    },
+    "Niche Deep-Dive": {
+        "prompt_template": NICHE_DEEPDIVE_PROMPT,
+        "video_context": NICHE_VIDEO_CONTEXT,
+        "parser": parse_niche_deepdive_response,
+        "fallback_category": "Other"
+    }
+}
+
+# JSON-schema variants used when GEMINI_OUTPUT_MODE=json (regex parsers remain the fallback)
+STRUCTURED_ANALYSIS = {
+    "Competitor Intelligence": {
+        "prompt_template": COMPETITOR_INTELLIGENCE_JSON_PROMPT,
+        "parser": parse_competitor_intelligence_json,
+        "response_schema": COMPETITOR_INTELLIGENCE_SCHEMA
+    },
+    "Niche Deep-Dive": {
+        "prompt_template": NICHE_DEEPDIVE_JSON_PROMPT,
+        "parser": parse_niche_deepdive_json,
+        "response_schema": NICHE_DEEPDIVE_SCHEMA
+    }
+}
+
+# Array-of-items schema for grouped text-only analysis (always JSON output)
+GROUPED_SCHEMAS = {
+    "Competitor Intelligence": COMPETITOR_INTELLIGENCE_GROUPED_SCHEMA,
+    "Niche Deep-Dive": NICHE_DEEPDIVE_GROUPED_SCHEMA
+}
+
+# Static rubric sent once ahead of a grouped request's item blocks
+GROUPED_PREFIXES = {
+    "Competitor Intelligence": COMPETITOR_INTELLIGENCE_GROUPED_PREFIX,
+    "Niche Deep-Dive": NICHE_DEEPDIVE_GROUPED_PREFIX
+}
+
+# Parsers by name, for mapping recovered batch responses (see batch_jobs.py)
+PARSERS_BY_NAME = {
+    parser.__name__: parser
+    for parser in (
+        parse_competitor_intelligence_response, parse_niche_deepdive_response,
+        parse_competitor_intelligence_json, parse_niche_deepdive_json,
+        parse_prescreen_response
+    )
+}
+
 
 class VideoAnalyzer:
     """Handles AI analysis of TikTok videos"""
 
-    def __init__(self):
-        """Initialize the video analyzer with API credentials"""
+    def __init__(
+        self,
+        max_workers: int = ANALYSIS_MAX_WORKERS,
+        max_in_flight: int = MODEL_MAX_IN_FLIGHT,
+        upload_mode: str = GEMINI_UPLOAD_MODE,
+        output_mode: str = GEMINI_OUTPUT_MODE,
+        media_cache_mb: int = MEDIA_CACHE_MAX_MB,
+        media_buffer_mb: int = MEDIA_BUFFER_MAX_MB,
+        use_result_cache: bool = RESULT_CACHE_ENABLED,
+        analysis_modes: Optional[Dict[str, str]] = None,
+        stream_responses: bool = GEMINI_STREAM_RESPONSES,
+        text_group_size: int = TEXT_ANALYSIS_GROUP_SIZE
+    ):
+        """
+        Initialize the video analyzer with API credentials
+        analysis_modes: {strategy: "video" | "keyframes"} overriding quality-thresholds.json
+        stream_responses: stream strategy analyses and stop below GEMINI_STREAM_STOP_BELOW
+        text_group_size: text-only items packed per request in batch_analyze (1 disables)
+        """
+        self.model_name = GEMINI_MODEL
+        self.upload_mode = upload_mode  # "inline" or "file_api"
+        self.output_mode = output_mode  # "json" or "markdown"
+        self.stream_stop_below = GEMINI_STREAM_STOP_BELOW if stream_responses else None
+        self.text_group_size = max(1, text_group_size)
+        self.file_registry = GeminiFileRegistry() if upload_mode == "file_api" else None
+        self.media_cache = MediaCache(max_bytes=media_cache_mb * 1024 * 1024) if media_cache_mb > 0 else None
+        # Videos up to this size are buffered for reuse across inline calls; larger ones are re-read per call
+        self.media_buffer_max_bytes = media_buffer_mb * 1024 * 1024
+        self.result_cache = ResultCache() if use_result_cache else None
+        self.metrics = UsageMetrics()
+
+        thresholds = load_json_config(QUALITY_THRESHOLDS_FILE)
+
+        # Tiered analysis: text pre-screen threshold for escalating to video
+        self.tiering = thresholds.get("tiered_analysis", {})
+        self.prescreen_threshold = int(self.tiering.get("min_prescreen_score", 4))
+        self.keyword_scorer = KeywordScorer()
+        self.preprocessor = VideoPreprocessor()
+
+        # Model per strategy and call kind, with escalation to stronger tiers
+        self.router = ModelRouter(thresholds.get("model_routing"), default_model=self.model_name)
+
+        # Near-duplicate index: reposts/stitches reuse an earlier item's result
+        self.dedup_settings = thresholds.get("near_duplicates", {})
+        self.dedup_index = NearDuplicateIndex(self.dedup_settings) if self.dedup_settings.get("enabled") else None
+
+        # Per-strategy visual input: full video or keyframes + transcript
+        mode_settings = thresholds.get("analysis_modes", {})
+        self.analysis_modes = {**mode_settings.get("strategies", {}), **(analysis_modes or {})}
+        self.keyframe_settings = mode_settings.get("keyframes", {})
+        self.max_workers = max(1, max_workers)
+        self.max_in_flight = max(1, max_in_flight)
+
+        # Per-model quota limiters bounding generate_content calls
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._limiters_lock = threading.Lock()
+
         if GEMINI_API_KEY:
             genai.configure(api_key=GEMINI_API_KEY)
-            self.model = genai.GenerativeModel('gemini-2.5-flash')
+            self.model = genai.GenerativeModel(self.model_name)
         else:
             self.model = None
             print("⚠️ GEMINI_API_KEY not found - AI analysis disabled")
 
-    def analyze_content(self, content: TikTokContent, analysis_type: str = "competitor_intelligence") -> Optional[AnalysisResult]:
+        # Client models by name (routing tiers), created lazily
+        self._models: Dict[str, genai.GenerativeModel] = {self.model_name: self.model} if self.model else {}
+        self._models_lock = threading.Lock()
+
+    def _limiter(self, model_name: str) -> RateLimiter:
+        """Get (or lazily create) the rate limiter for a model"""
+        with self._limiters_lock:
+            if model_name not in self._limiters:
+                self._limiters[model_name] = RateLimiter(
+                    GEMINI_RPM_LIMIT, GEMINI_TPM_LIMIT, self.max_in_flight, max_retries=GEMINI_MAX_RETRIES
+                )
+            return self._limiters[model_name]
+
+    def _model(self, model_name: str) -> genai.GenerativeModel:
+        """Get (or lazily create) the client for a model name"""
+        with self._models_lock:
+            if model_name not in self._models:
+                self._models[model_name] = genai.GenerativeModel(model_name)
+            return self._models[model_name]
+
+    def _generate(
+        self,
+        contents,
+        response_schema: Optional[Dict[str, Any]] = None,
+        content: Optional[TikTokContent] = None,
+        call_type: str = "analysis",
+        media: Optional[PreparedMedia] = None,
+        stop_below: Optional[int] = None,
+        strategy: str = "",
+        model_name: Optional[str] = None,
+        items: int = 1
+    ):
+        """
+        Call generate_content within the model's quota, retrying throttling and transient
+        errors (JSON mode with a schema), and record its usage in the metrics store
+        model_name: routed model (default: self.model_name); keys the limiter and metrics
+        content/call_type/media: what the call is for (metrics tags, download latency);
+        strategy/items tag calls without a single content item (grouped analysis)
+        stop_below: stream the response and stop once the Stage 2 score is below this
+        """
+        generation_config = None
+        if response_schema:
+            generation_config = {"response_mime_type": "application/json", "response_schema": response_schema}
+        model_name = model_name or self.model_name
+        client = self._model(model_name)
+
+        def record(response, seconds: float, status: str):
+            self.metrics.record_call(
+                response, model_name, seconds,
+                content_id=content.content_id if content else "",
+                strategy=content.monitoring_strategy if content else strategy,
+                target_value=content.target_value if content else "",
+                call_type=call_type,
+                media_bytes=_media_bytes(contents, media),
+                download_seconds=media.take_download_seconds() if media else 0.0,
+                items=items,
+                status=status
+            )
+
+        def call():
+            # Failed attempts (including ones the limiter retries) are recorded too
+            start = time.time()
+            try:
+                if stop_below is not None:
+                    response = stream_generate(client, contents, generation_config, stop_below)
+                else:
+                    response = client.generate_content(contents, generation_config=generation_config)
+            except Exception:
+                record(None, time.time() - start, "error")
+                raise
+            record(response, time.time() - start, "ok")
+            return response
+
+        return self._limiter(model_name).call(call, estimated_tokens=estimate_tokens(contents))
+
+    def analyze_content(
+        self,
+        content: TikTokContent,
+        analysis_type: str = "competitor_intelligence",
+        media: Optional[PreparedMedia] = None
+    ) -> Optional[AnalysisResult]:
         """
         Analyze TikTok content using available data based on monitoring strategy
         Priority: Subtitles > Video > Caption only
+        media: subtitles/video already fetched by a MediaPrefetcher (optional)
 
         Routes to strategy-specific analysis based on content.monitoring_strategy field:
         - "Competitor Intelligence" → Analyze with competitor intelligence prompt
@@ -64,12 +293,12 @@ class VideoAnalyzer:
 
             # Route based on monitoring strategy
             if strategy == "Competitor Intelligence":
-                return self._analyze_competitor_intelligence(content)
+                return self._analyze_competitor_intelligence(content, media)
             elif strategy == "Trend Discovery":
                 print(f"   ⏭️  {content.content_id} (Trend Discovery) - skipping (prompt not implemented)")
                 return None
             elif strategy == "Niche Deep-Dive":
-                return self._analyze_niche_deepdive(content)
+                return self._analyze_niche_deepdive(content, media)
             elif strategy is None or strategy == "":
                 print(f"   ⚠️  {content.content_id} - No monitoring strategy, skipping analysis")
                 return None
@@ -80,156 +309,312 @@ class VideoAnalyzer:
         except Exception as e:
             print(f"❌ AI analysis failed for {content.content_id}: {e}")
             return None
+        finally:
+            # Media for skipped strategies is never consumed; release it here
+            if media is not None:
+                media.close()
 
-    def _analyze_competitor_intelligence(self, content: TikTokContent) -> Optional[AnalysisResult]:
+    def _analyze_competitor_intelligence(self, content: TikTokContent, media: Optional[PreparedMedia] = None) -> Optional[AnalysisResult]:
         """Analyze content specifically for competitor intelligence insights"""
+        return self._analyze_with_prompt(content, media, **self._strategy_spec("Competitor Intelligence"))
 
-        # Get subtitle text if available
-        subtitles = ""
-        if content.subtitle_url:
-            subtitles = self._fetch_subtitles(content.subtitle_url)
-
-        # Try to download and analyze video if available
-        video_file = None
-        video_available = False
-
-        if content.video_download_url:
-            print(f"   📥 Downloading video from {content.video_download_url[:60]}...")
-            video_file = self._download_video(content.video_download_url, content.content_id)
-            if video_file:
-                print(f"   ✅ Video downloaded: {video_file}")
-                video_available = True
-            else:
-                print(f"   ⚠️ Video download failed, falling back to text-only analysis")
+    def _analyze_niche_deepdive(self, content: TikTokContent, media: Optional[PreparedMedia] = None) -> Optional[AnalysisResult]:
+        """Analyze content for niche deep-dive insights (content strategies from adjacent niches)"""
+        return self._analyze_with_prompt(content, media, **self._strategy_spec("Niche Deep-Dive"))
+
+    def _analyze_with_prompt(
+        self,
+        content: TikTokContent,
+        media: Optional[PreparedMedia],
+        prompt_template: str,
+        video_context: str,
+        parser: Callable[[str, str], AnalysisResult],
+        fallback_category: str,
+        response_schema: Optional[Dict[str, Any]] = None
+    ) -> Optional[AnalysisResult]:
+        """Shared two-stage analysis flow for the strategy prompts"""
+
+        # Use prefetched media when the pipeline provides it, otherwise fetch now
+        # (the video waits until the pre-screen decides the item is worth it)
+        prescreen = self.uses_prescreen(content)
+        if media is None:
+            media = self.prepare_media(content, include_video=not prescreen)
 
         try:
-            # Format the competitor intelligence prompt
-            prompt_text = COMPETITOR_INTELLIGENCE_PROMPT.format(
-                author_username=content.author_username or "Unknown",
-                caption=content.caption or "No caption provided",
-                subtitles=subtitles or "No subtitles available",
-                likes=content.likes or 0,
-                comments=content.comments or 0,
-                views=content.views or 0
-            )
-
-            # Add video analysis context to prompt
-            if video_available:
-                prompt_text = f"""You are analyzing a TikTok VIDEO (visual + audio content).
-
-Pay attention to:
-- Visual presentation and editing style
-- On-screen text and graphics
-- Speaker delivery and energy
-- Production quality and professionalism
-- Visual storytelling techniques
-
-{prompt_text}"""
-
-            # Generate analysis with video if available
-            if video_available and video_file:
-                print(f"   📤 Uploading video to Gemini...")
-                # Read video file as bytes
-                with open(video_file, 'rb') as f:
-                    video_data = f.read()
-
-                print(f"   🎬 Analyzing video with AI (this may take 60-90 seconds)...")
-                # Use Part API for inline video data
-                video_part = {"mime_type": "video/mp4", "data": video_data}
-                response = self.model.generate_content([video_part, prompt_text])
-            else:
-                # Text-only analysis
-                print(f"   📝 Analyzing text only...")
-                response = self.model.generate_content(prompt_text)
-
-            # Parse and structure the response for competitor intelligence
-            result = parse_competitor_intelligence_response(content.content_id, response.text)
+            # Tier 1: cheap text pre-screen; only relevant items escalate to video
+            if prescreen:
+                score = self._prescreen(content, media.subtitles)
+                if score is not None and score < self.prescreen_threshold:
+                    print(f"   ⏭️  Pre-screen score {score}/10 < {self.prescreen_threshold} - skipping video analysis")
+                    return self._prescreened_result(content, score, fallback_category)
+                if not media.has_video:
+                    self.attach_video(content, media)
+
+            # Keyframes mode swaps the video for frames + transcript (falls back to video)
+            if self._use_keyframes(content, media):
+                video_context = KEYFRAME_CONTEXT.format(frame_count=len(media.keyframes))
+
+            # Model tier for this strategy and modality
+            kind = "keyframes" if media.keyframes else "video" if media.has_video else "text"
+            tier = self.router.tier_for(content.monitoring_strategy, kind)
+
+            # Same content, media, prompt and model -> reuse the recorded response
+            cache_key = self._analysis_cache_key(content, media, prompt_template, video_context, self.router.model_for(tier))
+            if cache_key:
+                cached = self.result_cache.get(cache_key, parser)
+                if cached:
+                    print(f"   ♻️ Using cached analysis for {content.content_id}")
+                    return cached
+
+            # Reposts/stitches of an already analyzed video reuse its result
+            signature = self._dedup_signature(content, media)
+            dedup_prompt_hash = ResultCache.prompt_hash(prompt_template, video_context if media.has_video else "")
+            if signature:
+                duplicate = self.dedup_index.find(content.content_id, content.monitoring_strategy, dedup_prompt_hash, signature)
+                if duplicate:
+                    return self._duplicate_result(content, duplicate)
+
+            generation = {
+                "prompt_template": prompt_template, "video_context": video_context, "parser": parser,
+                "response_schema": response_schema
+            }
+            response, result = self._generate_analysis(content, media, model_name=self.router.model_for(tier), **generation)
+
+            # Borderline or unparseable results from a cheap tier re-run on a stronger one
+            next_tier = self.router.escalation_tier(content.monitoring_strategy, tier, result)
+            if next_tier:
+                reason = result.error or f"score {result.strategic_score}/10"
+                print(f"   ⬆️ Escalating from {tier} to {next_tier} model ({reason})")
+                response, result = self._generate_analysis(
+                    content, media, model_name=self.router.model_for(next_tier), call_type="escalation", **generation
+                )
+
+            # Failed parses and streams stopped at a low score aren't cached (a
+            # re-run should retry them, and partial text would re-parse with
+            # missing fields); escalated responses are cached under the first
+            # tier's key so re-runs don't pay for both calls again
+            stopped = isinstance(response, StreamedResponse) and response.stopped
+            if cache_key and not stopped and not result.error:
+                self.result_cache.put(cache_key, response.text, result)
+            if signature and not result.error:
+                self.dedup_index.add(content.content_id, content.monitoring_strategy, dedup_prompt_hash, signature, result)
 
             return result
 
         finally:
-            # Clean up temporary video file
-            if video_file and os.path.exists(video_file):
-                try:
-                    os.remove(video_file)
-                    print(f"   🗑️ Cleaned up temporary video file")
-                except Exception as e:
-                    print(f"   ⚠️ Failed to cleanup video file: {e}")
-
-    def _analyze_niche_deepdive(self, content: TikTokContent) -> Optional[AnalysisResult]:
-        """Analyze content for niche deep-dive insights (content strategies from adjacent niches)"""
+            # Clean up temporary video file and release prefetch budget
+            media.close()
+
+    def _generate_analysis(
+        self,
+        content: TikTokContent,
+        media: PreparedMedia,
+        prompt_template: str,
+        video_context: str,
+        parser: Callable[[str, str], AnalysisResult],
+        response_schema: Optional[Dict[str, Any]],
+        model_name: str,
+        call_type: str = "analysis"
+    ) -> Tuple[Any, AnalysisResult]:
+        """One strategy analysis call on model_name: prompt + media in, (response, parsed result) out"""
+        prompt_text = self._format_prompt(content, media, prompt_template, video_context)
+
+        # Generate analysis with keyframes or video if available
+        call_info = {
+            "content": content, "media": media, "stop_below": self.stream_stop_below,
+            "model_name": model_name, "call_type": call_type
+        }
+        if media.keyframes:
+            print(f"   🖼️ Analyzing {len(media.keyframes)} keyframes + subtitles ({model_name})...")
+            response = self._generate([*self._keyframe_parts(media), prompt_text], response_schema, **call_info)
+        elif media.has_video:
+            print(f"   📤 Uploading video to Gemini...")
+            video_part = self.video_part(content, media)
+
+            print(f"   🎬 Analyzing video with AI ({model_name}, this may take 60-90 seconds)...")
+            response = self._generate([video_part, prompt_text], response_schema, **call_info)
+        else:
+            # Text-only analysis
+            print(f"   📝 Analyzing text only ({model_name})...")
+            response = self._generate(prompt_text, response_schema, **call_info)
 
-        # Get subtitle text if available
-        subtitles = ""
-        if content.subtitle_url:
-            subtitles = self._fetch_subtitles(content.subtitle_url)
+        # Streaming stopped at a low score: Stage 1 + score only
+        if isinstance(response, StreamedResponse) and response.stopped:
+            print(f"   ✂️ Stopped at Stage 2 score {response.score}/10 < {self.stream_stop_below}")
+            return response, self._stopped_result(content, response, parser)
 
-        # Try to download and analyze video if available
-        video_file = None
-        video_available = False
+        # Parse and structure the response
+        return response, parser(content.content_id, response.text)
+
+    @staticmethod
+    def _duplicate_result(content: TikTokContent, duplicate) -> AnalysisResult:
+        """Reuse a near-duplicate's result under this item's content_id"""
+        print(f"   🔁 Near-duplicate of {duplicate.content_id} - reusing its analysis")
+        return replace(
+            duplicate.result,
+            content_id=content.content_id,
+            summary=f"{duplicate.result.summary} | Near-duplicate of {duplicate.content_id}"
+        )
 
-        if content.video_download_url:
-            print(f"   📥 Downloading video from {content.video_download_url[:60]}...")
-            video_file = self._download_video(content.video_download_url, content.content_id)
-            if video_file:
-                print(f"   ✅ Video downloaded: {video_file}")
-                video_available = True
-            else:
-                print(f"   ⚠️ Video download failed, falling back to text-only analysis")
+    @staticmethod
+    def _stopped_result(content: TikTokContent, response: StreamedResponse, parser: Callable[[str, str], AnalysisResult]) -> AnalysisResult:
+        """Result for a stream stopped at a low Stage 2 score (insights never generated)"""
+        partial = parser(content.content_id, response.text)
+        return replace(
+            partial,
+            strategic_score=response.score,
+            strategic_insights="",
+            error=None,
+            summary=f"Strategic Score: {response.score}/10 | Stopped early (low score)"
+        )
 
-        try:
-            # Format the niche deep-dive prompt
-            prompt_text = NICHE_DEEPDIVE_PROMPT.format(
-                author_username=content.author_username or "Unknown",
-                caption=content.caption or "No caption provided",
-                subtitles=subtitles or "No subtitles available",
-                likes=content.likes or 0,
-                comments=content.comments or 0,
-                views=content.views or 0
+    def _strategy_spec(self, strategy: str) -> Dict[str, Any]:
+        """Prompt, parser and response schema for a strategy in the configured output mode"""
+        if self.output_mode == "json":
+            return {**STRATEGY_ANALYSIS[strategy], **STRUCTURED_ANALYSIS[strategy]}
+        return dict(STRATEGY_ANALYSIS[strategy])
+
+    def analysis_mode(self, content: TikTokContent) -> str:
+        """Visual input for the item's strategy: video (default) or keyframes"""
+        return self.analysis_modes.get(content.monitoring_strategy, "video")
+
+    def _use_keyframes(self, content: TikTokContent, media: PreparedMedia) -> bool:
+        """Extract keyframes when the strategy asks for them; False means send the video"""
+        if self.analysis_mode(content) != "keyframes" or not media.video_file:
+            return False
+        if not media.keyframes:
+            media.keyframes = self.preprocessor.keyframes(
+                media.video_file,
+                count=int(self.keyframe_settings.get("count", 6)),
+                max_height=int(self.keyframe_settings.get("max_height", 720))
             )
+        return bool(media.keyframes)
+
+    @staticmethod
+    def _keyframe_parts(media: PreparedMedia) -> List[Dict[str, Any]]:
+        return [{"mime_type": "image/jpeg", "data": frame} for frame in media.keyframes]
+
+    def _format_prompt(
+        self,
+        content: TikTokContent,
+        media: PreparedMedia,
+        prompt_template: str,
+        video_context: str
+    ) -> str:
+        """Format the strategy prompt, with the video context when a video is attached"""
+        prompt_text = prompt_template.format(
+            author_username=content.author_username or "Unknown",
+            caption=content.caption or "No caption provided",
+            subtitles=media.subtitles or "No subtitles available",
+            likes=content.likes or 0,
+            comments=content.comments or 0,
+            views=content.views or 0
+        )
 
-            # Add video analysis context to prompt
-            if video_available:
-                prompt_text = f"""You are analyzing a TikTok VIDEO (visual + audio content).
-
-Pay attention to:
-- Visual presentation and editing style
-- On-screen text and graphics
-- Speaker delivery and energy
-- Content strategy techniques (hooks, format, engagement tactics)
-- Trending topics and themes in this niche space
-
-{prompt_text}"""
-
-            # Generate analysis with video if available
-            if video_available and video_file:
-                print(f"   📤 Uploading video to Gemini...")
-                # Read video file as bytes
-                with open(video_file, 'rb') as f:
-                    video_data = f.read()
-
-                print(f"   🎬 Analyzing video with AI (this may take 60-90 seconds)...")
-                # Use Part API for inline video data
-                video_part = {"mime_type": "video/mp4", "data": video_data}
-                response = self.model.generate_content([video_part, prompt_text])
-            else:
-                # Text-only analysis
-                print(f"   📝 Analyzing text only...")
-                response = self.model.generate_content(prompt_text)
+        # Add video analysis context to prompt
+        if media.has_video:
+            prompt_text = f"{video_context}{prompt_text}"
+        return prompt_text
+
+    def _analysis_cache_key(
+        self,
+        content: TikTokContent,
+        media: PreparedMedia,
+        prompt_template: str,
+        video_context: str,
+        model_name: Optional[str] = None
+    ):
+        """Result cache key for a strategy analysis (None when the cache is disabled)"""
+        if not self.result_cache:
+            return None
+        return ResultCache.make_key(
+            content.content_id,
+            media.media_hash(),
+            ResultCache.prompt_hash(prompt_template, video_context if media.has_video else ""),
+            model_name or self.model_name
+        )
+
+    def _dedup_signature(self, content: TikTokContent, media: PreparedMedia) -> Optional[DedupSignature]:
+        """Near-duplicate signature (None when the index is disabled or there's nothing to compare)"""
+        if not self.dedup_index:
+            return None
+        frame_hashes = []
+        if self.dedup_settings.get("frame_hashes") and media.video_file:
+            frame_hashes = self.preprocessor.frame_hashes(media.video_file, count=int(self.dedup_settings.get("frame_count", 4)))
+        signature = self.dedup_index.signature(content.caption, media.subtitles, frame_hashes)
+        return None if signature.empty else signature
+
+    def uses_prescreen(self, content: TikTokContent) -> bool:
+        """Items with a video in a tiered strategy get the text pre-screen first"""
+        return (
+            bool(self.tiering.get("enabled"))
+            and bool(content.video_download_url)
+            and content.monitoring_strategy in self.tiering.get("strategies", MEDIA_STRATEGIES)
+        )
 
-            # Parse and structure the response for niche deep-dive
-            result = parse_niche_deepdive_response(content.content_id, response.text)
+    def _prescreen(self, content: TikTokContent, subtitles: str) -> Optional[int]:
+        """
+        Score caption/subtitle relevance on the 0-10 scale
+        method (tiered_analysis.method): "text_model", "keywords" (free, local)
+        or "keywords_then_model" (model call only for keyword survivors)
+        """
+        keyword_score = self._keyword_prescreen(content, subtitles)
+        if keyword_score is not None:
+            return keyword_score
+
+        model_name = self.router.model_for(self.router.tier_for(content.monitoring_strategy, "prescreen"))
+        cache_key = self._prescreen_cache_key(content, subtitles, model_name)
+        if cache_key:
+            cached = self.result_cache.get(cache_key, parse_prescreen_response)
+            if cached:
+                return cached.strategic_score
+
+        prompt_text = self._prescreen_prompt(content, subtitles)
+        print(f"   🔎 Pre-screening caption/subtitles ({model_name})...")
+        response = self._generate(prompt_text, content=content, call_type="prescreen", model_name=model_name)
+        result = parse_prescreen_response(content.content_id, response.text)
+
+        if cache_key and not result.error:
+            self.result_cache.put(cache_key, response.text, result)
+        return result.strategic_score
+
+    def _keyword_prescreen(self, content: TikTokContent, subtitles: str) -> Optional[int]:
+        """Local keyword score when it settles the pre-screen, else None (model call needed)"""
+        method = self.tiering.get("method", "text_model")
+        if method in ("keywords", "keywords_then_model"):
+            keyword_score = self.keyword_scorer.score(content.caption or "", subtitles).as_ten_point()
+            if method == "keywords" or keyword_score < self.prescreen_threshold:
+                print(f"   🔤 Keyword relevance: {keyword_score}/10")
+                return keyword_score
+        return None
+
+    def _prescreen_prompt(self, content: TikTokContent, subtitles: str) -> str:
+        return PRESCREEN_PROMPT.format(
+            author_username=content.author_username or "Unknown",
+            caption=content.caption or "No caption provided",
+            subtitles=subtitles or "No subtitles available"
+        )
 
-            return result
+    def _prescreen_cache_key(self, content: TikTokContent, subtitles: str, model_name: Optional[str] = None):
+        if not self.result_cache:
+            return None
+        return ResultCache.make_key(
+            content.content_id,
+            PreparedMedia(subtitles=subtitles).media_hash(),
+            ResultCache.prompt_hash(PRESCREEN_PROMPT),
+            model_name or self.model_name
+        )
 
-        finally:
-            # Clean up temporary video file
-            if video_file and os.path.exists(video_file):
-                try:
-                    os.remove(video_file)
-                    print(f"   🗑️ Cleaned up temporary video file")
-                except Exception as e:
-                    print(f"   ⚠️ Failed to cleanup video file: {e}")
+    def _prescreened_result(self, content: TikTokContent, score: int, fallback_category: str) -> AnalysisResult:
+        """Record a low pre-screen score so the item isn't re-queued every run"""
+        return AnalysisResult(
+            content_id=content.content_id,
+            general_analysis=f"Pre-screened as low relevance from caption/subtitles (score {score}/10); video analysis skipped.",
+            strategic_score=score,
+            content_type=fallback_category,
+            strategic_insights="",
+            summary=f"Strategic Score: {score}/10 | Pre-screen only"
+        )
 
     def _analyze_general(self, content: TikTokContent) -> Optional[AnalysisResult]:
         """Legacy general analysis method"""
@@ -237,7 +622,7 @@ Pay attention to:
         analysis_input = self._prepare_analysis_input(content)
 
         # Generate analysis using Gemini
-        response = self.model.generate_content(analysis_input)
+        response = self._generate(analysis_input, content=content)
 
         # Parse and structure the response
         result = parse_general_analysis_response(content.content_id, response.text)
@@ -260,12 +645,131 @@ Pay attention to:
 
         return prompt
 
-    def _fetch_subtitles(self, subtitle_url: str) -> str:
-        """Fetch subtitle text from URL"""
+    def needs_media(self, content: TikTokContent) -> bool:
+        """Check if analyze_content will fetch subtitles/video for this item"""
+        return self.model is not None and content.monitoring_strategy in MEDIA_STRATEGIES
+
+    def prepare_media(self, content: TikTokContent, include_video: bool = True) -> PreparedMedia:
+        """Fetch subtitles and (optionally) the video for one item"""
+        media = PreparedMedia()
+
+        # Get subtitle text if available
+        if content.subtitle_url:
+            start = time.time()
+            media.subtitles = self._fetch_subtitles(content.subtitle_url, content.content_id)
+            media.download_seconds += time.time() - start
+        media.size_bytes = len(media.subtitles.encode('utf-8'))
+
+        if include_video:
+            self.attach_video(content, media)
+        return media
+
+    def attach_video(self, content: TikTokContent, media: PreparedMedia):
+        """Add the video to prepared media: live Gemini file, cached blob, or fresh download"""
+        profile = self.preprocessor.profile_for(content.monitoring_strategy)
+        video_kind = self._video_kind(profile)
+
+        # Reuse a live Gemini file handle instead of downloading again
+        # (keyframes mode needs the local file to extract frames from)
+        if self.upload_mode == "file_api" and self.analysis_mode(content) != "keyframes":
+            media.file_handle = self.file_registry.get(self._video_key(content))
+            if media.file_handle:
+                print(f"   ♻️ Reusing uploaded Gemini file {media.file_handle.name}")
+                media.video_sha256 = media.file_handle.sha256
+
+        # Try the media cache, then download video if available
+        if content.video_download_url and not media.file_handle:
+            if self.media_cache:
+                media.video_file = self.media_cache.get_path(video_kind, content.content_id)
+                if media.video_file:
+                    print(f"   ♻️ Using cached video: {media.video_file}")
+
+            if not media.video_file:
+                print(f"   📥 Downloading video from {content.video_download_url[:60]}...")
+                start = time.time()
+                media.video_file = self._download_video(content.video_download_url, content.content_id)
+                media.download_seconds += time.time() - start
+                if media.video_file:
+                    print(f"   ✅ Video downloaded: {media.video_file}")
+                    if profile:
+                        media.video_file = self._preprocess_video(content, media.video_file, profile, video_kind)
+                else:
+                    print(f"   ⚠️ Video download failed, falling back to text-only analysis")
+
+            if media.video_file:
+                media.video = MediaHandle(media.video_file, buffer_max_bytes=self.media_buffer_max_bytes)
+                media.size_bytes += media.video.size_bytes
+                if self.media_cache:
+                    # Blob names are their SHA-256, so the hash comes for free
+                    media.video_sha256 = os.path.basename(media.video_file)
+                    # Cached blobs are shared: unpin instead of deleting on close
+                    media.owns_file = False
+                    media.close_callbacks.append(lambda m: self.media_cache.release(m.video_file))
+                else:
+                    media.video_sha256 = media.video.sha256()
+
+    def _video_kind(self, profile: Optional[Dict[str, Any]]) -> str:
+        """Media cache kind: original videos, or one kind per preprocessing profile"""
+        return f"video@{VideoPreprocessor.profile_id(profile)}" if profile else "video"
+
+    def _video_key(self, content: TikTokContent) -> str:
+        """File registry key: preprocessed uploads are distinct from the original"""
+        profile = self.preprocessor.profile_for(content.monitoring_strategy)
+        return f"{content.content_id}@{VideoPreprocessor.profile_id(profile)}" if profile else content.content_id
+
+    def _preprocess_video(self, content: TikTokContent, video_file: str, profile: Dict[str, Any], video_kind: str) -> str:
+        """
+        Shrink a freshly downloaded video with the strategy's ffmpeg profile
+        Returns a path with the same ownership as video_file (pinned cache blob
+        or temp file); the original is kept if preprocessing doesn't help
+        """
+        processed = self.preprocessor.process(video_file, profile)
+        chosen = processed or video_file
+
+        if not self.media_cache:
+            if processed:
+                os.remove(video_file)
+            return chosen
+
+        # Store the result under the profile's kind so re-analysis skips ffmpeg
+        cached = self.media_cache.put_stream(video_kind, content.content_id, MediaHandle(chosen).chunks())
+        if processed:
+            os.remove(processed)
+        self.media_cache.release(video_file)
+        return cached
+
+    def video_part(self, content: TikTokContent, media: PreparedMedia):
+        """
+        Build the video prompt part for prepared media
+        file_api mode uploads once (or reuses the recorded handle); inline mode
+        sends the raw bytes, which is also the fallback if the upload fails
+        """
+        if self.upload_mode == "file_api":
+            try:
+                if not media.file_handle:
+                    media.file_handle = self.file_registry.upload(self._video_key(content), media.video, sha256=media.video_sha256)
+                return media.file_handle.to_part()
+            except Exception as e:
+                if not media.video_file:
+                    raise
+                print(f"   ⚠️ Gemini file upload failed, sending video inline: {e}")
+
+        # Inline video data (the handle keeps small clips buffered between calls)
+        return media.video.inline_part()
+
+    def _fetch_subtitles(self, subtitle_url: str, content_id: Optional[str] = None) -> str:
+        """Fetch subtitle text from URL (raw file served from the media cache when possible)"""
         try:
+            if self.media_cache and content_id:
+                raw = self.media_cache.get_text("subtitle", content_id)
+                if raw is not None:
+                    return parse_subtitle_content(raw)
+
             if subtitle_url:
                 response = requests.get(subtitle_url, timeout=10)
                 if response.status_code == 200:
+                    if self.media_cache and content_id:
+                        self.media_cache.put_text("subtitle", content_id, response.text)
                     # Parse subtitle format (SRT, VTT, etc.)
                     return parse_subtitle_content(response.text)
         except Exception as e:
@@ -275,8 +779,8 @@ Pay attention to:
 
     def _download_video(self, video_url: str, content_id: str) -> Optional[str]:
         """
-        Download video to temporary file for AI analysis
-        Returns: Path to temporary video file, or None if download fails
+        Download video for AI analysis (into the media cache when enabled)
+        Returns: Path to cached or temporary video file, or None if download fails
         """
         try:
             # Download video with streaming
@@ -284,6 +788,10 @@ Pay attention to:
             if response.status_code != 200:
                 return None
 
+            # Stream straight into the cache (atomic write, content-addressed)
+            if self.media_cache:
+                return self.media_cache.put_stream("video", content_id, response.iter_content(chunk_size=DEFAULT_CHUNK_SIZE))
+
             # Create temporary file
             suffix = '.mp4'  # Default to mp4
             temp_file = tempfile.NamedTemporaryFile(
@@ -293,7 +801,7 @@ Pay attention to:
             )
 
             # Write video content
-            for chunk in response.iter_content(chunk_size=8192):
+            for chunk in response.iter_content(chunk_size=DEFAULT_CHUNK_SIZE):
                 if chunk:
                     temp_file.write(chunk)
 
@@ -304,10 +812,17 @@ Pay attention to:
             print(f"   ❌ Video download error: {e}")
             return None
 
-    def batch_analyze(self, content_list: List[TikTokContent], analysis_type: str = "competitor_intelligence") -> List[AnalysisResult]:
+    def batch_analyze(
+        self,
+        content_list: List[TikTokContent],
+        analysis_type: str = "competitor_intelligence",
+        max_workers: Optional[int] = None
+    ) -> List[AnalysisResult]:
         """
         Analyze multiple content items with strategy-aware routing
-        Tracks and reports metrics by monitoring strategy
+        Items run concurrently on a bounded worker pool while a prefetcher
+        downloads media for upcoming items; results are returned in completion
+        order. Tracks and reports metrics by monitoring strategy
         """
         results = []
 
@@ -318,21 +833,57 @@ Pay attention to:
             "Niche Deep-Dive": {"analyzed": 0, "skipped": 0},
             "Unknown": {"analyzed": 0, "skipped": 0}
         }
+        # Guards strategy_counts, results and deferred
+        counts_lock = threading.Lock()
+
+        # Text-only items set aside for grouped requests (text_group_size > 1)
+        deferred: List[Tuple[TikTokContent, PreparedMedia]] = []
 
-        for content in content_list:
+        def analyze_one(content: TikTokContent):
             strategy = content.monitoring_strategy or "Unknown"
             strategy_label = strategy if strategy in strategy_counts else "Unknown"
 
+            # Blocks only if the prefetcher hasn't finished this item's download yet
+            media = prefetcher.get(content)
+            if self._groupable(content, media):
+                # The group runs after the pool drains; don't hold up downloads meanwhile
+                media.release_budget()
+                with counts_lock:
+                    deferred.append((content, media))
+                return []
+
             print(f"🤖 Analyzing {content.content_id} ({strategy_label})...")
-            result = self.analyze_content(content, analysis_type)
+            return [(content, self.analyze_content(content, analysis_type, media))]
+
+        def finish(content: TikTokContent, result: Optional[AnalysisResult]):
+            strategy = content.monitoring_strategy or "Unknown"
+            strategy_label = strategy if strategy in strategy_counts else "Unknown"
+            with counts_lock:
+                strategy_counts[strategy_label]["analyzed" if result else "skipped"] += 1
+                if result:
+                    results.append(result)
 
             if result:
-                results.append(result)
-                strategy_counts[strategy_label]["analyzed"] += 1
                 # Update content with analysis results
                 self._update_content_with_analysis(content, result)
-            else:
-                strategy_counts[strategy_label]["skipped"] += 1
+
+        workers = max(1, min(max_workers or self.max_workers, len(content_list) or 1))
+        prefetcher = MediaPrefetcher(
+            self, content_list,
+            workers=PREFETCH_WORKERS,
+            max_buffered_bytes=PREFETCH_MAX_BUFFERED_MB * 1024 * 1024
+        )
+        with prefetcher, ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analysis") as executor:
+            futures = [executor.submit(analyze_one, content) for content in content_list]
+            for future in as_completed(futures):
+                for content, result in future.result():
+                    finish(content, result)
+
+            # Deferred text-only items: one request per group
+            group_futures = [executor.submit(self._analyze_text_group, group) for group in self._text_groups(deferred)]
+            for future in as_completed(group_futures):
+                for content, result in future.result():
+                    finish(content, result)
 
         # Print summary report
         print(f"\n📊 Analysis complete:")
@@ -351,6 +902,353 @@ Pay attention to:
 
         return results
 
+    def close(self):
+        """Stop the preprocessing worker processes and write buffered cache state (the analyzer stays usable)"""
+        self.preprocessor.shutdown()
+        if self.media_cache:
+            self.media_cache.flush()
+
+    def analyze_item(self, content: TikTokContent) -> Optional[AnalysisResult]:
+        """Analyze one item as it arrives and copy the results onto it (streaming pipeline)"""
+        result = self.analyze_content(content)
+        if result:
+            self._update_content_with_analysis(content, result)
+        return result
+
+    def _groupable(self, content: TikTokContent, media: Optional[PreparedMedia]) -> bool:
+        """
+        Genuinely text-only items (no video URL) that can share a grouped request
+        Items with a video - pre-screened, or whose download failed - keep the
+        single-item flow (pre-screen first, text-only fallback)
+        """
+        return (
+            self.text_group_size > 1
+            and media is not None
+            and not content.video_download_url
+            and not media.has_video
+            and content.monitoring_strategy in GROUPED_SCHEMAS
+        )
+
+    def _text_groups(self, items: List[Tuple[TikTokContent, PreparedMedia]]) -> List[List[Tuple[TikTokContent, PreparedMedia]]]:
+        """Split deferred text-only items into per-strategy groups of text_group_size"""
+        by_strategy: Dict[str, List[Tuple[TikTokContent, PreparedMedia]]] = {}
+        for content, media in items:
+            by_strategy.setdefault(content.monitoring_strategy, []).append((content, media))
+        return [
+            items_for_strategy[i:i + self.text_group_size]
+            for items_for_strategy in by_strategy.values()
+            for i in range(0, len(items_for_strategy), self.text_group_size)
+        ]
+
+    def _analyze_text_group(self, group: List[Tuple[TikTokContent, PreparedMedia]]) -> List[Tuple[TikTokContent, Optional[AnalysisResult]]]:
+        """
+        Analyze text-only items of one strategy in a single request
+        The rubric is sent once, followed by one delimited section per item;
+        the JSON array response is split by item_id and each entry parsed like
+        a single JSON-mode response. Items missing from the response or
+        failing to parse are retried individually
+        """
+        strategy = group[0][0].monitoring_strategy
+        spec = {**STRATEGY_ANALYSIS[strategy], **STRUCTURED_ANALYSIS[strategy]}
+        parser = spec["parser"]
+        dedup_prompt_hash = ResultCache.prompt_hash(spec["prompt_template"], "")
+        tier = self.router.tier_for(strategy, "grouped")
+        model_name = self.router.model_for(tier)
+
+        results: List[Tuple[TikTokContent, Optional[AnalysisResult]]] = []
+        pending = []  # (content, media, cache_key, signature)
+        try:
+            # Recorded and near-duplicate results need no model call
+            for content, media in group:
+                cache_key = self._analysis_cache_key(content, media, spec["prompt_template"], "", model_name)
+                cached = self.result_cache.get(cache_key, parser) if cache_key else None
+                if cached:
+                    print(f"   ♻️ Using cached analysis for {content.content_id}")
+                    results.append((content, cached))
+                    continue
+
+                signature = self._dedup_signature(content, media)
+                duplicate = self.dedup_index.find(content.content_id, strategy, dedup_prompt_hash, signature) if signature else None
+                if duplicate:
+                    results.append((content, self._duplicate_result(content, duplicate)))
+                    continue
+                pending.append((content, media, cache_key, signature))
+
+            if not pending:
+                return results
+
+            print(f"🤖 Analyzing {len(pending)} text-only items ({strategy}) in one request ({model_name})...")
+            prompt_text = (
+                GROUPED_PREFIXES[strategy]
+                + GROUPED_ITEMS_INSTRUCTIONS.format(item_count=len(pending))
+                + "".join(
+                    self._format_prompt(content, media, GROUPED_ITEM_TEMPLATE.replace("{item_id}", str(content.content_id)), "")
+                    for content, media, _, _ in pending
+                )
+            )
+            try:
+                response = self._generate(
+                    prompt_text, GROUPED_SCHEMAS[strategy],
+                    call_type="grouped", strategy=strategy, model_name=model_name, items=len(pending)
+                )
+                item_texts = split_grouped_response(response.text)
+            except Exception as e:
+                print(f"   ⚠️ Grouped analysis failed, analyzing items individually: {e}")
+                item_texts = {}
+
+            for content, media, cache_key, signature in pending:
+                item_text = item_texts.get(str(content.content_id))
+                result = parser(content.content_id, item_text) if item_text else None
+                if result is None or result.error:
+                    print(f"   🔁 {content.content_id} missing or malformed in grouped response - retrying individually")
+                    results.append((content, self.analyze_content(content, media=media)))
+                    continue
+
+                # Borderline items re-run alone on the stronger tier
+                next_tier = self.router.escalation_tier(strategy, tier, result)
+                if next_tier:
+                    print(f"   ⬆️ Escalating {content.content_id} from {tier} to {next_tier} model (score {result.strategic_score}/10)")
+                    try:
+                        response, escalated = self._generate_analysis(
+                            content, media, spec["prompt_template"], "", parser, spec["response_schema"],
+                            self.router.model_for(next_tier), call_type="escalation"
+                        )
+                        if not escalated.error:
+                            item_text, result = response.text, escalated
+                    except Exception as e:
+                        print(f"   ⚠️ Escalation failed, keeping the {tier} result: {e}")
+
+                if cache_key and not result.error:
+                    self.result_cache.put(cache_key, item_text, result)
+                if signature:
+                    self.dedup_index.add(content.content_id, strategy, dedup_prompt_hash, signature, result)
+                results.append((content, result))
+            return results
+
+        finally:
+            for _, media in group:
+                media.close()
+
+    def batch_analyze_offline(self, content_list: List[TikTokContent]) -> List[AnalysisResult]:
+        """
+        Analyze a backlog through Gemini batch jobs instead of synchronous calls
+        Same prompts, parsers, pre-screen tier, model routing and result cache
+        as batch_analyze: each tier's requests are submitted as batch jobs (one
+        per routed model) and polled until done, with videos passed by File API
+        URI; escalations run as a further round. Meant for non-urgent backfills;
+        interactive runs keep using batch_analyze
+        """
+        if not self.model:
+            return []
+
+        # A batch job targets one model; collect jobs an interrupted run left for each
+        clients: Dict[str, GeminiBatchClient] = {}
+        for model_name in self.router.models():
+            clients[model_name] = GeminiBatchClient(
+                GEMINI_API_KEY, model_name,
+                poll_interval=GEMINI_BATCH_POLL_SECONDS,
+                max_requests_per_job=GEMINI_BATCH_MAX_REQUESTS
+            )
+            self._collect_pending_batches(clients[model_name])
+
+        items = [c for c in content_list if c.monitoring_strategy in STRATEGY_ANALYSIS]
+        print(f"📦 Batch mode: {len(items)} items to analyze, {len(content_list) - len(items)} skipped (no prompt for strategy)")
+        if not items:
+            return []
+
+        # Subtitles for everything; videos wait until the pre-screen has run
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="batch-media") as executor:
+            media_list = list(executor.map(lambda c: self.prepare_media(c, include_video=False), items))
+
+        analyzed: Dict[int, AnalysisResult] = {}
+        try:
+            # Tier 1: pre-screen (keywords locally, text model via batch job)
+            escalate: List[int] = []
+            prescreen_requests: Dict[str, List[BatchRequest]] = {}
+            for i, (content, media) in enumerate(zip(items, media_list)):
+                if not self.uses_prescreen(content):
+                    escalate.append(i)
+                    continue
+
+                score = self._keyword_prescreen(content, media.subtitles)
+                if score is None:
+                    model_name = self.router.model_for(self.router.tier_for(content.monitoring_strategy, "prescreen"))
+                    cache_key = self._prescreen_cache_key(content, media.subtitles, model_name)
+                    cached = self.result_cache.get(cache_key, parse_prescreen_response) if cache_key else None
+                    if not cached:
+                        prescreen_requests.setdefault(model_name, []).append(BatchRequest(
+                            key=f"prescreen:{i}",
+                            contents=self._prescreen_prompt(content, media.subtitles),
+                            metadata=self._batch_metadata(content, cache_key, parse_prescreen_response)
+                        ))
+                        continue
+                    score = cached.strategic_score
+
+                if score is not None and score < self.prescreen_threshold:
+                    analyzed[i] = self._prescreened_result(content, score, STRATEGY_ANALYSIS[content.monitoring_strategy]["fallback_category"])
+                else:
+                    escalate.append(i)
+
+            prescreened = self._run_batch(clients, prescreen_requests, "prescreen")
+            for request in (r for requests_for_model in prescreen_requests.values() for r in requests_for_model):
+                i = int(request.key.split(":", 1)[1])
+                result = prescreened.get(request.key)
+                if result and result.strategic_score is not None and result.strategic_score < self.prescreen_threshold:
+                    analyzed[i] = self._prescreened_result(items[i], result.strategic_score, STRATEGY_ANALYSIS[items[i].monitoring_strategy]["fallback_category"])
+                else:
+                    # Relevant, or the pre-screen failed (escalates, as in the synchronous flow)
+                    escalate.append(i)
+
+            # Tier 2: strategy analysis, videos uploaded once and referenced by URI
+            if self.file_registry is None:
+                self.file_registry = GeminiFileRegistry()
+
+            def prepare_video(i: int):
+                content, media = items[i], media_list[i]
+                if content.video_download_url and not media.has_video:
+                    self.attach_video(content, media)
+                if self._use_keyframes(content, media):
+                    return
+                if media.has_video and not media.file_handle:
+                    media.file_handle = self.file_registry.upload(self._video_key(content), media.video, sha256=media.video_sha256)
+
+            analysis_requests: Dict[str, List[BatchRequest]] = {}
+            tiers: Dict[int, str] = {}
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="batch-upload") as executor:
+                futures = {i: executor.submit(prepare_video, i) for i in sorted(escalate)}
+
+            for i, future in futures.items():
+                content, media = items[i], media_list[i]
+                if future.exception():
+                    # Inline video bytes don't fit batch payloads; leave the item for the next run
+                    print(f"   ⚠️ {content.content_id}: video upload failed, not queued ({future.exception()})")
+                    continue
+
+                kind = "keyframes" if media.keyframes else "video" if media.has_video else "text"
+                tiers[i] = self.router.tier_for(content.monitoring_strategy, kind)
+                model_name = self.router.model_for(tiers[i])
+                request = self._analysis_batch_request(f"analysis:{i}", content, media, model_name)
+                if request.metadata["cache_key"]:
+                    cached = self.result_cache.get(tuple(request.metadata["cache_key"]), PARSERS_BY_NAME[request.metadata["parser"]])
+                    if cached:
+                        analyzed[i] = cached
+                        continue
+                analysis_requests.setdefault(model_name, []).append(request)
+
+            # Tier 3: borderline or unparseable results re-run on the stronger tier,
+            # cached under the first tier's key as in the synchronous flow
+            escalation_requests: Dict[str, List[BatchRequest]] = {}
+            for key, result in self._run_batch(clients, analysis_requests, "analysis").items():
+                i = int(key.split(":", 1)[1])
+                analyzed[i] = result
+                next_tier = self.router.escalation_tier(items[i].monitoring_strategy, tiers[i], result)
+                if next_tier:
+                    escalation_requests.setdefault(self.router.model_for(next_tier), []).append(
+                        self._analysis_batch_request(
+                            f"escalation:{i}", items[i], media_list[i], self.router.model_for(next_tier),
+                            cache_model=self.router.model_for(tiers[i])
+                        )
+                    )
+
+            for key, result in self._run_batch(clients, escalation_requests, "escalation").items():
+                if not result.error:
+                    analyzed[int(key.split(":", 1)[1])] = result
+
+        finally:
+            for media in media_list:
+                media.close()
+
+        results = []
+        for i in sorted(analyzed):
+            self._update_content_with_analysis(items[i], analyzed[i])
+            results.append(analyzed[i])
+
+        print(f"\n📊 Batch analysis complete: {len(results)} analyzed, {len(items) - len(results)} not analyzed")
+        return results
+
+    def _analysis_batch_request(
+        self,
+        key: str,
+        content: TikTokContent,
+        media: PreparedMedia,
+        model_name: str,
+        cache_model: Optional[str] = None
+    ) -> BatchRequest:
+        """Strategy analysis request for a batch job (result cached under cache_model, default model_name)"""
+        spec = self._strategy_spec(content.monitoring_strategy)
+        video_context = KEYFRAME_CONTEXT.format(frame_count=len(media.keyframes)) if media.keyframes else spec["video_context"]
+        cache_key = self._analysis_cache_key(content, media, spec["prompt_template"], video_context, cache_model or model_name)
+
+        prompt_text = self._format_prompt(content, media, spec["prompt_template"], video_context)
+        if media.keyframes:
+            contents = [*self._keyframe_parts(media), prompt_text]
+        elif media.has_video:
+            contents = [media.file_handle, prompt_text]
+        else:
+            contents = prompt_text
+        return BatchRequest(
+            key=key,
+            contents=contents,
+            response_schema=spec.get("response_schema"),
+            metadata=self._batch_metadata(content, cache_key, spec["parser"])
+        )
+
+    def _batch_metadata(self, content: TikTokContent, cache_key, parser: Callable[[str, str], AnalysisResult]) -> Dict[str, Any]:
+        """What a later run needs to parse and cache a recovered batch response"""
+        return {
+            "content_id": content.content_id,
+            "cache_key": list(cache_key) if cache_key else None,
+            "parser": parser.__name__
+        }
+
+    def _parse_batch_response(self, metadata: Dict[str, Any], text: str) -> AnalysisResult:
+        parser = PARSERS_BY_NAME[metadata["parser"]]
+        result = parser(metadata["content_id"], text)
+        if self.result_cache and metadata.get("cache_key") and not result.error:
+            self.result_cache.put(tuple(metadata["cache_key"]), text, result)
+        return result
+
+    def _run_batch(
+        self,
+        clients: Dict[str, GeminiBatchClient],
+        requests_by_model: Dict[str, List[BatchRequest]],
+        label: str
+    ) -> Dict[str, AnalysisResult]:
+        """Submit each model's requests as batch job(s) and parse the responses by key"""
+        results: Dict[str, AnalysisResult] = {}
+        for model_name, batch_requests in requests_by_model.items():
+            print(f"\n📦 Submitting {len(batch_requests)} {label} requests to {model_name} as batch job(s)...")
+            by_key = {r.key: r for r in batch_requests}
+            responses = clients[model_name].run(batch_requests, display_name=f"aibrary-{label}")
+            results.update({
+                key: self._parse_batch_response(by_key[key].metadata, text)
+                for key, text in responses.items()
+                if text and key in by_key
+            })
+        return results
+
+    def _collect_pending_batches(self, client: GeminiBatchClient):
+        """Finish jobs an interrupted run submitted, so their responses land in the result cache"""
+        for job_name, job in client.pending_jobs().items():
+            if not self.result_cache:
+                print(f"   ⚠️ Pending batch job {job_name} can't be recovered without the result cache")
+                continue
+
+            print(f"   📦 Collecting batch job {job_name} from a previous run...")
+            try:
+                responses = client.wait(job_name)
+            except Exception as e:
+                print(f"   ⚠️ Could not collect batch job {job_name}: {e}")
+                continue
+
+            recovered = 0
+            for key, text in responses.items():
+                metadata = job["requests"].get(key)
+                if text and metadata and metadata.get("cache_key"):
+                    self._parse_batch_response(metadata, text)
+                    recovered += 1
+            print(f"   ♻️ Recovered {recovered} responses into the result cache")
+
     def _update_content_with_analysis(self, content: TikTokContent, result: AnalysisResult):
         """Update TikTokContent object with two-stage analysis results"""
 
@@ -374,6 +1272,19 @@ Pay attention to:
 # ANALYSIS UTILITIES
 # ==============================================================================
 
+def _media_bytes(contents, media: Optional[PreparedMedia]) -> int:
+    """Bytes of inline media (video/keyframes) or the uploaded file referenced by a call"""
+    total = 0
+    for part in contents if isinstance(contents, list) else [contents]:
+        if isinstance(part, dict) and "data" in part:
+            total += len(part["data"])
+        elif isinstance(part, genai.protos.Part) and "inline_data" in part and media is not None and media.video is not None:
+            total += media.video.size_bytes
+        elif not isinstance(part, str) and media is not None and media.file_handle is not None:
+            total += media.file_handle.size_bytes
+    return total
+
+
 def should_analyze_content(content: TikTokContent, min_engagement_rate: float = 5.0) -> bool:
     """
     Determine if content should be analyzed based on criteria
@@ -410,7 +1321,10 @@ def analyze_new_content(content_list: List[TikTokContent]) -> Dict[str, Any]:
     print(f"🎬 Analyzing {len(to_analyze)} of {len(content_list)} content items")
 
     # Perform analysis
-    results = analyzer.batch_analyze(to_analyze)
+    try:
+        results = analyzer.batch_analyze(to_analyze)
+    finally:
+        analyzer.close()
 
     # Prepare summary
     summary = {
@@ -429,6 +1343,9 @@ def analyze_new_content(content_list: List[TikTokContent]) -> Dict[str, Any]:
             category = result.content_type or "other"
             summary["categories"][category] = summary["categories"].get(category, 0) + 1
 
-        summary["avg_viral_score"] = sum(r.strategic_score for r in results) / len(results)
+        # Failed analyses carry no score
+        scores = [r.strategic_score for r in results if r.strategic_score is not None]
+        if scores:
+            summary["avg_viral_score"] = sum(scores) / len(scores)
 
     return summary
@@ -0,0 +1,224 @@
+"""
+AIbrary TikTok Monitoring System - Video Preprocessing
+Optional local ffmpeg pass shrinking videos before analysis
+
+Apify hands us the full-resolution MP4, so upload bytes and video tokens
+scale with source quality and length. When enabled in
+quality-thresholds.json (video_preprocessing), each strategy's profile
+downscales, lowers the frame rate, optionally keeps only the first N
+seconds (where the hooks are) and drops subtitle/data streams and metadata.
+Transcodes run in a process pool bounded by PREPROCESS_WORKERS, and output
+that isn't smaller than its source is discarded.
+
+The same pool extracts evenly spaced JPEG keyframes for the keyframes
+analysis mode (frames + transcript instead of the full video), and tiny
+grayscale frames for the near-duplicate index's perceptual hashes.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import multiprocessing
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from core.config import load_json_config, QUALITY_THRESHOLDS_FILE, PREPROCESS_WORKERS
+
+# Hard stop for a single transcode (TikTok videos are minutes long at most)
+TRANSCODE_TIMEOUT_SECONDS = 300
+
+# dHash input: 9x8 grayscale pixels -> 64 bits per frame
+DHASH_WIDTH, DHASH_HEIGHT = 9, 8
+
+
+def build_ffmpeg_command(src_path: str, dst_path: str, profile: Dict[str, Any]) -> List[str]:
+    """ffmpeg arguments for one preprocessing profile"""
+    cmd = ["ffmpeg", "-y", "-v", "error"]
+    if profile.get("max_duration_seconds"):
+        cmd += ["-t", str(profile["max_duration_seconds"])]
+    cmd += ["-i", src_path, "-map", "0:v:0"]
+
+    filters = []
+    if profile.get("max_height"):
+        # Never upscale; -2 keeps the width even for libx264
+        filters.append(f"scale=-2:'min({int(profile['max_height'])},ih)'")
+    if profile.get("fps"):
+        filters.append(f"fps={profile['fps']}")
+    if filters:
+        cmd += ["-vf", ",".join(filters)]
+    cmd += ["-c:v", "libx264", "-preset", "veryfast", "-crf", str(profile.get("crf", 30))]
+
+    if profile.get("strip_audio"):
+        cmd += ["-an"]
+    else:
+        cmd += ["-map", "0:a:0?", "-c:a", "aac", "-b:a", "64k", "-ac", "1"]
+
+    cmd += ["-sn", "-dn", "-map_metadata", "-1", "-movflags", "+faststart", dst_path]
+    return cmd
+
+
+def transcode_video(src_path: str, dst_path: str, profile: Dict[str, Any]) -> str:
+    """Process-pool worker: run ffmpeg for one video"""
+    subprocess.run(
+        build_ffmpeg_command(src_path, dst_path, profile),
+        check=True,
+        capture_output=True,
+        timeout=TRANSCODE_TIMEOUT_SECONDS
+    )
+    return dst_path
+
+
+def probe_duration(src_path: str) -> float:
+    """Video duration in seconds (ffprobe)"""
+    probe = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", src_path],
+        check=True, capture_output=True, text=True, timeout=60
+    )
+    duration = float(probe.stdout.strip() or 0)
+    if duration <= 0:
+        raise ValueError("could not read video duration")
+    return duration
+
+
+def extract_keyframes(src_path: str, out_dir: str, count: int, max_height: int) -> List[str]:
+    """Process-pool worker: sample count frames evenly across the video as JPEGs"""
+    duration = probe_duration(src_path)
+
+    subprocess.run(
+        [
+            "ffmpeg", "-y", "-v", "error", "-i", src_path,
+            "-vf", f"fps={count}/{duration:.3f},scale=-2:'min({int(max_height)},ih)'",
+            "-frames:v", str(count), "-q:v", "4",
+            os.path.join(out_dir, "frame_%02d.jpg")
+        ],
+        check=True, capture_output=True, timeout=TRANSCODE_TIMEOUT_SECONDS
+    )
+    return sorted(os.path.join(out_dir, name) for name in os.listdir(out_dir))
+
+
+def extract_frame_hashes(src_path: str, count: int) -> List[int]:
+    """Process-pool worker: 64-bit difference hash (dHash) of count evenly spaced frames"""
+    duration = probe_duration(src_path)
+
+    result = subprocess.run(
+        [
+            "ffmpeg", "-v", "error", "-i", src_path,
+            "-vf", f"fps={count}/{duration:.3f},scale={DHASH_WIDTH}:{DHASH_HEIGHT},format=gray",
+            "-frames:v", str(count), "-f", "rawvideo", "-"
+        ],
+        check=True, capture_output=True, timeout=TRANSCODE_TIMEOUT_SECONDS
+    )
+
+    frame_size = DHASH_WIDTH * DHASH_HEIGHT
+    hashes = []
+    for offset in range(0, len(result.stdout) - frame_size + 1, frame_size):
+        pixels = result.stdout[offset:offset + frame_size]
+        bits = 0
+        for y in range(DHASH_HEIGHT):
+            row = pixels[y * DHASH_WIDTH:(y + 1) * DHASH_WIDTH]
+            for x in range(DHASH_WIDTH - 1):
+                bits = (bits << 1) | (row[x] > row[x + 1])
+        hashes.append(bits)
+    return hashes
+
+
+class VideoPreprocessor:
+    """Per-strategy ffmpeg profiles executed on a lazily started process pool"""
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None, workers: int = PREPROCESS_WORKERS):
+        if settings is None:
+            settings = load_json_config(QUALITY_THRESHOLDS_FILE).get("video_preprocessing", {})
+
+        self.defaults = settings.get("defaults", {})
+        self.strategies = settings.get("strategies", {})
+        self.workers = max(1, workers)
+        self.ffmpeg_available = shutil.which("ffmpeg") is not None and shutil.which("ffprobe") is not None
+        self.enabled = bool(settings.get("enabled"))
+        if self.enabled and not self.ffmpeg_available:
+            print("⚠️ Video preprocessing enabled but ffmpeg not found - sending original videos")
+            self.enabled = False
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def profile_for(self, strategy: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Merged settings for a strategy, or None if its videos are sent as-is"""
+        if not self.enabled or strategy not in self.strategies:
+            return None
+        return {**self.defaults, **self.strategies[strategy]}
+
+    @staticmethod
+    def profile_id(profile: Dict[str, Any]) -> str:
+        """Short stable id of a profile (cache and upload keys change with settings)"""
+        return hashlib.sha256(json.dumps(profile, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+    def process(self, src_path: str, profile: Dict[str, Any]) -> Optional[str]:
+        """
+        Transcode src_path into a new temporary file owned by the caller
+        Returns None if ffmpeg failed or the result isn't smaller than the source
+        """
+        fd, dst_path = tempfile.mkstemp(suffix=".mp4", prefix="tiktok_pre_")
+        os.close(fd)
+        try:
+            self._executor().submit(transcode_video, src_path, dst_path, profile).result()
+        except Exception as e:
+            os.remove(dst_path)
+            stderr = getattr(e, "stderr", b"") or b""
+            print(f"   ⚠️ Video preprocessing failed: {e} {stderr.decode('utf-8', 'replace')[-200:]}")
+            return None
+
+        src_size, dst_size = os.path.getsize(src_path), os.path.getsize(dst_path)
+        if dst_size == 0 or dst_size >= src_size:
+            os.remove(dst_path)
+            return None
+
+        print(f"   🎞️ Preprocessed video: {src_size // 1024} KB → {dst_size // 1024} KB")
+        return dst_path
+
+    def keyframes(self, src_path: str, count: int = 6, max_height: int = 720) -> List[bytes]:
+        """JPEG bytes of count evenly spaced frames; empty if extraction isn't possible"""
+        if not self.ffmpeg_available:
+            return []
+
+        out_dir = tempfile.mkdtemp(prefix="tiktok_frames_")
+        try:
+            paths = self._executor().submit(extract_keyframes, src_path, out_dir, count, max_height).result()
+            frames = []
+            for path in paths:
+                with open(path, "rb") as f:
+                    frames.append(f.read())
+            return frames
+        except Exception as e:
+            print(f"   ⚠️ Keyframe extraction failed: {e}")
+            return []
+        finally:
+            shutil.rmtree(out_dir, ignore_errors=True)
+
+    def frame_hashes(self, src_path: str, count: int = 4) -> List[int]:
+        """Perceptual hashes of count evenly spaced frames; empty if extraction isn't possible"""
+        if not self.ffmpeg_available:
+            return []
+        try:
+            return self._executor().submit(extract_frame_hashes, src_path, count).result()
+        except Exception as e:
+            print(f"   ⚠️ Frame hashing failed: {e}")
+            return []
+
+    def shutdown(self):
+        """Stop the worker processes (a later call starts a new pool)"""
+        with self._pool_lock:
+            if self._pool:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # Started from analysis threads: fork would copy their locks and
+                # open clients into the workers, so start them fresh
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
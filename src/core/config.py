@@ -4,6 +4,8 @@ Environment variables and constants
 """
 
 import os
+import json
+from typing import Any, Dict
 from dotenv import load_dotenv
 
 # Load .env from config directory
@@ -50,6 +52,13 @@ if _missing_vars:
         f"Please create config/.env file from .env.example template"
     )
 
+# ==============================================================================
+# LOCAL DATA
+# ==============================================================================
+
+# Local state (snapshots, caches, metrics) lives outside the source tree
+DATA_DIR = os.getenv('AIBRARY_DATA_DIR', os.path.join(os.path.dirname(config_dir), 'data'))
+
 # ==============================================================================
 # TABLE NAMES
 # ==============================================================================
@@ -64,3 +73,75 @@ TIKTOK_CONTENT_TABLE = 'TikTok_Content'
 DEFAULT_TIMEOUT = 600  # 10 minutes
 MAX_RETRIES = 3
 RATE_LIMIT_DELAY = 1  # seconds between requests
+
+# "staged" runs scrape → save → analyze one after another over the whole run;
+# "streaming" connects them with bounded queues so items flow through as scraped
+PIPELINE_MODE = os.getenv('PIPELINE_MODE', 'staged')
+# Items buffered between streaming stages before the upstream stage waits
+PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', '32'))
+
+# ==============================================================================
+# AI ANALYSIS SETTINGS
+# ==============================================================================
+
+# Analysis is remote-latency-bound (60-90s per video), so run items in parallel
+ANALYSIS_MAX_WORKERS = int(os.getenv('ANALYSIS_MAX_WORKERS', '4'))
+# Max concurrent generate_content calls per Gemini model
+MODEL_MAX_IN_FLIGHT = int(os.getenv('MODEL_MAX_IN_FLIGHT', '4'))
+# Gemini quota per model (requests/tokens per minute) and retries on 429/5xx;
+# concurrency adapts below MODEL_MAX_IN_FLIGHT when throttled
+GEMINI_RPM_LIMIT = int(os.getenv('GEMINI_RPM_LIMIT', '1000'))
+GEMINI_TPM_LIMIT = int(os.getenv('GEMINI_TPM_LIMIT', '1000000'))
+GEMINI_MAX_RETRIES = int(os.getenv('GEMINI_MAX_RETRIES', '5'))
+# Download workers prefetching media ahead of inference, and their buffer budget
+PREFETCH_WORKERS = int(os.getenv('PREFETCH_WORKERS', '2'))
+PREFETCH_MAX_BUFFERED_MB = int(os.getenv('PREFETCH_MAX_BUFFERED_MB', '512'))
+
+# Gemini model for analysis calls (the default tier when model routing is on)
+GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-2.5-flash')
+
+# Video handoff to Gemini: "inline" sends bytes per call, "file_api" uploads
+# once via the File API and reuses the handle until it expires
+GEMINI_UPLOAD_MODE = os.getenv('GEMINI_UPLOAD_MODE', 'inline')
+
+# Response format: "json" requests a JSON schema response (parsed directly),
+# "markdown" keeps the free-form format parsed by the regex parsers
+GEMINI_OUTPUT_MODE = os.getenv('GEMINI_OUTPUT_MODE', 'markdown')
+
+# Stream responses and stop generating once the Stage 2 score is below the
+# threshold (low-value items skip the insights section)
+GEMINI_STREAM_RESPONSES = os.getenv('GEMINI_STREAM_RESPONSES', 'false').lower() == 'true'
+GEMINI_STREAM_STOP_BELOW = int(os.getenv('GEMINI_STREAM_STOP_BELOW', '4'))
+
+# Text-only items (no video) packed per request in batch_analyze (1 disables)
+TEXT_ANALYSIS_GROUP_SIZE = int(os.getenv('TEXT_ANALYSIS_GROUP_SIZE', '1'))
+
+# On-disk media cache budget for videos/subtitles (0 disables the cache)
+MEDIA_CACHE_MAX_MB = int(os.getenv('MEDIA_CACHE_MAX_MB', '2048'))
+
+# Videos up to this size are read once and reused across inline calls; larger
+# ones are re-read per call so no copy is held between calls
+MEDIA_BUFFER_MAX_MB = int(os.getenv('MEDIA_BUFFER_MAX_MB', '4'))
+
+# Parallel ffmpeg processes for the optional video preprocessing stage
+PREPROCESS_WORKERS = int(os.getenv('PREPROCESS_WORKERS', '2'))
+
+# Memoize model responses by (content, media, prompt, model) to skip repeat calls
+RESULT_CACHE_ENABLED = os.getenv('RESULT_CACHE_ENABLED', 'true').lower() == 'true'
+
+# Offline batch-job mode for backfills (run_analysis_only.py --batch)
+GEMINI_BATCH_POLL_SECONDS = int(os.getenv('GEMINI_BATCH_POLL_SECONDS', '30'))
+GEMINI_BATCH_MAX_REQUESTS = int(os.getenv('GEMINI_BATCH_MAX_REQUESTS', '500'))
+
+# ==============================================================================
+# JSON SETTINGS FILES
+# ==============================================================================
+
+QUALITY_THRESHOLDS_FILE = 'quality-thresholds.json'
+KEYWORD_LISTS_FILE = 'keyword-lists.json'
+
+
+def load_json_config(filename: str) -> Dict[str, Any]:
+    """Load a JSON settings file from the config directory"""
+    with open(os.path.join(config_dir, filename), 'r', encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,121 @@
+"""
+AIbrary TikTok Monitoring System - JSON Codec
+Fast JSON decoding for large Apify and Lark payloads
+
+Uses orjson when installed and falls back to the stdlib parser otherwise.
+Apify dataset responses can also be parsed incrementally with ijson so only
+the fields the processors actually read are ever materialized.
+"""
+
+import json
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # Optional dependency
+    ijson = None
+
+
+# Fields read by the processors from each Apify dataset item.
+# Nested sets restrict which keys of a nested object are kept.
+APIFY_ITEM_FIELDS: Dict[str, Optional[set]] = {
+    "id": None,
+    "videoId": None,
+    "webVideoUrl": None,
+    "text": None,
+    "isSlideshow": None,
+    "mediaUrls": None,
+    "diggCount": None,
+    "commentCount": None,
+    "playCount": None,
+    "createTime": None,
+    "authorMeta": {"name"},
+    "videoMeta": {"subtitleLinks"},
+}
+
+_SCALAR_EVENTS = ("string", "number", "boolean", "null", "end_map", "end_array")
+
+
+def loads(data) -> Any:
+    """Decode JSON from str or bytes using the fastest available parser"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> str:
+    """Encode an object to a JSON string using the fastest available encoder"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def response_json(response) -> Any:
+    """Drop-in replacement for requests' response.json()"""
+    return loads(response.content)
+
+
+def project_item(item: Dict[str, Any], fields: Dict[str, Optional[set]] = APIFY_ITEM_FIELDS) -> Dict[str, Any]:
+    """Keep only the requested (possibly nested) fields of a dataset item"""
+    projected = {}
+    for key, nested in fields.items():
+        if key not in item:
+            continue
+        value = item[key]
+        if nested and isinstance(value, dict):
+            value = {k: v for k, v in value.items() if k in nested}
+        projected[key] = value
+    return projected
+
+
+def iter_dataset_items(response, fields: Dict[str, Optional[set]] = APIFY_ITEM_FIELDS) -> Iterator[Dict[str, Any]]:
+    """
+    Yield projected items from an Apify dataset response (a top-level JSON array)
+
+    With ijson the body is parsed incrementally from the socket (the request
+    must be made with stream=True) and peak memory is bounded by one item.
+    Without ijson the whole body is decoded at once and then projected.
+    """
+    try:
+        if ijson is None:
+            for item in loads(response.content):
+                yield project_item(item, fields)
+            return
+
+        response.raw.decode_content = True
+        yield from _iter_projected_items(response.raw, fields)
+    finally:
+        response.close()
+
+
+def _iter_projected_items(stream, fields: Dict[str, Optional[set]]) -> Iterator[Dict[str, Any]]:
+    """Build only the wanted top-level fields of each array item from ijson events"""
+    item = None
+    key = None
+    builder = None
+
+    for prefix, event, value in ijson.parse(stream, use_float=True):
+        if prefix == "item":
+            if event == "start_map":
+                item = {}
+            elif event == "end_map" and item is not None:
+                yield project_item(item, fields)
+                item = None
+            elif event == "map_key" and item is not None:
+                key = value if value in fields else None
+                builder = ijson.ObjectBuilder() if key else None
+            continue
+
+        if builder is None:
+            continue
+
+        builder.event(event, value)
+        # The value for `key` is complete once its own prefix closes or is a scalar
+        if prefix == f"item.{key}" and event in _SCALAR_EVENTS:
+            item[key] = builder.value
+            builder = None
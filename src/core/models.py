@@ -51,6 +51,7 @@ class TikTokContent:
     team_status: str = "new"
     team_notes: Optional[str] = None
     discovered_date: Optional[datetime] = None
+    published_date: Optional[datetime] = None  # TikTok post time (Apify createTime)
     # New fields for video downloads and AI analysis
     video_download_url: Optional[str] = ""
     subtitle_url: Optional[str] = ""
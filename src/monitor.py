@@ -6,13 +6,18 @@ Complete TikTok monitoring pipeline in a single consolidated module
 
 import sys
 import time
-from typing import List
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
-from core import MonitoringTarget, ProcessingResult
-from storage import LarkClient
-from scraping import ProcessorFactory
-from analysis import VideoAnalyzer, analyze_new_content
+from core import MonitoringTarget, ProcessingResult, TikTokContent, TIKTOK_CONTENT_TABLE
+from storage import LarkClient, EngagementSnapshotStore
+from scraping import ProcessorFactory, ViralSelector
+from analysis import VideoAnalyzer, KeywordScorer, analyze_new_content
+from core.config import (
+    load_json_config, KEYWORD_LISTS_FILE,
+    PIPELINE_MODE, PIPELINE_QUEUE_SIZE, ANALYSIS_MAX_WORKERS
+)
+from pipeline import StreamingPipeline
 
 class TikTokMonitor:
     """Main orchestrator for TikTok monitoring system"""
@@ -21,9 +26,16 @@ class TikTokMonitor:
         self.lark_client = LarkClient()
         self.processor_factory = ProcessorFactory()
         self.ai_analyzer = VideoAnalyzer()
+        self.snapshot_store = EngagementSnapshotStore()
 
-    def run(self) -> bool:
-        """Run the complete monitoring pipeline"""
+    def run(self, streaming: Optional[bool] = None, backfill: bool = False) -> bool:
+        """
+        Run the complete monitoring pipeline
+        streaming: connect the stages with bounded queues (default: PIPELINE_MODE)
+        backfill: afterwards, also analyze older unanalyzed records (reads the whole table)
+        """
+        if streaming is None:
+            streaming = PIPELINE_MODE == "streaming"
         start_time = time.time()
         print(f"🚀 Starting TikTok monitoring run at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
@@ -46,17 +58,33 @@ class TikTokMonitor:
                 print("❌ No supported targets found")
                 return False
 
+            if streaming:
+                return self._run_streaming(supported_targets, start_time, backfill)
+
             # Step 3: Process each supported target (scrape only)
             results = self._process_targets(supported_targets)
 
+            # Step 3a: Record engagement snapshots for velocity tracking
+            self._record_snapshots(results)
+
+            # Step 3b: Keep only the top viral slice for Trend Discovery targets
+            self._select_viral_content(results)
+
+            # Step 3c: Drop off-topic items by keyword relevance (free, local)
+            self._filter_by_keywords(results)
+
             # Step 4: Save raw scraped content to Lark
-            save_success = self._save_results(results)
+            save_success, saved_content = self._save_results(results)
 
             if not save_success:
                 print("⚠️ Some content failed to save, but continuing to analysis...")
 
-            # Step 5: Analyze content with strategy routing (read from Lark, analyze, update)
-            analysis_success = self._analyze_and_update()
+            # Step 5: Analyze the newly saved content with strategy routing and update it
+            analysis_success = self._analyze_and_update(saved_content)
+
+            # Step 5a: Older unanalyzed records, only when asked (full table read)
+            if backfill:
+                analysis_success = self._backfill_analysis() and analysis_success
 
             # Step 6: Summary
             self._print_summary(results, time.time() - start_time)
@@ -66,6 +94,20 @@ class TikTokMonitor:
         except Exception as e:
             print(f"❌ Processing failed: {e}")
             return False
+        finally:
+            self.ai_analyzer.close()
+
+    def _run_streaming(self, targets: List[MonitoringTarget], start_time: float, backfill: bool = False) -> bool:
+        """Scrape, save, analyze and write back item by item (see pipeline.py)"""
+        pipeline = StreamingPipeline(self, queue_size=PIPELINE_QUEUE_SIZE, analysis_workers=ANALYSIS_MAX_WORKERS)
+        success = pipeline.run(targets)
+
+        # Older unanalyzed records, only when asked (full table read)
+        if backfill:
+            success = self._backfill_analysis() and success
+
+        self._print_summary(pipeline.results, time.time() - start_time, found_counts=pipeline.found_counts)
+        return success
 
     def _get_active_targets(self) -> List[MonitoringTarget]:
         """Get active monitoring targets from Lark"""
@@ -88,11 +130,11 @@ class TikTokMonitor:
 
     def _process_targets(self, targets: List[MonitoringTarget]) -> List[ProcessingResult]:
         """Process each target and collect results"""
-        print(f"\\n⚡ Processing {len(targets)} targets...")
+        print(f"\n⚡ Processing {len(targets)} targets...")
 
         results = []
         for i, target in enumerate(targets, 1):
-            print(f"\\n[{i}/{len(targets)}] Processing: {target.target_value}")
+            print(f"\n[{i}/{len(targets)}] Processing: {target.target_value}")
 
             try:
                 # Get appropriate processor
@@ -115,13 +157,69 @@ class TikTokMonitor:
 
         return results
 
-    def _save_results(self, results: List[ProcessingResult]) -> bool:
-        """Save raw scraped content to Lark (no analysis yet)"""
-        print("\\n💾 Saving raw scraped content to Lark...")
+    def _record_snapshots(self, results: List[ProcessingResult]):
+        """Append this run's metrics to the engagement time-series store"""
+        scraped = [c for r in results if r.success for c in r.content_found]
+        if not scraped:
+            return
+
+        self.snapshot_store.record_many(scraped)
+        try:
+            self.snapshot_store.save()
+        except Exception as e:
+            print(f"⚠️ Failed to persist engagement snapshots: {e}")
+
+    def _select_viral_content(self, results: List[ProcessingResult]):
+        """
+        Stream Trend Discovery results through bounded top-K heaps so only
+        the winners reach Lark writes and Gemini analysis
+        """
+        selector = ViralSelector(velocities=self.snapshot_store.velocity_table("views"))
+        selected_results = [r for r in results if r.success and selector.applies_to(r.target)]
+        if not selected_results:
+            return
+
+        for result in selected_results:
+            for content in result.content_found:
+                selector.offer(content, result.target)
+            # Release the full scrape; only heap survivors are kept from here on
+            result.content_found = []
+
+        winners = selector.winners()
+        for result in selected_results:
+            result.content_found = winners.get(result.target.record_id, [])
+
+        kept = sum(len(r.content_found) for r in selected_results)
+        print(f"\n🔥 Viral selection: kept {kept} of {selector.offered} Trend Discovery videos")
+
+    def _filter_by_keywords(self, results: List[ProcessingResult]):
+        """Keyword-gate captions for strategies listed in keyword-lists.json filtering"""
+        settings = load_json_config(KEYWORD_LISTS_FILE)
+        strategies = set(settings.get("filtering", {}).get("pre_save_strategies", []))
+        gated = [r for r in results if r.success and r.target.monitoring_strategy in strategies]
+        if not gated:
+            return
+
+        scorer = KeywordScorer(settings)
+        before = sum(len(r.content_found) for r in gated)
+        for result in gated:
+            scores = scorer.score_batch((c.caption or "", "") for c in result.content_found)
+            result.content_found = [c for c, score in zip(result.content_found, scores) if score.passed]
+
+        kept = sum(len(r.content_found) for r in gated)
+        print(f"\n🔤 Keyword filter: kept {kept} of {before} items")
+
+    def _save_results(self, results: List[ProcessingResult]) -> Tuple[bool, List[TikTokContent]]:
+        """
+        Save raw scraped content to Lark (no analysis yet)
+        Returns (all saved, new content with record ids and target strategies)
+        """
+        print("\n💾 Saving raw scraped content to Lark...")
 
         total_content = 0
         new_content_count = 0
         all_success = True
+        saved_content: List[TikTokContent] = []
 
         for result in results:
             if result.success and result.content_found:
@@ -138,27 +236,42 @@ class TikTokMonitor:
                 # Save raw content with target linkage (NO analysis yet)
                 if new_content:
                     print(f"   💾 Saving {len(new_content)} new items from {result.target.target_value}...")
-                    success = self.lark_client.save_content(new_content, result.target.record_id)
-                    if not success:
+                    record_ids = self.lark_client.save_content(new_content, result.target.record_id, check_existing=False)
+                    if len(record_ids) < len(new_content):
                         all_success = False
 
+                    # Hand saved items straight to analysis: record id from the
+                    # save, strategy from the target (no table re-read)
+                    for content in new_content:
+                        if content.content_id in record_ids:
+                            content._record_id = record_ids[content.content_id]
+                            content.monitoring_strategy = content.monitoring_strategy or result.target.monitoring_strategy
+                            saved_content.append(content)
+
         print(f"   📊 Total content found: {total_content}")
         print(f"   🆕 New content saved: {new_content_count}")
 
         if new_content_count == 0:
             print("   ✅ All content already exists in database")
+            return True, saved_content
+
+        return all_success, saved_content
+
+    def _analyze_and_update(self, to_analyze: List[TikTokContent]) -> bool:
+        """Analyze content in memory based on strategy routing, and update its Lark records"""
+        if not to_analyze:
+            print("\n✅ No new content to analyze")
             return True
 
-        return all_success
+        print(f"\n🎯 {len(to_analyze)} new items need analysis\n")
+        return self._run_analysis(to_analyze)
 
-    def _analyze_and_update(self) -> bool:
+    def _backfill_analysis(self) -> bool:
         """
-        Read content from Lark (with strategies populated by lookup),
-        analyze based on strategy routing, and update with results
+        Backfill: read content from Lark (with strategies populated by lookup)
+        and analyze records that have no strategic_score yet
         """
-        from core import TikTokContent, TIKTOK_CONTENT_TABLE
-
-        print("\\n🔍 Reading content from Lark to analyze with strategy routing...")
+        print("\n🔍 Backfill: reading content from Lark to analyze with strategy routing...")
 
         # Fetch all content from database
         table_id = self.lark_client._get_table_id(TIKTOK_CONTENT_TABLE)
@@ -225,8 +338,11 @@ class TikTokMonitor:
             print("   ✅ All content already analyzed!")
             return True
 
-        print(f"   🎯 {len(to_analyze)} items need analysis\\n")
+        print(f"   🎯 {len(to_analyze)} items need analysis\n")
+        return self._run_analysis(to_analyze)
 
+    def _run_analysis(self, to_analyze: List[TikTokContent]) -> bool:
+        """Strategy-aware batch analysis, then write results to each item's record"""
         # Run strategy-aware batch analysis
         print("🤖 Running AI analysis with strategy routing...")
         analysis_results = self.ai_analyzer.batch_analyze(to_analyze)
@@ -236,16 +352,16 @@ class TikTokMonitor:
             # Still return True - not an error, just nothing to analyze
             return True
 
-        print(f"\\n   ✅ AI analysis completed for {len(analysis_results)} items")
+        print(f"\n   ✅ AI analysis completed for {len(analysis_results)} items")
 
         # Print full analysis results
         for analysis in analysis_results:
-            print(f"\\n   📊 {analysis.content_id}: {analysis.content_type} | Strategic Score: {analysis.strategic_score}/10")
+            print(f"\n   📊 {analysis.content_id}: {analysis.content_type} | Strategic Score: {analysis.strategic_score}/10")
             print(f"   📝 Analysis: {analysis.general_analysis[:100]}...")
             print(f"   💡 Insights: {analysis.strategic_insights[:100]}...")
 
         # Update Lark with analysis results
-        print("\\n💾 Updating Lark with analysis results...")
+        print("\n💾 Updating Lark with analysis results...")
 
         update_success = True
         for content in to_analyze:
@@ -259,15 +375,23 @@ class TikTokMonitor:
 
         return update_success
 
-    def _print_summary(self, results: List[ProcessingResult], total_time: float):
-        """Print processing summary"""
-        print("\\n" + "="*50)
+    def _print_summary(self, results: List[ProcessingResult], total_time: float, found_counts: Optional[Dict[str, int]] = None):
+        """
+        Print processing summary
+        found_counts: items per target record_id, when content was released after hand-off
+        """
+        def found(result: ProcessingResult) -> int:
+            if found_counts is not None:
+                return found_counts.get(result.target.record_id, 0)
+            return len(result.content_found)
+
+        print("\n" + "="*50)
         print("📊 PROCESSING SUMMARY")
         print("="*50)
 
         successful = [r for r in results if r.success]
         failed = [r for r in results if not r.success]
-        total_content = sum(len(r.content_found) for r in successful)
+        total_content = sum(found(r) for r in successful)
 
         print(f"⏱️ Total time: {total_time:.1f}s")
         print(f"🎯 Targets processed: {len(results)}")
@@ -276,21 +400,25 @@ class TikTokMonitor:
         print(f"📱 Content found: {total_content}")
 
         if successful:
-            print("\\n✅ Successful targets:")
+            print("\n✅ Successful targets:")
             for result in successful:
-                print(f"   - {result.target.target_value}: {len(result.content_found)} videos ({result.processing_time:.1f}s)")
+                print(f"   - {result.target.target_value}: {found(result)} videos ({result.processing_time:.1f}s)")
 
         if failed:
-            print("\\n❌ Failed targets:")
+            print("\n❌ Failed targets:")
             for result in failed:
                 print(f"   - {result.target.target_value}: {result.error_message}")
 
-        print("\\n🎉 Processing complete!")
+        # Tokens, latency and estimated cost of this run's model calls
+        self.ai_analyzer.metrics.print_run_summary()
+
+        print("\n🎉 Processing complete!")
 
 def main():
     """Main entry point"""
     monitor = TikTokMonitor()
-    success = monitor.run()
+    args = sys.argv[1:]
+    success = monitor.run(streaming=True if "--stream" in args else None, backfill="--backfill" in args)
     sys.exit(0 if success else 1)
 
 if __name__ == "__main__":
@@ -0,0 +1,255 @@
+"""
+AIbrary TikTok Monitoring System - Streaming Pipeline
+Scrape, dedup, save, analyze and write back as concurrent stages
+
+The staged run scrapes every target into memory, saves everything, then
+analyzes the saved batch, so the first insight waits for the whole scrape
+and memory grows with the run. In
+streaming mode each stage runs on its own thread(s) and hands items to the
+next through a bounded queue: a video is analyzed as soon as it is saved,
+and a slow stage makes the ones upstream wait instead of piling up items.
+
+    targets → scrape → dedup/save → analyze (N workers) → write-back
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from core import MonitoringTarget, ProcessingResult, TikTokContent
+from scraping import ViralSelector
+
+_DONE = object()  # end-of-stream marker, one per consumer thread
+
+
+@dataclass
+class PipelineStats:
+    """Per-stage counts and time to the first written insight"""
+    scraped: int = 0
+    duplicates: int = 0
+    saved: int = 0
+    analyzed: int = 0
+    written: int = 0
+    failures: int = 0
+    first_insight_seconds: Optional[float] = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, name: str, amount: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+
+class StreamingPipeline:
+    """
+    Runs one monitoring pass as connected stages over a TikTokMonitor's clients
+
+    Usage:
+        pipeline = StreamingPipeline(monitor)
+        success = pipeline.run(targets)
+        # pipeline.results / pipeline.found_counts feed the run summary
+    """
+
+    def __init__(self, monitor, queue_size: int = 32, analysis_workers: int = 4):
+        self.monitor = monitor
+        self.queue_size = max(1, queue_size)
+        self.analysis_workers = max(1, analysis_workers)
+        self.stats = PipelineStats()
+        # Scrape results with their content released once handed downstream;
+        # found_counts keeps what each target produced for the summary
+        self.results: List[ProcessingResult] = []
+        self.found_counts: Dict[str, int] = {}
+        self._start = 0.0
+
+    def run(self, targets: List[MonitoringTarget]) -> bool:
+        """Stream all targets through the stages; True if nothing failed"""
+        self._start = time.time()
+        print(f"\n🌊 Streaming {len(targets)} targets (queue size {self.queue_size}, {self.analysis_workers} analysis workers)...")
+
+        to_save: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        to_analyze: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        to_write: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        threads = [
+            threading.Thread(target=self._scrape_stage, args=(targets, to_save), name="pipeline-scrape"),
+            threading.Thread(target=self._save_stage, args=(to_save, to_analyze), name="pipeline-save"),
+            *[
+                threading.Thread(target=self._analyze_stage, args=(to_analyze, to_write), name=f"pipeline-analyze-{i}")
+                for i in range(self.analysis_workers)
+            ],
+            threading.Thread(target=self._write_stage, args=(to_write,), name="pipeline-write")
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self._print_stats()
+        return self.stats.failures == 0
+
+    # --------------------------------------------------------------------------
+    # Stages
+    # --------------------------------------------------------------------------
+
+    def _scrape_stage(self, targets: List[MonitoringTarget], out: queue.Queue):
+        """
+        Scrape targets one by one and emit their items after snapshots and
+        filters, in the staged run's order: viral selection, then keywords
+        """
+        monitor = self.monitor
+        selector = ViralSelector(velocities=monitor.snapshot_store.velocity_table("views"))
+        viral_results: Dict[str, ProcessingResult] = {}
+
+        try:
+            for i, target in enumerate(targets, 1):
+                print(f"\n[{i}/{len(targets)}] Scraping: {target.target_value}")
+                result = self._scrape(target)
+                if result is None:
+                    continue
+                self.results.append(result)
+                if not result.success:
+                    continue
+
+                monitor.snapshot_store.record_many(result.content_found)
+                self.stats.add("scraped", len(result.content_found))
+
+                if selector.applies_to(target):
+                    # Trend Discovery keeps a global top-K, known only once every
+                    # such target is scraped; the heaps hold O(K) items meanwhile
+                    for content in result.content_found:
+                        selector.offer(content, target)
+                    result.content_found = []
+                    viral_results[target.record_id] = result
+                else:
+                    self._filter_and_emit([result], out)
+
+            if viral_results:
+                winners = selector.winners()
+                print(f"\n🔥 Viral selection: kept {sum(len(w) for w in winners.values())} of {selector.offered} Trend Discovery videos")
+                for record_id, result in viral_results.items():
+                    result.content_found = winners.get(record_id, [])
+                self._filter_and_emit(list(viral_results.values()), out)
+
+        except Exception as e:
+            print(f"❌ Scrape stage failed: {e}")
+            self.stats.add("failures")
+        finally:
+            try:
+                monitor.snapshot_store.save()
+            except Exception as e:
+                print(f"⚠️ Failed to persist engagement snapshots: {e}")
+            out.put(_DONE)
+
+    def _save_stage(self, inbox: queue.Queue, out: queue.Queue):
+        """Drop items already in Lark (or seen earlier this run) and save the rest"""
+        lark = self.monitor.lark_client
+        seen = set()
+
+        def save(item):
+            content, target = item
+            if content.content_id in seen or lark.content_exists(content.content_id):
+                self.stats.add("duplicates")
+                return
+            seen.add(content.content_id)
+
+            # Existence was checked just above; create without a second lookup
+            record_ids = lark.save_content([content], target.record_id, check_existing=False)
+            if content.content_id not in record_ids:
+                self.stats.add("failures")
+                return
+            content._record_id = record_ids[content.content_id]
+            self.stats.add("saved")
+            out.put(content)
+
+        try:
+            self._consume(inbox, save, "save")
+        finally:
+            for _ in range(self.analysis_workers):
+                out.put(_DONE)
+
+    def _analyze_stage(self, inbox: queue.Queue, out: queue.Queue):
+        """Analyze saved items as they arrive (one of analysis_workers threads)"""
+        analyzer = self.monitor.ai_analyzer
+
+        def analyze(content: TikTokContent):
+            print(f"🤖 Analyzing {content.content_id} ({content.monitoring_strategy or 'Unknown'})...")
+            if analyzer.analyze_item(content):
+                self.stats.add("analyzed")
+                out.put(content)
+
+        try:
+            self._consume(inbox, analyze, "analyze")
+        finally:
+            out.put(_DONE)
+
+    def _write_stage(self, inbox: queue.Queue):
+        """Write analysis results back to the items' Lark records"""
+        lark = self.monitor.lark_client
+
+        def write(content: TikTokContent):
+            if not lark.update_content(content._record_id, content):
+                self.stats.add("failures")
+                return
+            self.stats.add("written")
+            if self.stats.first_insight_seconds is None:
+                self.stats.first_insight_seconds = time.time() - self._start
+                print(f"   ⚡ First insight written after {self.stats.first_insight_seconds:.1f}s")
+
+        self._consume(inbox, write, "write-back", producers=self.analysis_workers)
+
+    # --------------------------------------------------------------------------
+    # Helpers
+    # --------------------------------------------------------------------------
+
+    def _scrape(self, target: MonitoringTarget) -> Optional[ProcessingResult]:
+        try:
+            processor = self.monitor.processor_factory.get_processor(target)
+            if not processor:
+                print(f"❌ No processor available for {target.target_value}")
+                return None
+            return processor.process(target)
+        except Exception as e:
+            print(f"❌ Failed to process {target.target_value}: {e}")
+            return None
+
+    def _filter_and_emit(self, results: List[ProcessingResult], out: queue.Queue):
+        """Keyword-filter results, emit what's left and release their content"""
+        self.monitor._filter_by_keywords(results)
+        for result in results:
+            self.found_counts[result.target.record_id] = len(result.content_found)
+            self._emit(result.content_found, result.target, out)
+            result.content_found = []
+
+    @staticmethod
+    def _emit(contents: List[TikTokContent], target: MonitoringTarget, out: queue.Queue):
+        """Send items downstream with the target's strategy (blocks while the queue is full)"""
+        for content in contents:
+            content.monitoring_strategy = content.monitoring_strategy or target.monitoring_strategy
+            out.put((content, target))
+
+    def _consume(self, inbox: queue.Queue, handle: Callable[[Any], None], stage: str, producers: int = 1):
+        """
+        Handle items until every producer has sent _DONE
+        Per-item failures are counted and the loop keeps draining, so a bad item
+        can't leave upstream stages blocked on a full queue
+        """
+        remaining = producers
+        while remaining:
+            item = inbox.get()
+            if item is _DONE:
+                remaining -= 1
+                continue
+            try:
+                handle(item)
+            except Exception as e:
+                print(f"❌ {stage} stage failed for an item: {e}")
+                self.stats.add("failures")
+
+    def _print_stats(self):
+        stats = self.stats
+        print(f"\n🌊 Streaming pipeline: {stats.scraped} scraped → {stats.saved} saved ({stats.duplicates} duplicates) → {stats.analyzed} analyzed → {stats.written} written back")
+        if stats.first_insight_seconds is not None:
+            print(f"   ⚡ Time to first insight: {stats.first_insight_seconds:.1f}s")
+        if stats.failures:
+            print(f"   ⚠️ {stats.failures} failures")
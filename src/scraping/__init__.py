@@ -8,11 +8,13 @@ from .profile_processor import ProfileProcessor
 from .hashtag_processor import HashtagProcessor
 from .search_processor import SearchProcessor
 from .factory import ProcessorFactory
+from .viral_filter import ViralSelector
 
 __all__ = [
     'BaseProcessor',
     'ProfileProcessor',
     'HashtagProcessor',
     'SearchProcessor',
-    'ProcessorFactory'
+    'ProcessorFactory',
+    'ViralSelector'
 ]
@@ -10,6 +10,7 @@ from typing import List, Optional
 from datetime import datetime, timedelta
 
 from core import MonitoringTarget, TikTokContent, ProcessingResult, APIFY_TOKEN, TIKTOK_ACTOR_ID, DEFAULT_TIMEOUT
+from core.json_codec import iter_dataset_items
 from .base import BaseProcessor
 
 
@@ -50,10 +51,12 @@ class HashtagProcessor(BaseProcessor):
                     url,
                     params={"token": self.token},
                     json=run_input,
-                    timeout=DEFAULT_TIMEOUT
+                    timeout=DEFAULT_TIMEOUT,
+                    stream=True
                 )
                 response.raise_for_status()
-                dataset_items = response.json()
+                # Decode incrementally, keeping only the fields we convert
+                dataset_items = iter_dataset_items(response)
             else:
                 print(f"📄 Using cached data from recent run")
 
@@ -174,6 +177,11 @@ class HashtagProcessor(BaseProcessor):
             engagement_rate=0.0  # Will be calculated when saving
         )
 
+        # Post time (Unix seconds) for recency/velocity scoring
+        create_time = item.get("createTime")
+        if create_time:
+            content.published_date = datetime.fromtimestamp(int(create_time))
+
         # Store additional media URLs
         content.video_download_url = video_download_url
         content.subtitle_url = subtitle_url
@@ -10,6 +10,7 @@ from typing import List, Optional
 from datetime import datetime, timedelta
 
 from core import MonitoringTarget, TikTokContent, ProcessingResult, APIFY_TOKEN, TIKTOK_ACTOR_ID, DEFAULT_TIMEOUT
+from core.json_codec import iter_dataset_items, response_json
 from .base import BaseProcessor
 
 
@@ -50,10 +51,12 @@ class ProfileProcessor(BaseProcessor):
                     url,
                     params={"token": self.token},
                     json=run_input,
-                    timeout=DEFAULT_TIMEOUT
+                    timeout=DEFAULT_TIMEOUT,
+                    stream=True
                 )
                 response.raise_for_status()
-                dataset_items = response.json()
+                # Decode incrementally, keeping only the fields we convert
+                dataset_items = iter_dataset_items(response)
             else:
                 print(f"📄 Using cached data from recent run")
 
@@ -174,6 +177,11 @@ class ProfileProcessor(BaseProcessor):
             engagement_rate=0.0  # Will be calculated when saving
         )
 
+        # Post time (Unix seconds) for recency/velocity scoring
+        create_time = item.get("createTime")
+        if create_time:
+            content.published_date = datetime.fromtimestamp(int(create_time))
+
         # Store additional media URLs as attributes (will be saved to database)
         content.video_download_url = video_download_url
         content.subtitle_url = subtitle_url
@@ -203,7 +211,7 @@ class ProfileProcessor(BaseProcessor):
                 timeout=30
             )
             response.raise_for_status()
-            runs_data = response.json()
+            runs_data = response_json(response)
 
             # Find the most recent successful run
             if not runs_data.get("data", {}).get("items"):
@@ -227,11 +235,12 @@ class ProfileProcessor(BaseProcessor):
             response = requests.get(
                 dataset_url,
                 params={"token": self.token},
-                timeout=60
+                timeout=60,
+                stream=True
             )
             response.raise_for_status()
 
-            dataset_items = response.json()
+            dataset_items = iter_dataset_items(response)
 
             # Filter for the specific profile we want
             username = target.target_value.lstrip('@')
@@ -0,0 +1,122 @@
+"""
+AIbrary TikTok Monitoring System - Viral Filter
+Streaming top-K selection of viral content for Trend Discovery
+
+Scrapes return 100+ videos per hashtag but only the top slice is worth a
+Lark write and a Gemini call. Items are scored on a composite of recency,
+engagement and velocity and kept in bounded min-heaps (one per target plus
+a global one), so memory stays O(K) however many items stream through.
+"""
+
+import heapq
+import itertools
+import math
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from core import MonitoringTarget, TikTokContent
+from core.config import load_json_config, QUALITY_THRESHOLDS_FILE
+
+
+class ViralSelector:
+    """Keeps the top-scoring content per target and globally using bounded heaps"""
+
+    def __init__(
+        self,
+        settings: Optional[Dict[str, Any]] = None,
+        velocities: Optional[Dict[str, Tuple[float, float]]] = None
+    ):
+        """
+        velocities: optional {content_id: (views/hour, acceleration)} measured from
+        engagement snapshots; items without one fall back to lifetime average velocity
+        """
+        if settings is None:
+            settings = load_json_config(QUALITY_THRESHOLDS_FILE).get("viral_selection", {})
+
+        self.strategies = set(settings.get("strategies", ["Trend Discovery"]))
+        self.top_percent = float(settings.get("top_percent", 10))
+        self.min_per_target = int(settings.get("min_per_target", 1))
+        self.global_top_k = int(settings.get("global_top_k", 50))
+        self.weights = settings.get("weights", {"recency": 0.3, "engagement": 0.3, "velocity": 0.4})
+        self.half_life_hours = float(settings.get("recency_half_life_hours", 48))
+        self.engagement_cap = float(settings.get("engagement_rate_cap", 20.0))
+        self.velocity_cap = float(settings.get("views_per_hour_cap", 100000))
+        self.velocities = velocities or {}
+
+        # target record_id -> min-heap of (score, seq, content)
+        self._heaps: Dict[str, List[Tuple[float, int, TikTokContent]]] = {}
+        self._limits: Dict[str, int] = {}
+        self._seq = itertools.count()
+        self.offered = 0
+
+    def applies_to(self, target: MonitoringTarget) -> bool:
+        """Check if the target's strategy uses viral selection"""
+        return target.monitoring_strategy in self.strategies
+
+    def target_limit(self, target: MonitoringTarget) -> int:
+        """K for a target: top_percent of its results_limit, at least min_per_target"""
+        return max(self.min_per_target, math.ceil(target.results_limit * self.top_percent / 100))
+
+    def score(self, content: TikTokContent, now: Optional[datetime] = None) -> float:
+        """Composite 0-1 score from recency, engagement rate and view velocity"""
+        now = now or datetime.now()
+        age_hours = None
+        if content.published_date:
+            age_hours = max((now - content.published_date).total_seconds() / 3600, 1.0)
+
+        recency = 0.5 ** (age_hours / self.half_life_hours) if age_hours else 0.0
+
+        engagement_rate = content.engagement_rate or content.calculate_engagement_rate()
+        engagement = min(engagement_rate / self.engagement_cap, 1.0)
+
+        velocity = 0.0
+        views_per_hour = None
+        if content.content_id in self.velocities:
+            views_per_hour = max(self.velocities[content.content_id][0], 0.0)
+        elif age_hours:
+            views_per_hour = (content.views or 0) / age_hours
+        if views_per_hour is not None:
+            velocity = min(math.log1p(views_per_hour) / math.log1p(self.velocity_cap), 1.0)
+
+        return (
+            self.weights.get("recency", 0) * recency
+            + self.weights.get("engagement", 0) * engagement
+            + self.weights.get("velocity", 0) * velocity
+        )
+
+    def offer(self, content: TikTokContent, target: MonitoringTarget, score: Optional[float] = None):
+        """Stream one item into the target's bounded heap"""
+        self.offered += 1
+        if score is None:
+            score = self.score(content)
+
+        key = target.record_id
+        if key not in self._heaps:
+            self._heaps[key] = []
+            self._limits[key] = self.target_limit(target)
+
+        heap = self._heaps[key]
+        entry = (score, next(self._seq), content)
+        if len(heap) < self._limits[key]:
+            heapq.heappush(heap, entry)
+        elif score > heap[0][0]:
+            heapq.heapreplace(heap, entry)
+
+    def winners(self) -> Dict[str, List[TikTokContent]]:
+        """
+        Final selection: per-target survivors capped by the global top-K
+        Returns {target record_id: [content, ...]} ordered by score descending
+        """
+        global_heap: List[Tuple[float, int, str, TikTokContent]] = []
+        for key, heap in self._heaps.items():
+            for score, seq, content in heap:
+                entry = (score, seq, key, content)
+                if len(global_heap) < self.global_top_k:
+                    heapq.heappush(global_heap, entry)
+                elif score > global_heap[0][0]:
+                    heapq.heapreplace(global_heap, entry)
+
+        selected: Dict[str, List[TikTokContent]] = {key: [] for key in self._heaps}
+        for score, seq, key, content in sorted(global_heap, reverse=True):
+            selected[key].append(content)
+        return selected
@@ -4,5 +4,6 @@ Database operations and persistence layer
 """
 
 from .lark_client import LarkClient
+from .snapshot_store import EngagementSnapshotStore
 
-__all__ = ['LarkClient']
+__all__ = ['LarkClient', 'EngagementSnapshotStore']
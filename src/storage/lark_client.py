@@ -11,6 +11,7 @@ from core import (
     LARK_APP_ID, LARK_APP_SECRET, LARK_BASE_ID,
     MONITORING_TARGETS_TABLE, TIKTOK_CONTENT_TABLE
 )
+from core.json_codec import response_json
 
 
 class LarkClient:
@@ -36,7 +37,7 @@ class LarkClient:
 
         response = requests.post(url, json=payload)
         response.raise_for_status()
-        data = response.json()
+        data = response_json(response)
 
         if data["code"] != 0:
             raise Exception(f"Failed to get access token: {data}")
@@ -58,7 +59,7 @@ class LarkClient:
 
         response = requests.request(method, url, headers=headers, json=payload)
         response.raise_for_status()
-        data = response.json()
+        data = response_json(response)
 
         if data["code"] != 0:
             raise Exception(f"Lark API error: {data}")
@@ -168,27 +169,31 @@ class LarkClient:
             print(f"❌ Failed to update content {content.content_id}: {e}")
             return False
 
-    def save_content(self, content_list: List[TikTokContent], target_record_id: str = None) -> bool:
+    def save_content(self, content_list: List[TikTokContent], target_record_id: str = None, check_existing: bool = True) -> Dict[str, str]:
         """
         Save or update TikTok content to Lark table with target linkage
         Phase 5: Check if exists, update if so, create if not
+        check_existing=False creates every item without the lookup, for callers
+        that have just filtered out existing content themselves
+        Returns {content_id: record_id} for every item saved or updated
+        (items missing from it failed)
         """
         if not content_list:
-            return True
+            return {}
 
         table_id = self._get_table_id(TIKTOK_CONTENT_TABLE)
         path = f"/bitable/v1/apps/{self.base_id}/tables/{table_id}/records"
 
-        success_count = 0
+        record_ids: Dict[str, str] = {}
 
         for content in content_list:
             # Phase 5: Check if content already exists
-            existing_record_id = self.content_exists(content.content_id)
+            existing_record_id = self.content_exists(content.content_id) if check_existing else None
 
             if existing_record_id:
                 # Update existing record
                 if self.update_content(existing_record_id, content):
-                    success_count += 1
+                    record_ids[str(content.content_id)] = existing_record_id
                 continue
 
             # Create new record
@@ -228,11 +233,11 @@ class LarkClient:
             record_data = {"fields": fields}
 
             try:
-                self._make_request("POST", path, record_data)
-                success_count += 1
+                data = self._make_request("POST", path, record_data)
+                record_ids[str(content.content_id)] = data["record"]["record_id"]
                 print(f"✅ Saved content: {content.content_id}")
             except Exception as e:
                 print(f"❌ Failed to save content {content.content_id}: {e}")
 
-        print(f"📊 Saved {success_count}/{len(content_list)} content items")
-        return success_count == len(content_list)
+        print(f"📊 Saved {len(record_ids)}/{len(content_list)} content items")
+        return record_ids
@@ -0,0 +1,354 @@
+"""
+AIbrary TikTok Monitoring System - Engagement Snapshot Store
+Compact time-series of likes/comments/views per content_id
+
+TikTokContent only carries the latest metrics, so each scrape is also
+appended here as a timestamped sample. Samples live in array('q') columns
+(8 bytes per value, no per-sample objects) and old samples are downsampled
+to one per bucket so long-lived content stays small. The last three samples
+of every series are also kept in preallocated flat columns, so velocity and
+acceleration are computed for all content at once from NumPy views of them
+(when NumPy is installed). Series that stop being scraped are evicted after
+evict_after_days, and the store is saved as raw column bytes behind a small
+fixed header.
+"""
+
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency
+    np = None
+
+from core import TikTokContent
+from core.config import DATA_DIR
+
+METRICS = ("likes", "comments", "views")
+COLUMNS = ("ts",) + METRICS
+
+# Samples per series kept in the velocity window (two velocities -> acceleration)
+WINDOW = 3
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(DATA_DIR, "engagement_snapshots.bin")
+
+# File header: magic, little-endian columns, series count, content_id blob size
+_FILE_MAGIC = b"AIBSNAP1"
+_FILE_HEADER = struct.Struct("<8s?QQ")
+
+
+class _Series:
+    """Array-backed columns for one content_id: timestamps plus one column per metric"""
+
+    __slots__ = COLUMNS
+
+    def __init__(self):
+        self.ts = array('q')
+        self.likes = array('q')
+        self.comments = array('q')
+        self.views = array('q')
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def append(self, ts: int, likes: int, comments: int, views: int):
+        # Keep columns time-ordered; a repeat of the same second overwrites
+        if self.ts and ts <= self.ts[-1]:
+            self.likes[-1], self.comments[-1], self.views[-1] = likes, comments, views
+            return
+        self.ts.append(ts)
+        self.likes.append(likes)
+        self.comments.append(comments)
+        self.views.append(views)
+
+    def downsample(self, cutoff_ts: int, bucket_seconds: int):
+        """Collapse samples older than cutoff_ts to the last sample in each bucket"""
+        keep = []
+        last_bucket = None
+        for i, ts in enumerate(self.ts):
+            if ts >= cutoff_ts:
+                keep.extend(range(i, len(self.ts)))
+                break
+            bucket = ts // bucket_seconds
+            if keep and bucket == last_bucket:
+                keep[-1] = i
+            else:
+                keep.append(i)
+            last_bucket = bucket
+
+        if len(keep) == len(self.ts):
+            return
+
+        for name in self.__slots__:
+            column = getattr(self, name)
+            setattr(self, name, array('q', (column[i] for i in keep)))
+
+
+class _RecentWindow:
+    """
+    Last WINDOW samples of every series in preallocated flat columns
+    Row r occupies [r * WINDOW, (r + 1) * WINDOW), oldest first. A series'
+    first sample fills its whole row, so a two-sample row reads (s0, s0, s1):
+    zero acceleration. Rows are compacted on removal (the last row moves into
+    the gap) and capacity doubles when full.
+    """
+
+    __slots__ = COLUMNS + ("counts", "ids", "rows")
+
+    def __init__(self, capacity: int = 1024):
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.counts = array('q', bytes(8 * capacity))  # samples seen, capped at WINDOW
+        for name in COLUMNS:
+            setattr(self, name, array('q', bytes(8 * WINDOW * capacity)))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def append(self, content_id: str, ts: int, likes: int, comments: int, views: int):
+        row = self.rows.get(content_id)
+        if row is None:
+            row = self._add_row(content_id)
+        base, count = row * WINDOW, self.counts[row]
+        values = (ts, likes, comments, views)
+
+        # Same ordering rule as _Series.append: a repeat of the same second overwrites
+        if count and ts <= self.ts[base + WINDOW - 1]:
+            for name, value in zip(METRICS, values[1:]):
+                getattr(self, name)[base + WINDOW - 1] = value
+            return
+
+        for name, value in zip(COLUMNS, values):
+            column = getattr(self, name)
+            if count:
+                column[base:base + WINDOW - 1] = column[base + 1:base + WINDOW]
+            else:
+                column[base:base + WINDOW - 1] = array('q', [value] * (WINDOW - 1))
+            column[base + WINDOW - 1] = value
+        self.counts[row] = min(count + 1, WINDOW)
+
+    def remove(self, content_id: str):
+        row = self.rows.pop(content_id)
+        last = len(self.ids) - 1
+        last_id = self.ids.pop()
+        if row == last:
+            return
+        self.ids[row] = last_id
+        self.rows[last_id] = row
+        self.counts[row] = self.counts[last]
+        for name in COLUMNS:
+            column = getattr(self, name)
+            column[row * WINDOW:(row + 1) * WINDOW] = column[last * WINDOW:(last + 1) * WINDOW]
+
+    def _add_row(self, content_id: str) -> int:
+        row = len(self.ids)
+        if row == len(self.counts):
+            # Double capacity (zero-filled) so appends stay amortized O(1)
+            self.counts.frombytes(bytes(8 * len(self.counts)))
+            for name in COLUMNS:
+                column = getattr(self, name)
+                column.frombytes(bytes(8 * len(column)))
+        self.ids.append(content_id)
+        self.rows[content_id] = row
+        self.counts[row] = 0
+        return row
+
+
+class EngagementSnapshotStore:
+    """Timestamped engagement samples keyed by content_id"""
+
+    def __init__(
+        self,
+        path: Optional[str] = DEFAULT_SNAPSHOT_PATH,
+        max_raw_samples: int = 48,
+        downsample_after_hours: float = 24,
+        bucket_hours: float = 6,
+        evict_after_days: float = 30
+    ):
+        self.path = path
+        self.max_raw_samples = max_raw_samples
+        self.downsample_after = int(downsample_after_hours * 3600)
+        self.bucket_seconds = int(bucket_hours * 3600)
+        self.evict_after = int(evict_after_days * 86400)
+        self._series: Dict[str, _Series] = {}
+        self._recent = _RecentWindow()
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def record(self, content: TikTokContent, ts: Optional[int] = None):
+        """Append the current metrics of one content item"""
+        self.record_many([content], ts)
+
+    def record_many(self, content_list: Iterable[TikTokContent], ts: Optional[int] = None):
+        """Append the current metrics of many content items under one timestamp"""
+        ts = int(ts if ts is not None else time.time())
+        with self._lock:
+            for content in content_list:
+                series = self._series.get(content.content_id)
+                if series is None:
+                    series = self._series[content.content_id] = _Series()
+                metrics = (int(content.likes or 0), int(content.comments or 0), int(content.views or 0))
+                series.append(ts, *metrics)
+                self._recent.append(content.content_id, ts, *metrics)
+                if len(series) > self.max_raw_samples:
+                    series.downsample(ts - self.downsample_after, self.bucket_seconds)
+
+    def samples(self, content_id: str, metric: str = "views") -> List[Tuple[int, int]]:
+        """Return (timestamp, value) pairs for one content item"""
+        series = self._series.get(content_id)
+        if series is None:
+            return []
+        return list(zip(series.ts, getattr(series, metric)))
+
+    def evict_stale(self, now: Optional[int] = None) -> int:
+        """Drop series whose last sample is older than evict_after_days (no longer scraped)"""
+        cutoff = int(now if now is not None else time.time()) - self.evict_after
+        with self._lock:
+            stale = [content_id for content_id, series in self._series.items() if series.ts[-1] < cutoff]
+            for content_id in stale:
+                del self._series[content_id]
+                self._recent.remove(content_id)
+        return len(stale)
+
+    def velocity_table(self, metric: str = "views") -> Dict[str, Tuple[float, float]]:
+        """
+        Per-hour velocity and acceleration of a metric for all content
+
+        Velocity uses the last two samples, acceleration the change between the
+        last two velocities. Content with fewer than two samples is omitted and
+        acceleration is 0.0 when only two samples exist.
+        Returns {content_id: (velocity, acceleration)}
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric '{metric}' (expected one of {METRICS})")
+
+        with self._lock:
+            # Views of the window must be gone before a later append can resize it
+            if np is not None:
+                return self._velocity_numpy(metric)
+            return self._velocity_python(metric)
+
+    def _velocity_numpy(self, metric: str) -> Dict[str, Tuple[float, float]]:
+        window = self._recent
+        rows = len(window)
+        if not rows:
+            return {}
+        counts = np.frombuffer(window.counts, dtype=np.int64, count=rows)
+        selected = np.flatnonzero(counts >= 2)
+        if not selected.size:
+            return {}
+
+        ts = np.frombuffer(window.ts, dtype=np.int64, count=rows * WINDOW).reshape(rows, WINDOW)[selected]
+        values = np.frombuffer(getattr(window, metric), dtype=np.int64, count=rows * WINDOW).reshape(rows, WINDOW)[selected]
+        t0, t1, t2 = ts.T.astype(np.float64)
+        v0, v1, v2 = values.T.astype(np.float64)
+        dt_prev = np.maximum((t1 - t0) / 3600.0, 1e-9)
+        dt_last = np.maximum((t2 - t1) / 3600.0, 1e-9)
+        velocity = (v2 - v1) / dt_last
+        prev_velocity = np.where(t1 > t0, (v1 - v0) / dt_prev, velocity)
+        acceleration = (velocity - prev_velocity) / dt_last
+        ids = [window.ids[row] for row in selected.tolist()]
+        return dict(zip(ids, zip(velocity.tolist(), acceleration.tolist())))
+
+    def _velocity_python(self, metric: str) -> Dict[str, Tuple[float, float]]:
+        window = self._recent
+        values = getattr(window, metric)
+        table = {}
+        for row, content_id in enumerate(window.ids):
+            if window.counts[row] < 2:
+                continue
+            base = row * WINDOW
+            t0, t1, t2 = window.ts[base:base + WINDOW]
+            v0, v1, v2 = values[base:base + WINDOW]
+            dt_last = max((t2 - t1) / 3600.0, 1e-9)
+            velocity = (v2 - v1) / dt_last
+            prev_velocity = (v1 - v0) / ((t1 - t0) / 3600.0) if t1 > t0 else velocity
+            table[content_id] = (velocity, (velocity - prev_velocity) / dt_last)
+        return table
+
+    def save(self):
+        """
+        Evict stale series and persist the rest (written atomically)
+        Layout after the header: content_ids (newline-joined UTF-8), per-series
+        lengths, each history column concatenated in content_id order, then the
+        window's counts and columns in the same order; all columns int64
+        """
+        if not self.path:
+            return
+        self.evict_stale()
+        with self._lock:
+            ids = list(self._series)
+            window = self._recent
+            lengths = array('q', (len(self._series[content_id]) for content_id in ids))
+            counts = array('q', (window.counts[window.rows[content_id]] for content_id in ids))
+            history = {name: array('q') for name in COLUMNS}
+            recent = {name: array('q') for name in COLUMNS}
+            for content_id in ids:
+                series, base = self._series[content_id], window.rows[content_id] * WINDOW
+                for name in COLUMNS:
+                    history[name].extend(getattr(series, name))
+                    recent[name].extend(getattr(window, name)[base:base + WINDOW])
+
+        ids_blob = "\n".join(ids).encode("utf-8")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_FILE_HEADER.pack(_FILE_MAGIC, sys.byteorder == "little", len(ids), len(ids_blob)))
+            f.write(ids_blob)
+            for column in (lengths, *history.values(), counts, *recent.values()):
+                column.tofile(f)
+        os.replace(tmp_path, self.path)
+
+    def load(self):
+        """Load columns previously written by save()"""
+        with open(self.path, 'rb') as f:
+            data = memoryview(f.read())
+        if len(data) < _FILE_HEADER.size or bytes(data[:8]) != _FILE_MAGIC:
+            print(f"⚠️ Ignoring engagement snapshots in an unknown format: {self.path}")
+            return
+        _, little_endian, count, ids_size = _FILE_HEADER.unpack_from(data)
+        offset = _FILE_HEADER.size
+        ids = bytes(data[offset:offset + ids_size]).decode("utf-8").split("\n") if count else []
+        offset += ids_size
+
+        def take(length: int) -> array:
+            nonlocal offset
+            column = array('q')
+            column.frombytes(data[offset:offset + 8 * length])
+            offset += 8 * length
+            if little_endian != (sys.byteorder == "little"):
+                column.byteswap()
+            return column
+
+        lengths = take(count)
+        history = {name: take(sum(lengths)) for name in COLUMNS}
+        counts = take(count)
+        recent = {name: take(count * WINDOW) for name in COLUMNS}
+
+        series_by_id: Dict[str, _Series] = {}
+        window = _RecentWindow(capacity=max(count, 1024))
+        start = 0
+        for row, (content_id, length) in enumerate(zip(ids, lengths)):
+            series = series_by_id[content_id] = _Series()
+            for name in COLUMNS:
+                setattr(series, name, history[name][start:start + length])
+            start += length
+            window.ids.append(content_id)
+            window.rows[content_id] = row
+        window.counts[:count] = counts
+        for name in COLUMNS:
+            getattr(window, name)[:count * WINDOW] = recent[name]
+
+        with self._lock:
+            self._series = series_by_id
+            self._recent = window
@@ -132,13 +132,13 @@ def test_prompt_with_real_data():
     from analysis.video_analyzer import VideoAnalyzer
     analyzer = VideoAnalyzer()
 
-    video_file = None
-    if content.video_download_url:
-        video_file = analyzer._download_video(content.video_download_url, content.content_id)
-        if video_file:
-            print(f"   ✅ Video downloaded")
-        else:
-            print(f"   ⚠️ Video download failed, using text-only")
+    # Reuses an uploaded Gemini file across runs when GEMINI_UPLOAD_MODE=file_api
+    media = analyzer.prepare_media(content)
+    video_available = media.has_video
+    if video_available:
+        print(f"   ✅ Video ready")
+    else:
+        print(f"   ⚠️ No video available, using text-only")
 
     # Format prompt
     prompt_text = TEST_PROMPT.format(
@@ -151,7 +151,7 @@ def test_prompt_with_real_data():
     )
 
     # Add video context if available
-    if video_file:
+    if video_available:
         prompt_text = f"""You are analyzing a TikTok VIDEO (visual + audio content).
 
 Pay attention to:
@@ -167,10 +167,8 @@ Pay attention to:
     print("   (This may take 60-90 seconds with video)")
 
     try:
-        if video_file:
-            with open(video_file, 'rb') as f:
-                video_data = f.read()
-            video_part = {"mime_type": "video/mp4", "data": video_data}
+        if video_available:
+            video_part = analyzer.video_part(content, media)
             response = model.generate_content([video_part, prompt_text])
         else:
             response = model.generate_content(prompt_text)
@@ -183,11 +181,7 @@ Pay attention to:
         print("=" * 70)
 
         # Cleanup
-        if video_file:
-            import os
-            if os.path.exists(video_file):
-                os.remove(video_file)
-                print("\n🗑️ Cleaned up video file")
+        media.close()
 
         print("\n✅ Test complete!")
         print("\nNext steps:")